@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import traceback
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT) # For dashboard_app and the benchmarks package when run as a script
+sys.path.append(os.path.join(ROOT, 'src'))
+from benchmarks import synthetic
+
+# Timed scenarios over synthetic data for the main pipeline steps. Each scenario prepares its
+# inputs untimed, then times `repeat` runs of one step. Results are written as JSON (one entry
+# per scenario: every timing, the best, rows and rows/sec) together with the commit and library
+# versions, so two result files can be compared with --compare.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run --tickers 20 --years 10 --news-rows 200000 --output bench.json
+#   python -m benchmarks.run --output new.json --compare bench.json
+
+LIBRARIES = ['numpy', 'pandas', 'TA-Lib', 'textblob', 'nltk', 'pyarrow', 'scipy', 'dash', 'plotly']
+
+class Context:
+    """Synthetic inputs shared by the scenarios, generated on first use and written under a temp dir."""
+
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.tickers = synthetic.make_tickers(args.tickers)
+        self.extra = {} # Additional measurements of the running scenario
+        self._cache = {}
+
+    def _get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def prices(self):
+        return self._get('prices', lambda: synthetic.make_price_data(self.tickers, years=self.args.years, seed=self.args.seed))
+
+    @property
+    def price_dir(self):
+        return self._get('price_dir', lambda: synthetic.write_price_csvs(self.prices, os.path.join(self.workdir, 'yfinance_data')))
+
+    @property
+    def news(self):
+        def build():
+            dates = next(iter(self.prices.values())).index
+            return synthetic.make_news_data(self.args.news_rows, self.tickers, start=dates[0], end=dates[-1], seed=self.args.seed)
+        return self._get('news', build)
+
+    @property
+    def processed(self):
+        """Prices with indicators and financial metrics, as the Quantitative_Analysis notebook produces."""
+        from technical_analysis import add_all_common_indicators
+        from financial_metrics import add_all_common_financial_metrics
+        return self._get('processed', lambda: {ticker: add_all_common_financial_metrics(add_all_common_indicators(df.copy()))
+                                                for ticker, df in self.prices.items()})
+
+    @property
+    def daily_sentiment(self):
+        return self._get('daily_sentiment', lambda: synthetic.make_daily_sentiment(self.news, seed=self.args.seed))
+
+def scenario_load_all_historical_data(ctx):
+    from data_loader import load_all_historical_data
+    price_dir = ctx.price_dir
+    rows = sum(len(df) for df in ctx.prices.values())
+    return (lambda: load_all_historical_data(price_dir)), rows
+
+def scenario_add_all_common_indicators(ctx):
+    from technical_analysis import add_all_common_indicators
+    prices = ctx.prices
+    return (lambda: [add_all_common_indicators(df.copy()) for df in prices.values()]), sum(map(len, prices.values()))
+
+def scenario_add_all_common_financial_metrics(ctx):
+    from financial_metrics import add_all_common_financial_metrics
+    prices = ctx.prices
+    return (lambda: [add_all_common_financial_metrics(df.copy()) for df in prices.values()]), sum(map(len, prices.values()))
+
+def _sentiment_scenario(ctx, engine, rows):
+    from news_processor import add_sentiment_score
+    headlines = ctx.news[['headline']].iloc[:rows]
+    return (lambda: add_sentiment_score(headlines.copy(), engine=engine, verbose=False)), len(headlines)
+
+def scenario_add_sentiment_score_vectorized(ctx):
+    return _sentiment_scenario(ctx, 'vectorized', ctx.args.news_rows)
+
+def scenario_add_sentiment_score_textblob(ctx):
+    # TextBlob is much slower, so it runs on a prefix of the news
+    return _sentiment_scenario(ctx, 'textblob', ctx.args.textblob_rows)
+
+def _keyword_scenario(ctx, n_gram):
+    from news_processor import get_common_keywords
+    # Counting is what is timed, so a plain lowercase/letters-only column stands in for processed_headline
+    processed = ctx.news['headline'].astype(object).str.lower().str.replace(r'[^a-z\s]', '', regex=True)
+    frame = pd.DataFrame({'processed_headline': processed})
+    return (lambda: get_common_keywords(frame, top_n=50, n_gram=n_gram)), len(frame)
+
+def scenario_get_common_keywords_unigrams(ctx):
+    return _keyword_scenario(ctx, 1)
+
+def scenario_get_common_keywords_bigrams(ctx):
+    return _keyword_scenario(ctx, 2)
+
+def scenario_correlation_merge(ctx):
+    from correlation import merge_sentiment_returns, correlation_summary
+    daily_sentiment, processed = ctx.daily_sentiment, ctx.processed
+    lags = range(0, 4)
+    def run():
+        merged = merge_sentiment_returns(daily_sentiment, processed, lags=lags)
+        return correlation_summary(merged, lags=lags)
+    return run, len(daily_sentiment)
+
+def _write_dashboard_data(ctx, root):
+    from correlation import merge_sentiment_returns, correlation_summary, write_correlation_outputs
+    processed_dir = os.path.join(root, 'data', 'processed')
+    os.makedirs(processed_dir, exist_ok=True)
+    for ticker, df in ctx.processed.items():
+        df.to_csv(os.path.join(processed_dir, f'{ticker}_processed_stock_data.csv'))
+    merged = merge_sentiment_returns(ctx.daily_sentiment, ctx.processed)
+    write_correlation_outputs(merged, correlation_summary(merged), output_dir=processed_dir)
+
+def scenario_dashboard_callbacks(ctx):
+    """
+    Both dropdown callbacks for every ticker through Dash's HTTP endpoint. The first run is cold
+    (data loaded and figures built); later runs are served from the dashboard's caches.
+    """
+    root = os.path.join(ctx.workdir, 'dashboard')
+    _write_dashboard_data(ctx, root)
+    previous = os.environ.get('DASHBOARD_DATA_DIR')
+    os.environ['DASHBOARD_DATA_DIR'] = os.path.join(root, 'data', 'processed') # Read once, when dashboard_app is imported
+    try:
+        sys.modules.pop('dashboard_app', None)
+        start = time.perf_counter()
+        import dashboard_app
+        ctx.extra['startup_seconds'] = time.perf_counter() - start
+    finally:
+        if previous is None:
+            os.environ.pop('DASHBOARD_DATA_DIR', None)
+        else:
+            os.environ['DASHBOARD_DATA_DIR'] = previous
+    client = dashboard_app.app.server.test_client()
+    callbacks = [ # (figure outputs, relayoutData inputs) of the two dropdown callbacks
+        (['stock-price-plot', 'rsi-plot', 'macd-plot'], ['stock-price-plot', 'rsi-plot', 'macd-plot']),
+        (['sentiment-plot', 'sentiment-return-scatter'], ['sentiment-plot']),
+    ]
+
+    def select(ticker, graphs, relayouts):
+        response = client.post('/_dash-update-component', json={
+            'output': '..' + '...'.join(f'{graph}.figure' for graph in graphs) + '..',
+            'outputs': [{'id': graph, 'property': 'figure'} for graph in graphs],
+            'inputs': [{'id': 'ticker-dropdown', 'property': 'value', 'value': ticker}] +
+                      [{'id': graph, 'property': 'relayoutData', 'value': None} for graph in relayouts],
+            'changedPropIds': ['ticker-dropdown.value'],
+            'state': [],
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"Callback for {ticker} failed with HTTP {response.status_code}")
+        figures = response.get_json()['response']
+        empty = [graph for graph in graphs if not figures.get(graph, {}).get('figure', {}).get('data')]
+        if empty:
+            raise RuntimeError(f"Callback for {ticker} returned empty figures for {', '.join(empty)}")
+        return len(response.data)
+
+    def run():
+        return [select(ticker, graphs, relayouts) for ticker in ctx.tickers for graphs, relayouts in callbacks]
+    return run, len(ctx.tickers) * len(callbacks)
+
+SCENARIOS = {
+    'load_all_historical_data': scenario_load_all_historical_data,
+    'add_all_common_indicators': scenario_add_all_common_indicators,
+    'add_all_common_financial_metrics': scenario_add_all_common_financial_metrics,
+    'add_sentiment_score_vectorized': scenario_add_sentiment_score_vectorized,
+    'add_sentiment_score_textblob': scenario_add_sentiment_score_textblob,
+    'get_common_keywords_unigrams': scenario_get_common_keywords_unigrams,
+    'get_common_keywords_bigrams': scenario_get_common_keywords_bigrams,
+    'correlation_merge': scenario_correlation_merge,
+    'dashboard_callbacks': scenario_dashboard_callbacks,
+}
+
+def run_scenario(name, ctx, repeat):
+    """Times one scenario. Failures (e.g. missing NLTK data) are recorded instead of raised."""
+    result = {'status': 'ok'}
+    try:
+        ctx.extra = {}
+        run, rows = SCENARIOS[name](ctx)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        result.update({'rows': rows, 'timings': timings, 'best_seconds': best, 'mean_seconds': float(np.mean(timings)),
+                       'rows_per_second': rows / best if best > 0 else None, **ctx.extra})
+    except Exception as e:
+        result.update({'status': 'error', 'message': f'{type(e).__name__}: {e}', 'traceback': traceback.format_exc()})
+    return result
+
+def environment():
+    """Commit, Python/platform and library versions for the result file."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for library in LIBRARIES:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'libraries': versions, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def run_benchmarks(args):
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenario(s) {unknown}. Choose from {list(SCENARIOS)}.")
+    params = {key: getattr(args, key) for key in ('tickers', 'years', 'news_rows', 'textblob_rows', 'repeat', 'seed')}
+    results = {'environment': environment(), 'parameters': params, 'scenarios': {}}
+    with tempfile.TemporaryDirectory(prefix='benchmarks-') as workdir:
+        ctx = Context(args, workdir)
+        for name in names:
+            result = run_scenario(name, ctx, args.repeat)
+            results['scenarios'][name] = result
+            if result['status'] == 'ok':
+                print(f"{name}: best {result['best_seconds']:.3f}s over {args.repeat} runs ({result['rows_per_second']:,.0f} rows/sec)")
+            else:
+                print(f"{name}: {result['message']}")
+    return results
+
+def compare(results, baseline, threshold=0.1):
+    """Prints best-time ratios against a baseline result file; returns the scenarios slower by more than `threshold`."""
+    regressions = []
+    print(f"\nCompared with {baseline['environment'].get('commit')}:")
+    for name, result in results['scenarios'].items():
+        old = baseline['scenarios'].get(name, {})
+        if result['status'] != 'ok' or old.get('status') != 'ok':
+            continue
+        ratio = result['best_seconds'] / old['best_seconds']
+        flag = ' REGRESSION' if ratio > 1 + threshold else ''
+        print(f"  {name}: {old['best_seconds']:.3f}s -> {result['best_seconds']:.3f}s ({ratio:.2f}x){flag}")
+        if flag:
+            regressions.append(name)
+    if baseline.get('parameters') != results['parameters']:
+        print("  Note: the baseline was run with different parameters.")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on deterministic synthetic data.")
+    parser.add_argument('--tickers', type=int, default=10, help="Number of tickers")
+    parser.add_argument('--years', type=float, default=5, help="Years of daily bars per ticker")
+    parser.add_argument('--news-rows', type=int, default=100000, help="Rows of synthetic news")
+    parser.add_argument('--textblob-rows', type=int, default=10000, help="News rows scored with the TextBlob engine")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per scenario (the best is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', nargs='+', help=f"Scenarios to run (default: all). Choices: {', '.join(SCENARIOS)}")
+    parser.add_argument('--output', help="Write the JSON results to this file (default: print them)")
+    parser.add_argument('--compare', help="Baseline JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Slowdown ratio flagged as a regression")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmarks(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Deterministic synthetic data shaped like the project's inputs: yfinance
+# {ticker}_historical_data.csv files and the FNSPID raw_analyst_ratings.csv news file.
+# The same arguments (and seed) always produce the same data.
+
+KNOWN_TICKERS = ['AAPL', 'AMZN', 'GOOG', 'META', 'MSFT', 'NVDA', 'TSLA']
+
+PUBLISHERS = [
+    'Paul Quintaro', 'Lisa Levin', 'Benzinga Newsdesk', 'Charles Gross', 'Monica Gerson',
+    'Eddie Staley', 'Hal Lindon', 'ETF Professor', 'Juan Lopez', 'Benzinga Staff',
+    'Vick Meyer', 'webmaster', 'Benzinga_Newsdesk', 'Zacks', 'Jayson Derrick',
+    'Allie Wickman', 'Shanthi Rexaline', 'Craig Jones', 'Wayne Duggan', 'Nelson Hem',
+]
+
+FIRMS = ['Morgan Stanley', 'Goldman Sachs', 'JP Morgan', 'Barclays', 'Citigroup', 'UBS', 'Deutsche Bank', 'Wells Fargo', 'Jefferies', 'Needham']
+RATINGS = ['Buy', 'Overweight', 'Outperform', 'Neutral', 'Hold', 'Equal-Weight', 'Underperform', 'Sell']
+EVENTS = ['Strong Earnings', 'Weak Guidance', 'Record Revenue', 'FDA Approval', 'Disappointing Sales', 'Analyst Upgrade',
+          'Analyst Downgrade', 'Surprise Profit', 'Product Recall', 'Buyback Announcement', 'CEO Departure', 'Great Quarter']
+MOVES = ['Surge', 'Jump', 'Rally', 'Gain', 'Rise', 'Fall', 'Drop', 'Slide', 'Plunge', 'Trade Higher', 'Trade Lower']
+TEMPLATES = [
+    '{ticker} Shares {move} {pct}% After {event}',
+    '{firm} Maintains {rating} on {ticker}, {direction} Price Target to ${price}',
+    '{firm} Upgrades {ticker} to {rating}',
+    '{firm} Downgrades {ticker} to {rating}',
+    '{ticker} Reports Q{quarter} EPS ${eps} vs ${estimate} Est., Sales ${sales}B',
+    'Stocks That Hit 52-Week {extreme} On {weekday}',
+    "Benzinga's Top Upgrades, Downgrades For {month} {day}, {year}",
+    '{ticker} {move}s in Pre-Market Session; {event} in Focus',
+]
+# Templates with few possible fillings are drawn rarely so most pooled headlines are distinct
+TEMPLATE_WEIGHTS = np.array([30, 30, 2, 2, 30, 0.2, 1, 5])
+
+def make_tickers(n_tickers):
+    """The first n_tickers of KNOWN_TICKERS, then SYN001, SYN002, ..."""
+    return (KNOWN_TICKERS + [f'SYN{i:03d}' for i in range(1, n_tickers + 1)])[:n_tickers]
+
+def make_price_data(tickers, years=5, start='2010-01-04', seed=0):
+    """
+    Returns {ticker: DataFrame} of daily business-day OHLCV bars indexed by Date, with the
+    yfinance columns (Open, High, Low, Close, Adj Close, Volume, Dividends, Stock Splits).
+    Closes follow a geometric random walk; each ticker gets its own drift and volatility.
+    """
+    dates = pd.bdate_range(start, periods=int(years * 252), name='Date')
+    n = len(dates)
+    data = {}
+    for i, ticker in enumerate(tickers):
+        rng = np.random.default_rng([seed, i])
+        volatility = rng.uniform(0.01, 0.03)
+        close = rng.uniform(20, 300) * np.exp(np.cumsum(rng.normal(rng.uniform(-2e-4, 6e-4), volatility, n)))
+        open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, volatility / 3, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n)))
+        volume = np.round(rng.lognormal(15, 0.5, n)).astype('int64')
+        data[ticker] = pd.DataFrame({
+            'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Adj Close': close,
+            'Volume': volume, 'Dividends': 0.0, 'Stock Splits': 0.0,
+        }, index=dates)
+    return data
+
+def _fill_templates(templates, tickers, rng):
+    """Fills template ids with random slot values (drawn for all headlines at once)."""
+    n = len(templates)
+    dates = pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 3650, n), unit='D')
+    slots = {
+        'ticker': tickers, 'move': rng.choice(MOVES, n), 'pct': np.char.mod('%.1f', rng.uniform(0.5, 15, n)),
+        'event': rng.choice(EVENTS, n), 'firm': rng.choice(FIRMS, n), 'rating': rng.choice(RATINGS, n),
+        'direction': rng.choice(['Raises', 'Lowers'], n), 'price': np.char.mod('%.0f', rng.uniform(10, 500, n)),
+        'quarter': rng.integers(1, 5, n), 'eps': np.char.mod('%.2f', rng.uniform(0.1, 5, n)),
+        'estimate': np.char.mod('%.2f', rng.uniform(0.1, 5, n)), 'sales': np.char.mod('%.2f', rng.uniform(0.5, 90, n)),
+        'extreme': rng.choice(['Highs', 'Lows'], n), 'weekday': dates.day_name(), 'month': dates.month_name(),
+        'day': dates.day, 'year': dates.year,
+    }
+    names, columns = list(slots), [np.asarray(values).tolist() for values in slots.values()]
+    return [TEMPLATES[t].format_map(dict(zip(names, row))) for t, row in zip(templates, zip(*columns))]
+
+def make_news_data(n_rows, tickers, start='2011-01-03', end=None, unique_ratio=0.6, seed=0):
+    """
+    Returns an FNSPID-shaped news DataFrame (headline, url, publisher, date, stock) of n_rows.
+    Headlines come from analyst-rating style templates; about `unique_ratio` of them are
+    distinct (the real dataset has 845K unique headlines in 1.4M rows), and publishers and
+    tickers are skewed so a few account for most rows. Dates are strings with a -04:00 offset.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) if end is not None else start + pd.DateOffset(years=5)
+    n_unique = max(int(n_rows * unique_ratio), 1)
+
+    ticker_weights = 1 / np.arange(1, len(tickers) + 1)
+    pool_stocks = rng.choice(np.asarray(tickers, dtype=object), n_unique, p=ticker_weights / ticker_weights.sum())
+    pool_templates = rng.choice(len(TEMPLATES), n_unique, p=TEMPLATE_WEIGHTS / TEMPLATE_WEIGHTS.sum())
+    pool = pd.Series(_fill_templates(pool_templates, pool_stocks, rng))
+    first = ~pool.duplicated().to_numpy()
+    pool, pool_stocks = pool[first].to_numpy(dtype=object), pool_stocks[first]
+    n_unique = len(pool)
+
+    # Every pooled headline appears at least once; the remaining rows repeat popular ones
+    picks = np.concatenate([np.arange(n_unique), np.minimum(rng.zipf(1.3, n_rows - n_unique) - 1, n_unique - 1)])[:n_rows]
+    rng.shuffle(picks)
+    publisher_weights = 1 / np.arange(1, len(PUBLISHERS) + 1) ** 1.2
+    seconds = rng.integers(0, int((end - start).total_seconds()), n_rows)
+    dates = (start + pd.to_timedelta(np.sort(seconds), unit='s')).strftime('%Y-%m-%d %H:%M:%S') + '-04:00'
+    headlines = pool[picks]
+    return pd.DataFrame({
+        'headline': headlines,
+        'url': [f'https://www.benzinga.com/news/{i}' for i in picks],
+        'publisher': rng.choice(np.asarray(PUBLISHERS, dtype=object), n_rows, p=publisher_weights / publisher_weights.sum()),
+        'date': dates,
+        'stock': pool_stocks[picks],
+    })
+
+def make_daily_sentiment(news, seed=0):
+    """Daily average sentiment per (Date, stock) for `news`, with random scores in [-1, 1] (no NLP needed)."""
+    rng = np.random.default_rng(seed)
+    days = pd.to_datetime(news['date'], utc=True).dt.normalize()
+    scores = pd.Series(rng.uniform(-1, 1, len(news)), index=news.index)
+    daily = scores.groupby([days, news['stock']]).mean().rename('daily_avg_sentiment')
+    return daily.rename_axis(['Date', 'stock']).reset_index()
+
+def write_price_csvs(price_data, data_dir):
+    """Writes {ticker}_historical_data.csv files like the yfinance_data folder."""
+    os.makedirs(data_dir, exist_ok=True)
+    for ticker, df in price_data.items():
+        df.to_csv(os.path.join(data_dir, f'{ticker}_historical_data.csv'))
+    return data_dir
+
+def write_news_csv(news, path):
+    """Writes the news like raw_analyst_ratings.csv (including its unnamed index column)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    news.to_csv(path)
+    return path
+
+if __name__ == '__main__':
+    print("Testing synthetic.py:")
+    tickers = make_tickers(3)
+    prices = make_price_data(tickers, years=1)
+    print(prices['AAPL'].head())
+    news = make_news_data(1000, tickers)
+    print(news.head())
+    print(f"{news['headline'].nunique()} unique headlines in {len(news)} rows; "
+          f"deterministic: {news.equals(make_news_data(1000, tickers))}")
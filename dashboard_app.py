@@ -2,30 +2,38 @@
 
 import dash
 from dash import dcc, html
+from dash import ctx, no_update
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
 import pandas as pd
 import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from dashboard_data import TickerStore
+from figure_cache import FigureCache, figure_json
+from downsample import downsample_series
+from rolling_correlation import ROLLING_WINDOWS, rolling_correlation
 
 # --- 1. Load Pre-processed Data ---
-# Assuming you've saved your processed data from the notebooks
-DATA_DIR = 'data/processed/' # Adjust path as needed based on where dashboard_app.py is located
-
-# Load all processed stock data
-processed_stock_data = {}
-for filename in os.listdir(DATA_DIR):
-    if filename.endswith('_processed_stock_data.csv'):
-        ticker = filename.split('_')[0]
-        df = pd.read_csv(os.path.join(DATA_DIR, filename), index_col='Date', parse_dates=True)
-        processed_stock_data[ticker] = df
-
-# Load all merged correlation data (sentiment + stock returns)
-merged_correlation_data = {}
-for filename in os.listdir(DATA_DIR):
-    if filename.endswith('_merged_correlation_data.csv'):
-        ticker = filename.split('_')[0]
-        df = pd.read_csv(os.path.join(DATA_DIR, filename), index_col='Date', parse_dates=True)
-        merged_correlation_data[ticker] = df
+# Assuming you've saved your processed data from the notebooks. The default is data/processed/ next to
+# this file (whatever the working directory); set DASHBOARD_DATA_DIR to read another directory.
+DATA_DIR = os.path.abspath(os.environ.get('DASHBOARD_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'processed')))
+
+# Tickers are only indexed at startup; each ticker's frames are loaded the first time a callback
+# needs them and kept in a bounded per-process LRU. Columnar copies (see src/storage.py) are used
+# when present, otherwise the CSVs; Arrow copies are memory-mapped and shared across workers.
+MAX_LOADED_TICKERS = int(os.environ.get('DASHBOARD_MAX_LOADED_TICKERS', 16))
+
+# Processed stock data (prices + indicators)
+processed_store = TickerStore(DATA_DIR, 'processed_stock_data', max_loaded=MAX_LOADED_TICKERS)
+
+# Merged correlation data (sentiment + stock returns)
+merged_store = TickerStore(DATA_DIR, 'merged_correlation_data', max_loaded=MAX_LOADED_TICKERS)
+
+# Rolling sentiment-return correlations (written by src/pipeline.py; computed from the merged data when absent)
+rolling_store = TickerStore(DATA_DIR, 'rolling_correlation_data', max_loaded=MAX_LOADED_TICKERS)
 
 # Load overall correlation summary
 try:
@@ -36,10 +44,11 @@ except FileNotFoundError:
 
 
 # Get list of available tickers
-available_tickers = sorted(list(processed_stock_data.keys()))
+available_tickers = processed_store.tickers
+DEFAULT_TICKER = 'AAPL'
 
 # --- 2. Initialize the Dash App ---
-app = dash.Dash(name, title="Financial Market Insights Dashboard")
+app = dash.Dash(__name__, title="Financial Market Insights Dashboard")
 server = app.server # For deployment
 
 # --- 3. Define the App Layout ---
@@ -53,7 +62,7 @@ app.layout = html.Div([
         dcc.Dropdown(
             id='ticker-dropdown',
             options=[{'label': ticker, 'value': ticker} for ticker in available_tickers],
-            value='AAPL', # Default value
+            value=DEFAULT_TICKER, # Default value
             clearable=False,
             style={'width': '200px', 'display': 'inline-block', 'verticalAlign': 'middle'}
         ),
@@ -72,6 +81,7 @@ app.layout = html.Div([
     # --- Section 2: News Sentiment & Correlation ---
     html.H2("News Sentiment & Correlation", style={'textAlign': 'center', 'marginTop': '30px', 'color': '#34495e'}),
     dcc.Graph(id='sentiment-plot'),
+    dcc.Graph(id='rolling-correlation-plot'),
     dcc.Graph(id='correlation-bar-plot'),
     dcc.Graph(id='sentiment-return-scatter'), # New scatter plot for sentiment vs returns
 
@@ -79,108 +89,154 @@ app.layout = html.Div([
 
 # --- 4. Define Callbacks for Interactivity ---
 
-# Callback for Stock Price and Technical Indicators
-@app.callback(
-    Output('stock-price-plot', 'figure'),
-    Output('rsi-plot', 'figure'),
-    Output('macd-plot', 'figure'),
-    Input('ticker-dropdown', 'value')
-)
-def update_stock_plots(selected_ticker):
-    df = processed_stock_data.get(selected_ticker)
+# Figures are built once per (ticker, data version), serialized to plotly JSON dicts and served from
+# an LRU cache bounded in bytes, so repeated dropdown changes and concurrent users don't rebuild them.
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get('FIGURE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+figure_cache = FigureCache(max_bytes=FIGURE_CACHE_MAX_BYTES)
+
+def horizontal_line(y, color):
+    """A constant guide line drawn as a layout shape instead of a per-point trace."""
+    return dict(type='line', xref='paper', x0=0, x1=1, yref='y', y0=y, y1=y, line=dict(color=color, dash='dash', width=1))
+
+# Time series are downsampled on the server to at most about this many points per trace
+# (see src/downsample.py); zooming re-fetches full detail for just the visible range.
+MAX_POINTS_PER_TRACE = int(os.environ.get('DASHBOARD_MAX_POINTS', 2000))
+
+def downsampled(df, column, method='lttb'):
+    """df[column] in date order, downsampled to MAX_POINTS_PER_TRACE points (peaks are kept)."""
+    series = df[column] if df.index.is_monotonic_increasing else df[column].sort_index()
+    return downsample_series(series, MAX_POINTS_PER_TRACE, method)
+
+def line_trace(df, column, method='lttb', **kwargs):
+    """A line trace of df[column], downsampled (see downsampled)."""
+    series = downsampled(df, column, method)
+    return go.Scatter(x=series.index, y=series.to_numpy(), mode='lines', **kwargs)
+
+def date_axis(x_range):
+    return {'title': 'Date'} if x_range is None else {'title': 'Date', 'range': list(x_range)}
+
+def visible_rows(df, x_range):
+    if x_range is None:
+        return df
+    return df[(df.index >= pd.Timestamp(x_range[0])) & (df.index <= pd.Timestamp(x_range[1]))]
+
+def relayout_x_range(relayout_data):
+    """
+    Reads a graph's relayoutData: returns (start, end) after a zoom or pan on the date axis,
+    None when the axis was reset to the full range, and no_update for other layout changes.
+    """
+    relayout_data = relayout_data or {}
+    if 'xaxis.range[0]' in relayout_data:
+        return relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    if 'xaxis.range' in relayout_data:
+        return tuple(relayout_data['xaxis.range'])
+    if relayout_data.get('xaxis.autorange'):
+        return None
+    return no_update
+
+def build_stock_figures(selected_ticker, x_range=None):
+    df = processed_store.get(selected_ticker)
 
     if df is None or df.empty:
         return {}, {}, {} # Return empty figures if data not found
+    df = visible_rows(df, x_range)
 
     # Stock Price with SMAs
-    trace_close = go.Scatter(x=df.index, y=df['Close'], mode='lines', name='Close Price', line=dict(color='#3498db'))
-    trace_sma20 = go.Scatter(x=df.index, y=df['SMA_20'], mode='lines', name='SMA 20', line=dict(color='#2ecc71', dash='dot'))
-    trace_sma50 = go.Scatter(x=df.index, y=df['SMA_50'], mode='lines', name='SMA 50', line=dict(color='#e67e22', dash='dash'))
+    trace_close = line_trace(df, 'Close', name='Close Price', line=dict(color='#3498db'))
+    trace_sma20 = line_trace(df, 'SMA_20', name='SMA 20', line=dict(color='#2ecc71', dash='dot'))
+    trace_sma50 = line_trace(df, 'SMA_50', name='SMA 50', line=dict(color='#e67e22', dash='dash'))
 
     # Bollinger Bands
-    trace_upper = go.Scatter(x=df.index, y=df['Upper_Band'], mode='lines', name='Upper Band', line=dict(color='#95a5a6', dash='dot', width=1))
-    trace_middle = go.Scatter(x=df.index, y=df['Middle_Band'], mode='lines', name='Middle Band', line=dict(color='#7f8c8d', dash='dash', width=1))
-    trace_lower = go.Scatter(x=df.index, y=df['Lower_Band'], mode='lines', name='Lower Band', line=dict(color='#95a5a6', dash='dot', width=1))
+    trace_upper = line_trace(df, 'Upper_Band', name='Upper Band', line=dict(color='#95a5a6', dash='dot', width=1))
+    trace_middle = line_trace(df, 'Middle_Band', name='Middle Band', line=dict(color='#7f8c8d', dash='dash', width=1))
+    trace_lower = line_trace(df, 'Lower_Band', name='Lower Band', line=dict(color='#95a5a6', dash='dot', width=1))
 
 
-    stock_price_figure = {
-        'data': [trace_close, trace_sma20, trace_sma50, trace_upper, trace_middle, trace_lower],
-        'layout': go.Layout(
+    stock_price_figure = go.Figure(
+        data=[trace_close, trace_sma20, trace_sma50, trace_upper, trace_middle, trace_lower],
+        layout=go.Layout(
             title=f'{selected_ticker} Stock Price with Moving Averages & Bollinger Bands',
-            xaxis={'title': 'Date'},
+            xaxis=date_axis(x_range),
             yaxis={'title': 'Price ($)'},
             hovermode='x unified',
             template='plotly_white',
             legend=dict(x=0, y=1.0, traceorder='normal', orientation='h')
         )
-    }
-
-    # RSI Plot
-    rsi_figure = {
-        'data': [
-            go.Scatter(x=df.index, y=df['RSI'], mode='lines', name='RSI', line=dict(color='#8e44ad')),
-            go.Scatter(x=df.index, y=[70]*len(df), mode='lines', name='Overbought', line=dict(color='red', dash='dash', width=1)),
-            go.Scatter(x=df.index, y=[30]*len(df), mode='lines', name='Oversold', line=dict(color='green', dash='dash', width=1))
+    )
+
+    # RSI Plot (overbought/oversold levels are layout shapes, not full-length traces)
+    rsi_figure = go.Figure(
+        data=[
+            line_trace(df, 'RSI', name='RSI', line=dict(color='#8e44ad'))
         ],
-        'layout': go.Layout(
+        layout=go.Layout(
             title=f'{selected_ticker} Relative Strength Index (RSI)',
-            xaxis={'title': 'Date'},
+            xaxis=date_axis(x_range),
             yaxis={'title': 'RSI Value', 'range': [0, 100]},
             hovermode='x unified',
             template='plotly_white',
-            legend=dict(x=0, y=1.0, traceorder='normal', orientation='h')
+            legend=dict(x=0, y=1.0, traceorder='normal', orientation='h'),
+            shapes=[horizontal_line(70, 'red'), horizontal_line(30, 'green')],
+            annotations=[
+                dict(text='Overbought', xref='paper', x=1, xanchor='right', yref='y', y=70, yanchor='bottom', showarrow=False, font=dict(color='red')),
+                dict(text='Oversold', xref='paper', x=1, xanchor='right', yref='y', y=30, yanchor='top', showarrow=False, font=dict(color='green'))
+            ]
         )
-    }
-
-    # MACD Plot
-    macd_figure = {
-        'data': [
-            go.Scatter(x=df.index, y=df['MACD'], mode='lines', name='MACD Line', line=dict(color='#1abc9c')),
-            go.Scatter(x=df.index, y=df['MACD_Signal'], mode='lines', name='Signal Line', line=dict(color='#e74c3c')),
-            go.Bar(x=df.index, y=df['MACD_Hist'], name='Histogram', marker_color='#95a5a6', opacity=0.7)
+    )
+
+    # MACD Plot (the histogram keeps each bucket's min and max bar)
+    macd_hist = downsampled(df, 'MACD_Hist', method='minmax')
+    macd_figure = go.Figure(
+        data=[
+            line_trace(df, 'MACD', name='MACD Line', line=dict(color='#1abc9c')),
+            line_trace(df, 'MACD_Signal', name='Signal Line', line=dict(color='#e74c3c')),
+            go.Bar(x=macd_hist.index, y=macd_hist.to_numpy(), name='Histogram', marker_color='#95a5a6', opacity=0.7)
         ],
-        'layout': go.Layout(
+        layout=go.Layout(
             title=f'{selected_ticker} Moving Average Convergence Divergence (MACD)',
-            xaxis={'title': 'Date'},
+            xaxis=date_axis(x_range),
             yaxis={'title': 'MACD Value'},
             hovermode='x unified',
             template='plotly_white',
             legend=dict(x=0, y=1.0, traceorder='normal', orientation='h')
         )
-    }
+    )
     return stock_price_figure, rsi_figure, macd_figure
 
-
-# Callback for Sentiment Plot and Correlation Scatter Plot
-@app.callback(
-    Output('sentiment-plot', 'figure'),
-    Output('sentiment-return-scatter', 'figure'),
-    Input('ticker-dropdown', 'value')
-)
-def update_sentiment_plots(selected_ticker):
-    df_merged = merged_correlation_data.get(selected_ticker)
-
-    if df_merged is None or df_merged.empty:
-        return {}, {}
-
-    # Sentiment Plot
-    sentiment_figure = {
-        'data': [
-            go.Scatter(x=df_merged.index, y=df_merged['daily_avg_sentiment'], mode='lines', name='Daily Average Sentiment', line=dict(color='#f39c12'))
+def sentiment_return_correlation(selected_ticker, df_merged):
+    """Uses the precomputed summary correlation when available instead of recomputing it."""
+    row = overall_correlation_summary[overall_correlation_summary['Ticker'] == selected_ticker]
+    if not row.empty:
+        return row['Sentiment_vs_Daily_Return_Correlation'].iloc[0]
+    return df_merged['daily_avg_sentiment'].corr(df_merged['Daily_Return'])
+
+def build_sentiment_figure(selected_ticker, df_merged, x_range=None):
+    return go.Figure(
+        data=[
+            line_trace(visible_rows(df_merged, x_range), 'daily_avg_sentiment', name='Daily Average Sentiment', line=dict(color='#f39c12'))
         ],
-        'layout': go.Layout(
+        layout=go.Layout(
             title=f'{selected_ticker} Daily Average News Sentiment',
-            xaxis={'title': 'Date'},
+            xaxis=date_axis(x_range),
             yaxis={'title': 'Sentiment Score', 'range': [-1, 1]},
             hovermode='x unified',
             template='plotly_white',
             legend=dict(x=0, y=1.0, traceorder='normal', orientation='h')
         )
-    }
+    )
+
+def build_sentiment_figures(selected_ticker):
+    df_merged = merged_store.get(selected_ticker)
+
+    if df_merged is None or df_merged.empty:
+        return {}, {}
+
+    # Sentiment Plot
+    sentiment_figure = build_sentiment_figure(selected_ticker, df_merged)
 
     # Sentiment vs. Daily Return Scatter Plot
-    scatter_figure = {
-        'data': [
+    scatter_figure = go.Figure(
+        data=[
             go.Scatter(
                 x=df_merged['daily_avg_sentiment'],
                 y=df_merged['Daily_Return'],
@@ -195,23 +251,43 @@ def update_sentiment_plots(selected_ticker):
                 name='Sentiment vs. Return'
             )
         ],
-        'layout': go.Layout(
-            title=f'{selected_ticker} Daily Sentiment vs. Daily Return (Correlation: {df_merged["daily_avg_sentiment"].corr(df_merged["Daily_Return"]):.4f})',
+        layout=go.Layout(
+            title=f'{selected_ticker} Daily Sentiment vs. Daily Return (Correlation: {sentiment_return_correlation(selected_ticker, df_merged):.4f})',
             xaxis={'title': 'Daily Average Sentiment Score'},
             yaxis={'title': 'Daily Stock Return (%)'},
             hovermode='closest',
             template='plotly_white'
         )
-    }
+    )
     return sentiment_figure, scatter_figure
 
+ROLLING_COLORS = ['#e74c3c', '#3498db', '#2c3e50']
+
+def build_rolling_correlation_figure(selected_ticker):
+    df_rolling = rolling_store.get(selected_ticker)
+    if df_rolling is None:
+        df_merged = merged_store.get(selected_ticker)
+        if df_merged is None or df_merged.empty:
+            return {}
+        df_rolling = rolling_correlation(df_merged).set_index('Date')
+    windows = [w for w in ROLLING_WINDOWS if f'Rolling_Corr_{w}' in df_rolling.columns]
+    return go.Figure(
+        data=[
+            line_trace(df_rolling, f'Rolling_Corr_{w}', name=f'{w}-day', line=dict(color=color))
+            for w, color in zip(windows, ROLLING_COLORS)
+        ],
+        layout=go.Layout(
+            title=f'{selected_ticker} Rolling Correlation: Daily Sentiment vs. Daily Return',
+            xaxis={'title': 'Date'},
+            yaxis={'title': 'Pearson Correlation Coefficient', 'range': [-1, 1]},
+            hovermode='x unified',
+            template='plotly_white',
+            legend=dict(x=0, y=1.0, traceorder='normal', orientation='h'),
+            shapes=[horizontal_line(0, 'gray')]
+        )
+    )
 
-# Callback for Overall Correlation Bar Plot (independent of dropdown)
-@app.callback(
-    Output('correlation-bar-plot', 'figure'),
-    Input('ticker-dropdown', 'value') # Using an input to trigger update, but data is static
-)
-def update_correlation_bar_plot(selected_ticker): # selected_ticker is unused, but required by Input
+def build_correlation_bar_figure():
     if overall_correlation_summary.empty:
         return {
             'data': [],
@@ -228,24 +304,112 @@ def update_correlation_bar_plot(selected_ticker): # selected_ticker is unused, b
             )
         }
 
-    bar_figure = {
-        'data': [
+    return go.Figure(
+        data=[
             go.Bar(
                 x=overall_correlation_summary['Ticker'],
                 y=overall_correlation_summary['Sentiment_vs_Daily_Return_Correlation'],
-                marker_color=overall_correlation_summary['Sentiment_vs_Daily_Return_Correlation'],
-                colorscale='RdBu', # Red-Blue for positive/negative correlation
-                colorbar=dict(title='Correlation')
+                marker=dict(
+                    color=overall_correlation_summary['Sentiment_vs_Daily_Return_Correlation'],
+                    colorscale='RdBu', # Red-Blue for positive/negative correlation
+                    colorbar=dict(title='Correlation')
+                )
             )
         ],
-        'layout': go.Layout(
+        layout=go.Layout(
             title='Overall Correlation: Daily News Sentiment vs. Daily Stock Returns',
             xaxis={'title': 'Stock Ticker'},
             yaxis={'title': 'Pearson Correlation Coefficient', 'range': [-1, 1]},
             template='plotly_white'
         )
-    }
-    return bar_figure
+    )
+
+def stock_figures(selected_ticker):
+    version = processed_store.version(selected_ticker)
+    return figure_cache.get_or_build(('stock', selected_ticker, version), lambda: figure_json(build_stock_figures(selected_ticker)))
+
+def sentiment_figures(selected_ticker):
+    version = merged_store.version(selected_ticker)
+    return figure_cache.get_or_build(('sentiment', selected_ticker, version), lambda: figure_json(build_sentiment_figures(selected_ticker)))
+
+def rolling_correlation_figure(selected_ticker):
+    version = rolling_store.version(selected_ticker) or merged_store.version(selected_ticker)
+    return figure_cache.get_or_build(('rolling', selected_ticker, version), lambda: figure_json(build_rolling_correlation_figure(selected_ticker)))
+
+# The bar plot only depends on the summary file, so it is built once at startup.
+correlation_bar_figure = build_correlation_bar_figure()
+
+def precompute_figures():
+    """
+    Builds the default ticker's figures ahead of the first request. Set DASHBOARD_PRECOMPUTE=all to
+    build every ticker's (this loads every ticker, so startup memory grows with the universe).
+    """
+    tickers = available_tickers if os.environ.get('DASHBOARD_PRECOMPUTE') == 'all' else [DEFAULT_TICKER]
+    for ticker in sorted(tickers, key=lambda t: t != DEFAULT_TICKER):
+        if figure_cache.stats()['bytes'] >= 0.9 * figure_cache.max_bytes:
+            break # Leave the rest of the cache for tickers users actually open
+        stock_figures(ticker)
+        sentiment_figures(ticker)
+        rolling_correlation_figure(ticker)
+
+threading.Thread(target=precompute_figures, name='figure-precompute', daemon=True).start()
+
+# Callback for Stock Price and Technical Indicators
+# Zooming any of the three plots redraws all of them at full detail for the visible dates;
+# resetting the zoom serves the cached downsampled figures again.
+@app.callback(
+    Output('stock-price-plot', 'figure'),
+    Output('rsi-plot', 'figure'),
+    Output('macd-plot', 'figure'),
+    Input('ticker-dropdown', 'value'),
+    Input('stock-price-plot', 'relayoutData'),
+    Input('rsi-plot', 'relayoutData'),
+    Input('macd-plot', 'relayoutData')
+)
+def update_stock_plots(selected_ticker, *relayout_data):
+    x_range = None if ctx.triggered_id in (None, 'ticker-dropdown') else relayout_x_range(ctx.triggered[0]['value'])
+    if x_range is no_update:
+        return no_update, no_update, no_update
+    if x_range is None:
+        return stock_figures(selected_ticker)
+    return build_stock_figures(selected_ticker, x_range)
+
+
+# Callback for Sentiment Plot and Correlation Scatter Plot
+@app.callback(
+    Output('sentiment-plot', 'figure'),
+    Output('sentiment-return-scatter', 'figure'),
+    Input('ticker-dropdown', 'value'),
+    Input('sentiment-plot', 'relayoutData')
+)
+def update_sentiment_plots(selected_ticker, relayout_data):
+    x_range = None if ctx.triggered_id in (None, 'ticker-dropdown') else relayout_x_range(relayout_data)
+    if x_range is no_update:
+        return no_update, no_update
+    if x_range is None:
+        return sentiment_figures(selected_ticker)
+    df_merged = merged_store.get(selected_ticker)
+    if df_merged is None or df_merged.empty:
+        return {}, no_update
+    return build_sentiment_figure(selected_ticker, df_merged, x_range), no_update
+
+
+# Callback for the Rolling Correlation Plot
+@app.callback(
+    Output('rolling-correlation-plot', 'figure'),
+    Input('ticker-dropdown', 'value')
+)
+def update_rolling_correlation_plot(selected_ticker):
+    return rolling_correlation_figure(selected_ticker)
+
+
+# Callback for Overall Correlation Bar Plot (independent of dropdown)
+@app.callback(
+    Output('correlation-bar-plot', 'figure'),
+    Input('ticker-dropdown', 'value') # Using an input to trigger update, but data is static
+)
+def update_correlation_bar_plot(selected_ticker): # selected_ticker is unused, but required by Input
+    return correlation_bar_figure
 
 
 # --- 5. Run the App ---
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Compact dtypes for the news and price frames (the optional `compact=True` mode of
+# news_processor.load_financial_news_data and data_loader.load_all_historical_data):
+#   - repeated strings (publisher, stock) become categoricals; the URL column is dropped or categorized
+#   - days are stored as int32 day numbers since 1970-01-01 instead of a datetime copy
+#   - integer columns (e.g. Volume) become int32 when every value fits
+#   - derived float columns (indicators, metrics, sentiment scores) become float32; the raw
+#     prices stay float64, and whole-number floats (Dividends, Stock Splits) are not made integers,
+#     so a column has the same dtype in every ticker's frame
+# The merges reject integer dates, so convert day numbers back with from_day_numbers before merging.
+
+NEWS_CATEGORY_COLUMNS = ['publisher', 'stock']
+RAW_PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Dividends', 'Stock Splits']
+
+def frame_bytes(df):
+    """Memory used by df, including the index and the contents of Python string objects."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def to_day_numbers(dates):
+    """Days since 1970-01-01 of each date's calendar day (in its own time zone) as int32, or Int32 with missing dates."""
+    dates = pd.to_datetime(pd.Series(dates))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy(dtype='datetime64[D]').astype('int64')
+    if dates.isna().any():
+        return pd.Series(days, index=dates.index).where(dates.notna()).astype('Int32')
+    return pd.Series(days.astype('int32'), index=dates.index)
+
+def from_day_numbers(days):
+    """Inverse of to_day_numbers: tz-naive midnight timestamps."""
+    return pd.to_datetime(pd.Series(days).astype('float64'), unit='D')
+
+def downcast_numeric(df, exclude=()):
+    """
+    Returns df with integer columns as int32 where every value fits (others are left as they are)
+    and float columns as float32 (about 7 significant digits) unless their values exceed its range.
+    Columns in `exclude` keep their dtype.
+    """
+    df = df.copy()
+    int32 = np.iinfo('int32')
+    for col in df.columns:
+        if col in exclude:
+            continue
+        values = df[col]
+        if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values) or isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            continue
+        if pd.api.types.is_integer_dtype(values):
+            if values.empty or (values.min() >= int32.min and values.max() <= int32.max):
+                df[col] = values.astype('int32')
+            continue
+        array = values.to_numpy()
+        if np.abs(array[np.isfinite(array)]).max(initial=0) < np.finfo('float32').max:
+            df[col] = array.astype('float32')
+    return df
+
+def compact_news(df, drop_url=True):
+    """
+    Compact copy of a news frame: unnamed index columns are dropped, publisher and stock become
+    categoricals, the URL is dropped (or categorized with drop_url=False), publication_day becomes
+    int32 day numbers and float columns (e.g. sentiment scores) float32.
+    """
+    df = df.drop(columns=[col for col in df.columns if str(col).startswith('Unnamed:')])
+    if 'url' in df.columns:
+        df = df.drop(columns='url') if drop_url else df.assign(url=df['url'].astype('category'))
+    for col in NEWS_CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'publication_day' in df.columns and not pd.api.types.is_integer_dtype(df['publication_day']):
+        df['publication_day'] = to_day_numbers(df['publication_day'])
+    return downcast_numeric(df, exclude=['publication_day'])
+
+def compact_prices(df):
+    """
+    Compact copy of a price or indicator frame: Volume and the derived indicator and metric columns
+    are downcast (see downcast_numeric), the raw prices in RAW_PRICE_COLUMNS stay float64. The Date index is kept.
+    """
+    return downcast_numeric(df, exclude=RAW_PRICE_COLUMNS)
+
+def memory_report(frames):
+    """
+    Bytes per row before and after compaction for {name: (before, after)} frames, with a 'total' row.
+    """
+    rows = []
+    for name, (before, after) in frames.items():
+        rows.append({'frame': name, 'rows': len(before), 'bytes_before': frame_bytes(before), 'bytes_after': frame_bytes(after)})
+    report = pd.DataFrame(rows, columns=['frame', 'rows', 'bytes_before', 'bytes_after'])
+    if len(report) > 1:
+        report.loc[len(report)] = ['total', report['rows'].sum(), report['bytes_before'].sum(), report['bytes_after'].sum()]
+    rows = report['rows'].where(report['rows'] > 0)
+    report['bytes_per_row_before'] = report['bytes_before'] / rows
+    report['bytes_per_row_after'] = report['bytes_after'] / rows
+    report['reduction'] = 1 - report['bytes_after'] / report['bytes_before']
+    return report
+
+if __name__ == '__main__':
+    import os
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from benchmarks import synthetic
+    from technical_analysis import add_all_common_indicators
+    from financial_metrics import add_all_common_financial_metrics
+    print("Testing compact.py:")
+    tickers = synthetic.make_tickers(5)
+    news = synthetic.make_news_data(200000, tickers)
+    news = news.reset_index().rename(columns={'index': 'Unnamed: 0'})
+    news['date'] = pd.to_datetime(news['date'], utc=True)
+    news['publication_day'] = news['date'].dt.normalize()
+    news['daily_avg_sentiment'] = np.random.default_rng(0).uniform(-1, 1, len(news)).round(4)
+    compact = compact_news(news)
+    frames = {'news': (news, compact)}
+    for ticker, prices in synthetic.make_price_data(tickers, years=10).items():
+        processed = add_all_common_financial_metrics(add_all_common_indicators(prices))
+        frames[ticker] = (processed, compact_prices(processed))
+    print(memory_report(frames).to_string(index=False))
+    print(compact.dtypes)
+    days_ok = (from_day_numbers(compact['publication_day']).to_numpy() == news['publication_day'].dt.tz_localize(None).to_numpy()).all()
+    print(f"publication_day round-trips: {days_ok}")
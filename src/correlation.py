@@ -0,0 +1,137 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+def _naive_dates(dates):
+    """
+    Normalizes dates to tz-naive midnight so news days and trading days compare equal.
+    Integer columns raise: they could be day numbers, YYYYMMDD or epoch seconds, so compact
+    day numbers must be converted with compact.from_day_numbers first.
+    """
+    if pd.api.types.is_integer_dtype(dates):
+        raise ValueError(f"Integer dates in '{dates.name}' are ambiguous. Convert compact day numbers with compact.from_day_numbers first.")
+    dates = pd.to_datetime(dates)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize()
+
+def stack_returns(stock_returns, columns=['Close', 'Daily_Return'], ticker_col='stock'):
+    """Stacks {ticker: DataFrame indexed by Date} into one long (Date, ticker) frame with a single concat."""
+    frames = {ticker: df[[col for col in columns if col in df.columns]] for ticker, df in stock_returns.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=['Date', ticker_col] + list(columns))
+    long = pd.concat(frames, names=[ticker_col, 'Date']).reset_index()
+    long['Date'] = _naive_dates(long['Date'])
+    return long[['Date', ticker_col] + [col for col in long.columns if col not in ('Date', ticker_col)]]
+
+def merge_sentiment_returns(daily_avg_sentiment, stock_returns, lags=[0], return_col='Daily_Return', ticker_col='stock'):
+    """
+    Merges the daily sentiment table with every ticker's returns in one keyed merge on
+    (Date, ticker). For each lag k > 0 a `{return_col}_t+k` column holds the return k trading
+    days later, so lagged correlations reuse the same merge.
+    `stock_returns` is a {ticker: DataFrame} dict or an already stacked long frame.
+    """
+    returns = stack_returns(stock_returns, ticker_col=ticker_col) if isinstance(stock_returns, dict) else stock_returns.copy()
+    returns = returns.sort_values([ticker_col, 'Date'], kind='stable')
+    grouped = returns.groupby(ticker_col, sort=False)[return_col]
+    for k in lags:
+        if k > 0:
+            returns[f'{return_col}_t+{k}'] = grouped.shift(-k)
+
+    sentiment = daily_avg_sentiment.copy()
+    sentiment['Date'] = _naive_dates(sentiment['Date'])
+    merged = pd.merge(sentiment, returns, on=['Date', ticker_col], how='inner')
+    # Drop rows without a same-day return (the first day of each ticker), as the notebook did
+    return merged.dropna(subset=[return_col]).reset_index(drop=True)
+
+def _grouped_pearson(keys, x, y):
+    """Pearson r and sample count per group, from centered per-group sums in one vectorized pass."""
+    frame = pd.DataFrame({'key': keys, 'x': x, 'y': y})
+    grouped = frame.groupby('key', sort=True)
+    dx = frame['x'] - grouped['x'].transform('mean')
+    dy = frame['y'] - grouped['y'].transform('mean')
+    sums = pd.DataFrame({'xy': dx * dy, 'xx': dx * dx, 'yy': dy * dy, 'key': frame['key']}).groupby('key', sort=True).sum()
+    n = grouped.size()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = sums['xy'] / np.sqrt(sums['xx'] * sums['yy'])
+    r[n < 2] = np.nan
+    return r.clip(-1, 1), n
+
+def _p_value(r, n):
+    """Two-sided p-value of a correlation coefficient under the t distribution with n - 2 degrees of freedom."""
+    dof = n - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt(dof / (1 - r * r))
+    p = 2 * stats.t.sf(np.abs(t), dof)
+    return pd.Series(np.where(dof > 0, p, np.nan), index=r.index)
+
+def correlation_summary(merged, lags=[0], sentiment_col='daily_avg_sentiment', return_col='Daily_Return', ticker_col='stock'):
+    """
+    Computes per-ticker Pearson and Spearman correlations (with sample counts and p-values)
+    between sentiment on day t and the return on day t+k for each lag k, grouped over all
+    tickers at once. Returns one row per (Ticker, Lag).
+    """
+    results = []
+    for k in lags:
+        target = return_col if k == 0 else f'{return_col}_t+{k}'
+        valid = merged[[ticker_col, sentiment_col, target]].dropna()
+        if valid.empty:
+            continue
+        keys, x, y = valid[ticker_col], valid[sentiment_col], valid[target]
+        pearson, n = _grouped_pearson(keys, x, y)
+        # Spearman is Pearson on within-ticker ranks.
+        x_rank = x.groupby(keys).rank(method='average')
+        y_rank = y.groupby(keys).rank(method='average')
+        spearman, _ = _grouped_pearson(keys, x_rank, y_rank)
+        results.append(pd.DataFrame({
+            'Ticker': pearson.index,
+            'Lag': k,
+            'N': n.to_numpy(),
+            'Pearson': pearson.to_numpy(),
+            'Pearson_p_value': _p_value(pearson, n).to_numpy(),
+            'Spearman': spearman.to_numpy(),
+            'Spearman_p_value': _p_value(spearman, n).to_numpy(),
+        }))
+    if not results:
+        return pd.DataFrame(columns=['Ticker', 'Lag', 'N', 'Pearson', 'Pearson_p_value', 'Spearman', 'Spearman_p_value'])
+    return pd.concat(results, ignore_index=True)
+
+def write_correlation_outputs(merged, summary, output_dir='../data/processed/', ticker_col='stock'):
+    """
+    Writes the dashboard inputs: overall_correlation_summary.csv (same-day correlations, keeping the
+    Sentiment_vs_Daily_Return_Correlation column the dashboard reads), lagged_correlation_summary.csv
+    (all lags) and one {ticker}_merged_correlation_data.csv per ticker.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    overall = summary[summary['Lag'] == 0].drop(columns='Lag')
+    overall = overall.rename(columns={'Pearson': 'Sentiment_vs_Daily_Return_Correlation'})
+    overall.to_csv(os.path.join(output_dir, 'overall_correlation_summary.csv'), index=False)
+    summary.to_csv(os.path.join(output_dir, 'lagged_correlation_summary.csv'), index=False)
+    for ticker, df in merged.groupby(ticker_col, sort=False):
+        df.to_csv(os.path.join(output_dir, f'{ticker}_merged_correlation_data.csv'), index=False)
+    return overall
+
+if __name__ == '__main__':
+    print("Testing correlation.py:")
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2023-01-02', periods=250)
+    stock_returns = {}
+    sentiment_frames = []
+    for ticker in ['AAPL', 'TSLA', 'GOOG']:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        stock_returns[ticker] = pd.DataFrame({'Close': close}, index=pd.Index(dates, name='Date'))
+        stock_returns[ticker]['Daily_Return'] = stock_returns[ticker]['Close'].pct_change()
+        news_days = rng.choice(dates, 120, replace=False)
+        sentiment_frames.append(pd.DataFrame({
+            'Date': pd.DatetimeIndex(news_days).tz_localize('UTC'),
+            'stock': ticker,
+            'daily_avg_sentiment': rng.uniform(-1, 1, len(news_days)),
+        }))
+    daily_avg_sentiment = pd.concat(sentiment_frames, ignore_index=True)
+
+    merged = merge_sentiment_returns(daily_avg_sentiment, stock_returns, lags=range(0, 4))
+    summary = correlation_summary(merged, lags=range(0, 4))
+    print(summary)
+    for ticker, df in merged.groupby('stock'):
+        print(f"{ticker}: pandas .corr = {df['daily_avg_sentiment'].corr(df['Daily_Return']):.6f}")
@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+from storage import list_tickers, load_manifest, read_dataset, dataset_version
+
+class TickerStore:
+    """
+    Lazy, bounded access to one dataset kind (e.g. 'processed_stock_data') for the dashboard.
+    At startup it only indexes which tickers exist; a ticker's frame is read the first time
+    get() asks for it and kept in an LRU of at most `max_loaded` frames, so memory grows with
+    the tickers users actually open. Frames are reloaded when their file changes
+    (storage.dataset_version). Convert the data to Arrow (storage.convert_csv_dir(..., fmt='arrow'))
+    so loaded frames are memory-mapped and shared between worker processes.
+    """
+
+    def __init__(self, data_dir, kind, max_loaded=16):
+        self.data_dir = data_dir
+        self.kind = kind
+        self.max_loaded = max_loaded
+        self._lock = threading.Lock()
+        self._frames = OrderedDict() # ticker -> (version, DataFrame)
+        self.refresh()
+
+    def refresh(self):
+        """Re-indexes the available tickers and columnar manifest (e.g. after new files are written)."""
+        manifest = load_manifest(self.data_dir)
+        tickers = list_tickers(self.data_dir, self.kind)
+        with self._lock:
+            self.manifest, self.tickers = manifest, tickers
+
+    def __contains__(self, ticker):
+        return ticker in self.tickers
+
+    def version(self, ticker):
+        """Version token of the ticker's file, or None if the ticker has no data."""
+        if ticker not in self:
+            return None
+        return dataset_version(self.data_dir, ticker, self.kind, self.manifest)
+
+    def get(self, ticker):
+        """Returns the ticker's DataFrame, loading it on first use, or None if it has no data."""
+        version = self.version(ticker)
+        if version is None:
+            return None
+        with self._lock:
+            cached = self._frames.get(ticker)
+            if cached is not None and cached[0] == version:
+                self._frames.move_to_end(ticker)
+                return cached[1]
+        df = read_dataset(self.data_dir, ticker, self.kind, manifest=self.manifest)
+        with self._lock:
+            self._frames[ticker] = (version, df)
+            self._frames.move_to_end(ticker)
+            while len(self._frames) > self.max_loaded:
+                self._frames.popitem(last=False)
+        return df
+
+    def loaded(self):
+        """Tickers currently held in memory, least recently used first."""
+        with self._lock:
+            return list(self._frames)
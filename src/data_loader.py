@@ -1,28 +1,91 @@
 import pandas as pd
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from storage import list_tickers, load_manifest, read_dataset
+from instrumentation import stage
+from compact import compact_prices, frame_bytes
 
-def load_all_historical_data(data_dir='../data'):
-    historical_dfs = {}
-    for filename in os.listdir(data_dir):
-        if filename.endswith('_historical_data.csv'):
-            filepath = os.path.join(data_dir, filename)
-            ticker = filename.split('_')[0]
-            try:
-                df = pd.read_csv(filepath)
-                df['Date'] = pd.to_datetime(df['Date'])
-                df = df.set_index('Date').sort_index()
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
 
-                for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                    else:
-                        print(f"Warning: Column '{col}' not found in {filename}. Some TA-Lib functions might fail.")
-                df.dropna(subset=['Open', 'High', 'Low', 'Close'], inplace=True)
+def _load_ticker(data_dir, ticker, columns, date_range, manifest, compact=False):
+    """Loads and cleans one ticker. Returns (ticker, DataFrame or None, report row)."""
+    filename = f'{ticker}_historical_data.csv'
+    report = {'ticker': ticker, 'file': filename, 'rows': 0, 'seconds': 0.0, 'status': 'ok', 'message': '',
+              'bytes_per_row_before': None, 'bytes_per_row': None}
+    start = time.perf_counter()
+    df = None
+    try:
+        # Dates (and, for clean files, numeric dtypes) are parsed once by the reader;
+        # only columns that came back non-numeric need coercing.
+        with stage('read_dataset', ticker=ticker) as timing:
+            df = read_dataset(data_dir, ticker, 'historical_data', columns=columns, date_range=date_range, manifest=manifest)
+            timing.rows = len(df)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
 
-                historical_dfs[ticker] = df
-                print(f"Loaded {ticker} data from {filename}")
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
+        missing = []
+        for col in PRICE_COLUMNS + ['Volume']:
+            if columns is not None and col not in columns:
+                continue
+            if col not in df.columns:
+                missing.append(col)
+            elif not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        if missing:
+            report['status'] = 'warning'
+            report['message'] = f"Column(s) {missing} not found in {filename}. Some TA-Lib functions might fail."
+        price_cols = [col for col in PRICE_COLUMNS if col in df.columns]
+        if df[price_cols].isna().any(axis=None):
+            df = df.dropna(subset=price_cols)
+        report['rows'] = len(df)
+        if len(df):
+            report['bytes_per_row_before'] = report['bytes_per_row'] = frame_bytes(df) / len(df)
+        if compact:
+            df = compact_prices(df)
+            if len(df):
+                report['bytes_per_row'] = frame_bytes(df) / len(df)
+    except Exception as e:
+        df = None
+        report['status'] = 'error'
+        report['message'] = f"Error loading {filename}: {e}"
+    report['seconds'] = time.perf_counter() - start
+    return ticker, df, report
+
+def load_all_historical_data(data_dir='../data', tickers=None, columns=None, date_range=None, max_workers=None, use_processes=False, return_report=False, compact=False):
+    """
+    Loads historical data for every ticker in data_dir (or only `tickers`) in parallel,
+    reading the columnar copy (see storage.py) when one is up to date and the CSV otherwise.
+    `columns` and `date_range=(start, end)` restrict what is read from disk.
+    Files are loaded on a thread pool, or a process pool with `use_processes=True`.
+    With `compact=True`, Volume is stored as int32 and derived columns as float32, while the raw
+    prices stay float64 (see compact.py).
+    With `return_report=True`, returns (data, report) where report has one row per file
+    with its row count, load time, status, any warning/error message and its in-memory
+    bytes per row before and after compaction.
+    """
+    manifest = load_manifest(data_dir)
+    available = list_tickers(data_dir, 'historical_data')
+    if tickers is not None:
+        wanted = set(tickers)
+        available = [ticker for ticker in available if ticker in wanted]
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with stage('load_all_historical_data', tickers=len(available)) as timing:
+        with executor_class(max_workers=max_workers) as executor:
+            futures = [executor.submit(_load_ticker, data_dir, ticker, columns, date_range, manifest, compact) for ticker in available]
+            results = [future.result() for future in futures]
+        timing.rows = sum(row['rows'] for _, _, row in results)
+
+    historical_dfs = {ticker: df for ticker, df, _ in results if df is not None}
+    report = pd.DataFrame([row for _, _, row in results], columns=['ticker', 'file', 'rows', 'seconds', 'status', 'message', 'bytes_per_row_before', 'bytes_per_row'])
+    if return_report:
+        return historical_dfs, report
+    for message in report.loc[report['status'] != 'ok', 'message']:
+        print(message)
+    if compact and report['rows'].sum():
+        weights = report['rows'] / report['rows'].sum()
+        print(f"Compact dtypes: {(report['bytes_per_row_before'] * weights).sum():.1f} -> {(report['bytes_per_row'] * weights).sum():.1f} bytes per row")
     return historical_dfs
 
 # Add name == 'main' block for testing if not already there
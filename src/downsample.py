@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Server-side downsampling for plotting long series. Both methods return positions into the
+# input, so the plotted points are real observations, and both always keep the global maximum
+# and minimum so peaks survive any zoom level.
+#   lttb:   Largest-Triangle-Three-Buckets; keeps the visual shape of a line with few points.
+#   minmax: the min and max of each bucket; an envelope suited to bars and very noisy series.
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the points Largest-Triangle-Three-Buckets keeps from (x, y) (no NaNs).
+    The first and last points are always kept. Bucket averages are computed for all buckets
+    at once with cumulative sums; only the per-bucket argmax follows the chain of selected points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    x = x - x[0] # Keeps the triangle areas well conditioned for epoch-sized x values
+    # Bucket i (0 <= i < n_out - 2) covers points [edges[i], edges[i + 1]); the first and last points are their own buckets.
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Average of the bucket after each bucket (the final point for the last bucket)
+    x_sums = np.concatenate([[0.0], np.cumsum(x)])
+    y_sums = np.concatenate([[0.0], np.cumsum(y)])
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    avg_x = (x_sums[next_end] - x_sums[next_start]) / counts
+    avg_y = (y_sums[next_end] - y_sums[next_start]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Twice the area of the triangle (point a, candidate j, next bucket average), for all j in the bucket
+        area = np.abs((x[a] - avg_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y, n_out):
+    """Positions of the minimum and maximum of each of n_out // 2 equal buckets of y (no NaNs), sorted."""
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(-(-n // size) * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(-1, size)
+    offsets = np.arange(len(buckets)) * size
+    return np.unique(np.concatenate([np.nanargmin(buckets, axis=1) + offsets, np.nanargmax(buckets, axis=1) + offsets]))
+
+def downsample_indices(x, y, n_out, method='lttb'):
+    """
+    Positions (sorted) of at most about n_out points of y to plot. NaN values are skipped and
+    the global maximum and minimum are always included.
+    """
+    y = np.asarray(y, dtype='float64')
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out:
+        return valid
+    values = y[valid]
+    if method == 'lttb':
+        kept = lttb_indices(np.asarray(x, dtype='float64')[valid], values, max(n_out - 2, 3))
+    elif method == 'minmax':
+        kept = minmax_indices(values, n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}'. Choose 'lttb' or 'minmax'.")
+    kept = np.union1d(kept, [np.argmax(values), np.argmin(values)])
+    return valid[kept]
+
+def _numeric_index(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype('float64')
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype='float64')
+    return np.arange(len(index), dtype='float64')
+
+def downsample_series(series, n_out, method='lttb'):
+    """Returns the subset of `series` (x = its index) to plot with at most about n_out points."""
+    if len(series) <= n_out:
+        return series.dropna()
+    return series.iloc[downsample_indices(_numeric_index(series.index), series.to_numpy(dtype='float64'), n_out, method)]
+
+if __name__ == '__main__':
+    import time
+    print("Testing downsample.py:")
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('1980-12-12', periods=11000)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates)))), index=dates)
+    close.iloc[:50] = np.nan
+    for method in ('lttb', 'minmax'):
+        start = time.perf_counter()
+        sampled = downsample_series(close, 2000, method)
+        elapsed = time.perf_counter() - start
+        print(f"{method}: {len(close)} -> {len(sampled)} points in {elapsed * 1000:.1f} ms, "
+              f"keeps max {sampled.max() == close.max()}, keeps min {sampled.min() == close.min()}")
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+class FigureCache:
+    """
+    Thread-safe LRU cache for built dashboard figures, bounded by total size in bytes.
+    Store figures serialized with figure_json (what Dash sends to the browser), so entries
+    are sized directly without re-serializing them. Keys should include a data version (e.g. storage.dataset_version) so figures are
+    rebuilt when the underlying files change. Concurrent requests for the same missing
+    key wait for a single build instead of each building the figure.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, sizeof=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or _figure_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {} # key -> Event set when the build finishes
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value # Too large to cache at all
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return value
+
+    def get_or_build(self, key, build):
+        """Returns the cached value for key, calling build() once to create it if needed."""
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                event = self._building.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._building[key] = threading.Event()
+                    break
+            event.wait() # Another request is building this key; use its result
+        try:
+            return self.put(key, build())
+        finally:
+            with self._lock:
+                del self._building[key]
+            event.set()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+def figure_json(value):
+    """
+    A figure (or tuple of figures) as to_plotly_json dicts. plotly 6+ base64-encodes numeric
+    arrays in them; plotly 5 keeps numpy arrays, which Dash serializes with PlotlyJSONEncoder.
+    """
+    if isinstance(value, tuple):
+        return tuple(figure_json(item) for item in value)
+    if hasattr(value, 'to_plotly_json'):
+        return value.to_plotly_json()
+    return value
+
+def _figure_size(value):
+    """
+    Approximate size of figure_json output as JSON text: string lengths plus 8 bytes per scalar;
+    numpy arrays (kept by plotly 5, and for dates and strings) by the text of their elements.
+    """
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _figure_size(item) for key, item in value.items())
+    if isinstance(value, (tuple, list)):
+        return sum(_figure_size(item) for item in value)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, 'dtype') and value.dtype.kind in 'MOSU':
+        return sum(len(str(item)) + 3 for item in value.ravel()) # Quotes and separator
+    if hasattr(value, 'dtype') and hasattr(value, 'ravel'):
+        return sum(len(repr(item)) + 1 for item in value.ravel().tolist()) # Separator
+    if hasattr(value, 'to_plotly_json'):
+        return _figure_size(value.to_plotly_json())
+    return 8
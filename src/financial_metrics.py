@@ -1,5 +1,7 @@
 import pandas as pd
 import numpy as np
+from panel import make_panel, panel_tickers, field_values, panel_from_arrays, compact, expand, rolling, panel_rows
+from instrumentation import instrumented
 
 def add_daily_returns(df, close_col='Close'):
     """Calculates daily percentage returns."""
@@ -21,6 +23,7 @@ def add_price_change(df, close_col='Close', open_col='Open'):
     df['Price_Change'] = df[close_col] - df[open_col]
     return df
 
+@instrumented()
 def add_all_common_financial_metrics(df, open_col='Open', high_col='High', low_col='Low', close_col='Close', volume_col='Volume'):
     """
     Adds a comprehensive set of common financial metrics to the DataFrame.
@@ -41,6 +44,34 @@ def add_all_common_financial_metrics(df, open_col='Open', high_col='High', low_c
 
     return df_copy
 
+@instrumented(rows=panel_rows)
+def add_panel_financial_metrics(panel, open_col='Open', close_col='Close', window=20, ticker_col='Ticker'):
+    """
+    Panel version of add_all_common_financial_metrics: computes Daily_Return, Log_Return,
+    Volatility and Price_Change for every ticker at once. `panel` may be a wide
+    (date x ticker) panel, a long frame or a {ticker: DataFrame} dict (see panel.make_panel).
+    Returns a wide panel with the metric fields added.
+    """
+    wide = make_panel(panel, ticker_col=ticker_col)
+    tickers = panel_tickers(wide)
+    close = field_values(wide, close_col, tickers)
+
+    # Returns are taken between a ticker's consecutive observations, as in its own DataFrame.
+    closes, order, counts = compact(close, ~np.isnan(close))
+    previous = np.vstack([np.full((1, closes.shape[1]), np.nan), closes[:-1]])
+    returns = closes / previous - 1
+    log_returns = np.log(closes / previous)
+    volatility = rolling(returns, window, ddof=1) * np.sqrt(252) # Annualized volatility
+
+    metrics = {
+        'Daily_Return': expand(returns, order, counts),
+        'Log_Return': expand(log_returns, order, counts),
+        'Volatility': expand(volatility, order, counts),
+        'Price_Change': close - field_values(wide, open_col, tickers),
+    }
+    new_fields = panel_from_arrays(metrics, wide.index, tickers, ticker_col=ticker_col)
+    return pd.concat([wide.drop(columns=list(metrics), level=0, errors='ignore'), new_fields], axis=1)
+
 if __name__ == '__main__':
     # This block runs only when financial_metrics.py is executed directly
     print("Testing financial_metrics.py:")
@@ -0,0 +1,248 @@
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+
+# Stateful, bar-by-bar versions of the indicators in technical_analysis.py and the metrics in
+# financial_metrics.py. Each calculator keeps only the state its window needs, so appending
+# new bars costs O(new bars) instead of recomputing the full history. Outputs match the batch
+# (TA-Lib / pandas) functions to floating-point tolerance and are NaN until warmed up.
+
+class SMA:
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, close):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(close)
+        self.total += close
+        return self.total / self.period if len(self.window) == self.period else np.nan
+
+class EMA:
+    """TA-Lib style EMA: seeded with the average of the first `period` values (after `skip` values)."""
+
+    def __init__(self, period, skip=0):
+        self.period = period
+        self.skip = skip
+        self.k = 2.0 / (period + 1)
+        self.seed = []
+        self.value = np.nan
+
+    def update(self, value):
+        if self.skip > 0:
+            self.skip -= 1
+            return np.nan
+        if math.isnan(self.value):
+            self.seed.append(value)
+            if len(self.seed) < self.period:
+                return np.nan
+            self.value = sum(self.seed) / self.period
+            self.seed = []
+        else:
+            self.value = (value - self.value) * self.k + self.value
+        return self.value
+
+class MACD:
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        # As in TA-Lib, the fast EMA is seeded on the window ending where the slow EMA starts.
+        self.fast = EMA(fastperiod, skip=slowperiod - fastperiod)
+        self.slow = EMA(slowperiod)
+        self.signal = EMA(signalperiod)
+
+    def update(self, close):
+        fast, slow = self.fast.update(close), self.slow.update(close)
+        if math.isnan(slow):
+            return np.nan, np.nan, np.nan
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return np.nan, np.nan, np.nan
+        return macd, signal, macd - signal
+
+class Wilder:
+    """Wilder smoothing: average of the first `period` values, then (prev * (period - 1) + value) / period."""
+
+    def __init__(self, period):
+        self.period = period
+        self.seed = []
+        self.value = np.nan
+
+    def update(self, value):
+        if math.isnan(self.value):
+            self.seed.append(value)
+            if len(self.seed) < self.period:
+                return np.nan
+            self.value = sum(self.seed) / self.period
+            self.seed = []
+        else:
+            self.value = (self.value * (self.period - 1) + value) / self.period
+        return self.value
+
+class RSI:
+    def __init__(self, period=14):
+        self.gain = Wilder(period)
+        self.loss = Wilder(period)
+        self.prev_close = None
+
+    def update(self, close):
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return np.nan
+        change = close - prev_close
+        gain = self.gain.update(change if change > 0 else 0.0)
+        loss = self.loss.update(-change if change < 0 else 0.0)
+        if math.isnan(gain):
+            return np.nan
+        return 100 * gain / (gain + loss) if gain + loss != 0 else 0.0
+
+class BollingerBands:
+    def __init__(self, timeperiod=20, nbdevup=2, nbdevdn=2):
+        self.window = deque(maxlen=timeperiod)
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+
+    def update(self, close):
+        self.window.append(close)
+        if len(self.window) < self.window.maxlen:
+            return np.nan, np.nan, np.nan
+        values = np.fromiter(self.window, dtype='float64', count=len(self.window))
+        middle, std = values.mean(), values.std()
+        return middle + self.nbdevup * std, middle, middle - self.nbdevdn * std
+
+class ATR:
+    def __init__(self, timeperiod=14):
+        self.average = Wilder(timeperiod)
+        self.prev_close = None
+
+    def update(self, high, low, close):
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return np.nan
+        return self.average.update(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+
+class OBV:
+    def __init__(self):
+        self.value = None
+        self.prev_close = None
+
+    def update(self, close, volume):
+        if self.value is None:
+            self.value = volume
+        elif close > self.prev_close:
+            self.value += volume
+        elif close < self.prev_close:
+            self.value -= volume
+        self.prev_close = close
+        return self.value
+
+class AD:
+    def __init__(self):
+        self.value = 0.0
+
+    def update(self, high, low, close, volume):
+        if high > low:
+            self.value += ((close - low) - (high - close)) / (high - low) * volume
+        return self.value
+
+class Returns:
+    """Daily and log returns between consecutive closes."""
+
+    def __init__(self):
+        self.prev_close = None
+
+    def update(self, close):
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return np.nan, np.nan
+        return close / prev_close - 1, math.log(close / prev_close)
+
+class RollingVolatility:
+    """Annualized rolling standard deviation of daily returns."""
+
+    def __init__(self, window=20):
+        self.returns = Returns()
+        self.window = deque(maxlen=window)
+
+    def update(self, close):
+        daily_return, _ = self.returns.update(close)
+        if math.isnan(daily_return):
+            return np.nan
+        self.window.append(daily_return)
+        if len(self.window) < self.window.maxlen:
+            return np.nan
+        values = np.fromiter(self.window, dtype='float64', count=len(self.window))
+        return values.std(ddof=1) * np.sqrt(252)
+
+class IncrementalIndicators:
+    """
+    Incremental counterpart of add_all_common_indicators (without STOCH and ADX) followed by
+    add_all_common_financial_metrics for a single ticker. Warm it up once with the history,
+    keep it (it pickles), then feed only the new bars:
+
+        updater = IncrementalIndicators.from_history(df_history)
+        new_rows = updater.update(df_new_bars)
+    """
+
+    def __init__(self, sma_periods=[10, 20, 50], rsi_period=14, fastperiod=12, slowperiod=26, signalperiod=9,
+                 bbands_period=20, nbdevup=2, nbdevdn=2, atr_period=14, volatility_window=20,
+                 open_col='Open', high_col='High', low_col='Low', close_col='Close', volume_col='Volume'):
+        self.columns = (open_col, high_col, low_col, close_col, volume_col)
+        self.smas = [(f'SMA_{p}', SMA(p)) for p in sma_periods]
+        self.rsi = RSI(rsi_period)
+        self.macd = MACD(fastperiod, slowperiod, signalperiod)
+        self.bbands = BollingerBands(bbands_period, nbdevup, nbdevdn)
+        self.obv = OBV()
+        self.ad = AD()
+        self.atr = ATR(atr_period)
+        self.returns = Returns()
+        self.volatility = RollingVolatility(volatility_window)
+
+    @classmethod
+    def from_history(cls, df, **kwargs):
+        """Creates an updater whose state reflects every bar in `df`."""
+        updater = cls(**kwargs)
+        updater.update(df)
+        return updater
+
+    def _update_bar(self, open_, high, low, close, volume):
+        row = [sma.update(close) for _, sma in self.smas]
+        row.append(self.rsi.update(close))
+        row.extend(self.macd.update(close))
+        row.extend(self.bbands.update(close))
+        row.append(self.obv.update(close, volume))
+        row.append(self.ad.update(high, low, close, volume))
+        row.append(self.atr.update(high, low, close))
+        row.extend(self.returns.update(close))
+        row.append(self.volatility.update(close))
+        row.append(close - open_)
+        return row
+
+    def update(self, bars):
+        """Consumes new bars (a DataFrame with OHLCV columns, in date order) and returns only those rows with indicators."""
+        names = [name for name, _ in self.smas] + [
+            'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'Upper_Band', 'Middle_Band', 'Lower_Band',
+            'OBV', 'AD', 'ATR', 'Daily_Return', 'Log_Return', 'Volatility', 'Price_Change']
+        values = bars[list(self.columns)].to_numpy(dtype='float64')
+        rows = [self._update_bar(*bar) for bar in values]
+        indicators = pd.DataFrame(np.array(rows, dtype='float64').reshape(len(rows), len(names)), index=bars.index, columns=names)
+        return pd.concat([bars.drop(columns=indicators.columns.intersection(bars.columns)), indicators], axis=1)
+
+if __name__ == '__main__':
+    from technical_analysis import add_all_common_indicators
+    from financial_metrics import add_all_common_financial_metrics
+    print("Testing incremental.py:")
+    test_data = {
+        'Date': pd.to_datetime(pd.date_range(start='2023-01-01', periods=300, freq='D')),
+        'Open': np.random.rand(300)*10 + 100, 'High': np.random.rand(300)*10 + 105,
+        'Low': np.random.rand(300)*10 + 95, 'Close': np.random.rand(300)*10 + 100,
+        'Volume': np.random.randint(10000, 50000, 300).astype(float)
+    }
+    test_df = pd.DataFrame(test_data).set_index('Date')
+    batch = add_all_common_financial_metrics(add_all_common_indicators(test_df))
+    updater = IncrementalIndicators.from_history(test_df.iloc[:250])
+    new_rows = pd.concat([updater.update(test_df.iloc[250:251]), updater.update(test_df.iloc[251:])])
+    expected = batch.loc[new_rows.index, new_rows.columns]
+    print(f"Max abs difference vs batch functions: {np.nanmax(np.abs(new_rows.to_numpy() - expected.to_numpy())):.2e}")
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import atexit
+import cProfile
+import functools
+import threading
+import tracemalloc
+
+try:
+    import resource
+except ImportError: # Windows: peak RSS is not reported
+    resource = None
+
+# Lightweight stage timing for the pipeline modules. Wrap a step in `with stage('name'):` or
+# decorate it with `@instrumented()`; each completed stage records wall time, rows processed,
+# rows/sec and memory, plus any fields given (e.g. ticker=...). Fields of enclosing stages are
+# inherited, so per-ticker attribution works by wrapping a loop body in stage('ticker', ticker=t).
+#
+# Disabled by default: stage() then returns a shared no-op object and decorated functions call
+# straight through, so instrumentation costs one flag check. Enable with enable(log_path=...) or
+# the PIPELINE_METRICS_LOG environment variable (one JSON object per line).
+#
+# Memory: 'rss' (default) records the process peak RSS when the stage ends and how much the stage
+# raised it; 'tracemalloc' records the peak traced allocation during the stage (exact per stage,
+# but slows allocation-heavy code). A single stage can also be profiled with cProfile and
+# tracemalloc (profile_stage=...), writing a .prof file and the top allocation sites.
+
+MEMORY_MODES = (None, 'rss', 'tracemalloc')
+
+class _Config:
+    enabled = False
+    log_path = None
+    memory = 'rss'
+    profile_stage = None
+    profile_dir = '.'
+    profile_top = 10
+
+_config = _Config()
+_records = []
+_lock = threading.Lock()
+_local = threading.local()
+
+def enable(log_path=None, memory='rss', profile_stage=None, profile_dir='.', profile_top=10):
+    """
+    Turns instrumentation on. Records are kept in memory (see records() and summary()) and,
+    with `log_path`, appended to that file as JSON lines. `profile_stage` names a stage to run
+    under cProfile + tracemalloc.
+    """
+    if memory not in MEMORY_MODES:
+        raise ValueError(f"Unknown memory mode '{memory}'. Choose from {MEMORY_MODES}.")
+    _config.log_path = log_path
+    _config.memory = memory
+    _config.profile_stage = profile_stage
+    _config.profile_dir = profile_dir
+    _config.profile_top = profile_top
+    if (memory == 'tracemalloc' or profile_stage) and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _config.enabled = True
+
+def disable():
+    _config.enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def is_enabled():
+    return _config.enabled
+
+def records():
+    """The stage records collected since enable() (or the last reset())."""
+    with _lock:
+        return list(_records)
+
+def reset():
+    with _lock:
+        _records.clear()
+
+def summary():
+    """Per-stage totals of the collected records as a DataFrame (calls, seconds, rows, rows/sec, peak memory)."""
+    import pandas as pd
+    frame = pd.DataFrame(records())
+    if frame.empty:
+        return frame
+    memory_col = 'peak_traced_bytes' if 'peak_traced_bytes' in frame else 'max_rss_bytes'
+    grouped = frame.groupby('stage', sort=False)
+    result = grouped.agg(calls=('seconds', 'size'), seconds=('seconds', 'sum'), rows=('rows', lambda rows: rows.sum(min_count=1)))
+    if memory_col in frame:
+        result['peak_bytes'] = grouped[memory_col].max()
+    result['rows_per_sec'] = result['rows'] / result['seconds']
+    return result.sort_values('seconds', ascending=False)
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+def _emit(record):
+    with _lock:
+        _records.append(record)
+        if _config.log_path:
+            with open(_config.log_path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+class Stage:
+    """A running stage; set `rows` (or add to `fields`) inside the with-block when only known later."""
+
+    def __init__(self, name, rows=None, fields=None):
+        self.name = name
+        self.rows = rows
+        self.fields = fields or {}
+        self._peak_traced = 0
+        self._profiler = None
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        if self.parent is not None:
+            self.fields = {**self.parent.fields, **self.fields}
+        self.path = f'{self.parent.path}/{self.name}' if self.parent is not None else self.name
+        stack.append(self)
+        if _config.memory == 'tracemalloc' and tracemalloc.is_tracing():
+            if self.parent is not None: # Keep the parent's peak so far before resetting it for this stage
+                self.parent._peak_traced = max(self.parent._peak_traced, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if _config.profile_stage == self.name:
+            self._snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+            self._profiler = cProfile.Profile()
+        self._rss_before = _max_rss_bytes() if _config.memory == 'rss' else None
+        self._start = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+        seconds = time.perf_counter() - self._start
+        _local.stack.pop()
+        record = {'stage': self.name, 'path': self.path, **self.fields, 'seconds': seconds, 'rows': self.rows,
+                  'rows_per_sec': self.rows / seconds if self.rows is not None and seconds > 0 else None,
+                  'status': 'ok' if exc_type is None else f'error: {exc_type.__name__}',
+                  'pid': os.getpid(), 'thread': threading.current_thread().name, 'end_time': time.time()}
+        if _config.memory == 'rss':
+            record['max_rss_bytes'] = _max_rss_bytes()
+            if self._rss_before is not None:
+                record['max_rss_delta_bytes'] = record['max_rss_bytes'] - self._rss_before
+        elif _config.memory == 'tracemalloc' and tracemalloc.is_tracing():
+            self._peak_traced = max(self._peak_traced, tracemalloc.get_traced_memory()[1])
+            record['peak_traced_bytes'] = self._peak_traced
+            if self.parent is not None:
+                self.parent._peak_traced = max(self.parent._peak_traced, self._peak_traced)
+        if self._profiler is not None:
+            record.update(self._write_profile())
+        _emit(record)
+        return False
+
+    def _write_profile(self):
+        os.makedirs(_config.profile_dir, exist_ok=True)
+        path = os.path.join(_config.profile_dir, f'{self.name}-{os.getpid()}-{int(time.time() * 1000)}.prof')
+        self._profiler.dump_stats(path)
+        result = {'profile_path': path}
+        if self._snapshot is not None:
+            stats = tracemalloc.take_snapshot().compare_to(self._snapshot, 'lineno')[:_config.profile_top]
+            result['top_allocations'] = [{'location': str(stat.traceback), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                                         for stat in stats]
+        return result
+
+class _NullStage:
+    """Shared do-nothing stage returned while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass # Ignore `s.rows = ...` on the shared instance
+
+    @property
+    def fields(self):
+        return {}
+
+_NULL_STAGE = _NullStage()
+
+def stage(name, rows=None, **fields):
+    """Context manager timing one stage: `with stage('load_ticker', ticker=t) as s: ...; s.rows = len(df)`."""
+    if not _config.enabled:
+        return _NULL_STAGE
+    return Stage(name, rows, fields)
+
+def _default_rows(result, *args, **kwargs):
+    first = args[0] if args else None
+    return len(first) if hasattr(first, '__len__') and not isinstance(first, str) else None
+
+def instrumented(name=None, rows=_default_rows):
+    """
+    Decorator form of stage(), named after the function by default. `rows(result, *args, **kwargs)`
+    returns the rows processed; by default the length of the first argument (e.g. the DataFrame).
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _config.enabled:
+                return func(*args, **kwargs)
+            with Stage(stage_name) as running:
+                result = func(*args, **kwargs)
+                running.rows = rows(result, *args, **kwargs)
+            return result
+        return wrapper
+    return decorator
+
+# Allow enabling from the environment, e.g. for a nightly run driven by notebooks or scripts
+if os.environ.get('PIPELINE_METRICS_LOG'):
+    enable(log_path=os.environ['PIPELINE_METRICS_LOG'], memory=os.environ.get('PIPELINE_METRICS_MEMORY', 'rss'),
+           profile_stage=os.environ.get('PIPELINE_PROFILE_STAGE'), profile_dir=os.environ.get('PIPELINE_PROFILE_DIR', '.'))
+    atexit.register(disable)
+
+if __name__ == '__main__':
+    import numpy as np
+    print("Testing instrumentation.py:")
+
+    @instrumented()
+    def square_all(values):
+        return np.square(values)
+
+    values = np.arange(100000, dtype='float64')
+    start = time.perf_counter()
+    for _ in range(100000):
+        with stage('noop'):
+            pass
+    print(f"Disabled stage overhead: {(time.perf_counter() - start) / 100000 * 1e9:.0f} ns per stage")
+
+    for memory in ('rss', 'tracemalloc'):
+        reset()
+        enable(memory=memory, profile_stage='square_all' if memory == 'tracemalloc' else None, profile_dir='.')
+        for ticker in ('AAPL', 'TSLA'):
+            with stage('ticker', ticker=ticker):
+                square_all(values)
+        disable()
+        for record in records():
+            print({key: record.get(key) for key in ('path', 'ticker', 'seconds', 'rows', 'max_rss_bytes', 'peak_traced_bytes', 'profile_path')})
+        print(summary())
@@ -0,0 +1,245 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+# Streaming keyword / n-gram counting over processed headlines. Headlines are consumed in
+# chunks and n-grams never span two headlines. Words are encoded as integer ids, so an n-gram
+# is a row of n ints (plus a group id) instead of a tuple of strings.
+#   exact:       each chunk's n-grams are hashed to integer keys, counted and merged; exact results.
+#   approximate: counts go into a Count-Min sketch of fixed size and only the `capacity`
+#                highest-estimated n-grams per group are kept as candidates, so memory stays
+#                bounded however many distinct n-grams the corpus has. Counts may be overestimated.
+
+COUNTER_MODES = ('exact', 'approximate')
+ALL_GROUPS = 0 # Group id of the ungrouped totals in approximate mode
+
+class KeywordCounter:
+    def __init__(self, n_gram=1, mode='exact', width=2**20, depth=4, capacity=1000, seed=0):
+        if mode not in COUNTER_MODES:
+            raise ValueError(f"Unknown counter mode '{mode}'. Choose from {COUNTER_MODES}.")
+        if n_gram < 1:
+            raise ValueError("n_gram must be at least 1.")
+        self.n_gram = n_gram
+        self.mode = mode
+        self.words = [] # id -> word
+        self.word_ids = {} # word -> id
+        self.groups = [None] # group id -> group label (id 0 is the ungrouped total)
+        self.group_ids = {}
+        self.tokens_seen = 0
+        self.headlines_seen = 0
+        # Exact mode: reduced (rows, counts, first position) plus chunks not yet merged
+        self._rows = np.empty((0, n_gram + 1), dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._first = np.empty(0, dtype=np.int64)
+        self._pending = []
+        # Approximate mode: width must be a power of two for multiply-shift hashing
+        if mode == 'approximate':
+            self.width = 1 << int(np.ceil(np.log2(width)))
+            self.capacity = capacity
+            rng = np.random.default_rng(seed)
+            self._sketch = np.zeros((depth, self.width), dtype=np.int64)
+            self._multipliers = rng.integers(1, 2**63, size=(depth, n_gram + 1), dtype=np.uint64) | np.uint64(1)
+            self._offsets = rng.integers(0, 2**63, size=depth, dtype=np.uint64)
+            self._candidates = np.empty((0, n_gram + 1), dtype=np.int64)
+
+    def _encode(self, values, ids, labels):
+        """Maps values to stable integer ids, assigning new ids in order of first appearance."""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        mapping = np.fromiter((ids.get(value, -1) for value in uniques), dtype=np.int64, count=len(uniques))
+        new = np.flatnonzero(mapping < 0)
+        mapping[new] = np.arange(len(labels), len(labels) + len(new))
+        ids.update(zip(uniques[new], mapping[new].tolist()))
+        labels.extend(uniques[new])
+        return mapping[codes]
+
+    def update(self, texts, groups=None):
+        """Counts the n-grams of one chunk of headlines (whitespace-separated tokens); `groups` labels each headline."""
+        texts = pd.Series(texts).reset_index(drop=True)
+        valid = texts.notna().to_numpy(copy=True)
+        if groups is not None: # Like groupby, headlines without a group label are skipped
+            groups = pd.Series(groups).reset_index(drop=True)
+            valid &= groups.notna().to_numpy()
+        tokens_per_text = [str(text).split() for text in texts[valid]]
+        lengths = np.fromiter(map(len, tokens_per_text), dtype=np.int64, count=len(tokens_per_text))
+        self.headlines_seen += len(tokens_per_text)
+        if groups is None:
+            group_of_text = np.full(len(lengths), ALL_GROUPS, dtype=np.int64)
+        else:
+            group_of_text = self._encode(groups[valid], self.group_ids, self.groups)
+        if lengths.sum() == 0:
+            return self
+        ids = self._encode(list(itertools.chain.from_iterable(tokens_per_text)), self.word_ids, self.words)
+        headline = np.repeat(np.arange(len(lengths)), lengths)
+
+        # An n-gram starts at token i if token i + n - 1 belongs to the same headline
+        n = self.n_gram
+        starts = np.arange(len(ids) - n + 1)
+        starts = starts[headline[starts] == headline[starts + n - 1]]
+        rows = np.empty((len(starts), n + 1), dtype=np.int64)
+        rows[:, 0] = group_of_text[headline[starts]]
+        for j in range(n):
+            rows[:, j + 1] = ids[starts + j]
+        positions = self.tokens_seen + starts
+        self.tokens_seen += len(ids)
+        if len(rows) == 0:
+            return self
+
+        unique_rows, first_index, inverse = _unique_rows(rows)
+        counts = np.bincount(inverse, minlength=len(unique_rows)).astype(np.int64)
+        if self.mode == 'exact':
+            self._pending.append((unique_rows, counts, positions[first_index]))
+            if len(self._pending) >= 8:
+                self._merge()
+        else:
+            if groups is not None: # Also count every n-gram towards the ungrouped total
+                totals = unique_rows.copy()
+                totals[:, 0] = ALL_GROUPS
+                unique_rows, _, inverse = _unique_rows(np.concatenate([unique_rows, totals]))
+                counts = np.bincount(inverse, weights=np.concatenate([counts, counts]), minlength=len(unique_rows)).astype(np.int64)
+            self._add_to_sketch(unique_rows, counts)
+        return self
+
+    def update_chunks(self, texts, groups=None, chunksize=100000):
+        """Counts a whole column (or any sequence) of headlines `chunksize` at a time."""
+        texts = pd.Series(texts).reset_index(drop=True)
+        groups = None if groups is None else pd.Series(groups).reset_index(drop=True)
+        for start in range(0, len(texts), chunksize):
+            self.update(texts.iloc[start:start + chunksize], None if groups is None else groups.iloc[start:start + chunksize])
+        return self
+
+    def _merge(self):
+        """Folds pending chunk counts into the running exact counts."""
+        if not self._pending:
+            return
+        rows = np.concatenate([self._rows] + [chunk[0] for chunk in self._pending])
+        counts = np.concatenate([self._counts] + [chunk[1] for chunk in self._pending])
+        first = np.concatenate([self._first] + [chunk[2] for chunk in self._pending])
+        self._pending = []
+        self._rows, _, inverse = _unique_rows(rows)
+        self._counts = np.zeros(len(self._rows), dtype=np.int64)
+        np.add.at(self._counts, inverse, counts)
+        self._first = np.full(len(self._rows), np.iinfo(np.int64).max)
+        np.minimum.at(self._first, inverse, first)
+
+    def _hash(self, rows):
+        """Sketch column of each row for every sketch row: ((row . a_d + b_d) mod 2^64) >> (64 - log2 width)."""
+        shift = np.uint64(64 - int(np.log2(self.width)))
+        keys = rows.astype(np.uint64)
+        with np.errstate(over='ignore'):
+            hashed = keys @ self._multipliers.T + self._offsets
+        return (hashed >> shift).astype(np.intp).T
+
+    def _estimate(self, rows):
+        columns = self._hash(rows)
+        return np.min(self._sketch[np.arange(len(columns))[:, None], columns], axis=0)
+
+    def _add_to_sketch(self, rows, counts):
+        for d, columns in enumerate(self._hash(rows)):
+            np.add.at(self._sketch[d], columns, counts)
+        # Candidates already held can only have grown; re-rank them together with this chunk's n-grams
+        candidates = _unique_rows(np.concatenate([self._candidates, rows]))[0]
+        self._candidates = candidates[_top_per_group(candidates[:, 0], self._estimate(candidates), self.capacity)]
+
+    def _counts_for(self, group):
+        """(rows, counts, tie-break order) for one group id, or summed over groups when group is None."""
+        if self.mode == 'approximate':
+            rows = self._candidates[self._candidates[:, 0] == (ALL_GROUPS if group is None else group)]
+            return rows, self._estimate(rows), np.arange(len(rows))
+        self._merge()
+        if group is not None:
+            keep = self._rows[:, 0] == group
+            return self._rows[keep], self._counts[keep], self._first[keep]
+        if len(self.groups) == 1:
+            return self._rows, self._counts, self._first
+        rows, _, inverse = _unique_rows(self._rows[:, 1:])
+        counts = np.zeros(len(rows), dtype=np.int64)
+        np.add.at(counts, inverse, self._counts)
+        first = np.full(len(rows), np.iinfo(np.int64).max)
+        np.minimum.at(first, inverse, self._first)
+        return np.column_stack([np.zeros(len(rows), dtype=np.int64), rows]), counts, first
+
+    def most_common(self, top_n=50, group=None):
+        """
+        The top_n n-grams as [(word, count)] for unigrams or [((w1, w2, ...), count)], like
+        Counter.most_common (ties in order of first appearance in exact mode). Pass a group
+        label to restrict to that group's headlines.
+        """
+        if group is not None and group not in self.group_ids:
+            return []
+        rows, counts, first = self._counts_for(None if group is None else self.group_ids[group])
+        order = np.lexsort((first, -counts))[:top_n]
+        words = np.asarray(self.words, dtype=object)
+        if self.n_gram == 1:
+            keys = words[rows[order, 1]].tolist()
+        else:
+            keys = [tuple(gram) for gram in words[rows[order, 1:]].tolist()]
+        return list(zip(keys, counts[order].tolist()))
+
+    def most_common_by_group(self, top_n=50):
+        """{group label: most_common(top_n, group)} for every group seen."""
+        return {label: self.most_common(top_n, label) for label in self.groups[1:]}
+
+def _unique_rows(rows):
+    """
+    Distinct rows of a non-negative int array (in first-appearance order) with the position of
+    each one's first occurrence and every row's index into them. Rows are hashed as a single
+    mixed-radix int64 key when they fit in 63 bits, else compared as whole rows.
+    """
+    radix = rows.max(axis=0) + 1 if len(rows) else np.ones(rows.shape[1], dtype=np.int64)
+    if np.log2(radix.astype('float64')).sum() < 63:
+        keys = rows[:, 0].copy()
+        for j in range(1, rows.shape[1]):
+            keys = keys * radix[j] + rows[:, j]
+        inverse, _ = pd.factorize(keys)
+    else:
+        inverse, _ = pd.factorize(pd.MultiIndex.from_arrays(rows.T))
+    # Codes are assigned in order of first appearance, so a row is a first occurrence when its code exceeds all earlier ones
+    first_index = np.flatnonzero(np.diff(np.maximum.accumulate(np.concatenate([[-1], inverse]))) > 0)
+    return rows[first_index], first_index, inverse
+
+def _top_per_group(groups, scores, k):
+    """Positions of the k highest scores within each group."""
+    order = np.lexsort((-scores, groups))
+    sorted_groups = groups[order]
+    group_start = np.searchsorted(sorted_groups, sorted_groups, side='left')
+    return order[np.arange(len(order)) - group_start < k]
+
+def count_keywords(texts, n_gram=1, top_n=50, groups=None, mode='exact', chunksize=100000, **kwargs):
+    """
+    Streams `texts` through a KeywordCounter. Returns most_common(top_n), or a
+    {group: most_common(top_n)} dict when `groups` labels each text.
+    """
+    counter = KeywordCounter(n_gram=n_gram, mode=mode, **kwargs).update_chunks(texts, groups, chunksize=chunksize)
+    return counter.most_common(top_n) if groups is None else counter.most_common_by_group(top_n)
+
+if __name__ == '__main__':
+    import time
+    from collections import Counter
+    print("Testing keyword_counter.py:")
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f'word{i}' for i in range(5000)], dtype=object)
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    lengths = rng.integers(3, 12, 200000)
+    tokens = rng.choice(vocabulary, lengths.sum(), p=weights / weights.sum())
+    headlines = pd.Series([' '.join(row) for row in np.split(tokens, np.cumsum(lengths)[:-1])])
+    stocks = pd.Series(rng.choice(['AAPL', 'TSLA', 'GOOG'], len(headlines)))
+
+    for n_gram in (1, 2, 3):
+        start = time.perf_counter()
+        expected = Counter(gram for text in headlines for gram in zip(*[text.split()[j:] for j in range(n_gram)])).most_common(10)
+        counter_time = time.perf_counter() - start
+        if n_gram == 1:
+            expected = [(gram[0], count) for gram, count in expected]
+        start = time.perf_counter()
+        exact = count_keywords(headlines, n_gram=n_gram, top_n=10)
+        exact_time = time.perf_counter() - start
+        start = time.perf_counter()
+        approximate = count_keywords(headlines, n_gram=n_gram, top_n=10, mode='approximate')
+        approximate_time = time.perf_counter() - start
+        overlap = len({key for key, _ in approximate} & {key for key, _ in expected})
+        print(f"{n_gram}-grams: Counter {counter_time:.2f}s, exact {exact_time:.2f}s (matches: {exact == expected}), "
+              f"approximate {approximate_time:.2f}s ({overlap}/10 of the top 10)")
+
+    by_stock = count_keywords(headlines, n_gram=2, top_n=3, groups=stocks)
+    expected_aapl = Counter(gram for text in headlines[stocks == 'AAPL'] for gram in zip(text.split(), text.split()[1:])).most_common(3)
+    print(f"AAPL bigrams match Counter: {by_stock['AAPL'] == expected_aapl}")
@@ -0,0 +1,163 @@
+import sys
+import time
+import random
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from collections import namedtuple
+
+# Compiled form of the TextBlob/pattern sentiment lexicon: one integer id per word.
+Lexicon = namedtuple('Lexicon', ['vocabulary', 'polarity', 'intensity', 'is_modifier', 'ends_ly', 'negations'])
+
+@lru_cache(maxsize=1)
+def load_lexicon():
+    """
+    Compiles the lexicon used by TextBlob's PatternAnalyzer into NumPy arrays indexed by
+    word id, including the derived "-ly" adverbs and the modifier/negation word sets.
+    """
+    from textblob.en import sentiment
+    if dict.__len__(sentiment) == 0:
+        sentiment.load()
+    words = sorted(dict.keys(sentiment))
+    entries = [dict.__getitem__(sentiment, w) for w in words]
+    return Lexicon(
+        vocabulary=pd.Index(words),
+        polarity=np.array([e[None][0] for e in entries], dtype='float64'),
+        intensity=np.array([e[None][2] for e in entries], dtype='float64'),
+        is_modifier=np.array([any(pos in e for pos in sentiment.modifiers) for e in entries], dtype=bool),
+        ends_ly=np.array([sentiment.modifier(w) for w in words], dtype=bool),
+        negations=pd.Index(sentiment.negations),
+    )
+
+def _group_any(flags, groups, n_groups):
+    return np.bincount(groups[flags], minlength=n_groups) > 0
+
+def score_polarity(texts):
+    """
+    Scores a column of preprocessed texts (lowercase, space-separated words longer than
+    two characters, as produced by preprocess_text) in one vectorized pass.
+    Reproduces TextBlob polarity exactly for such texts: known words are averaged,
+    a preceding intensifier ("very good") multiplies the next word's polarity,
+    and a preceding negation ("never good") flips it with factor -0.5.
+    Returns a float64 array aligned with `texts`.
+    """
+    lex = load_lexicon()
+    split = pd.Series(list(texts), dtype=object).fillna('').astype(str).str.split()
+    n_docs = len(split)
+    lengths = split.str.len().to_numpy(dtype='int64')
+    if n_docs == 0 or lengths.sum() == 0:
+        return np.zeros(n_docs, dtype='float64')
+
+    # Flatten all tokens into one array; `doc` maps each token back to its text.
+    tokens = np.fromiter((w for words in split for w in words), dtype=object, count=lengths.sum())
+    n_tokens = len(tokens)
+    doc = np.repeat(np.arange(n_docs), lengths)
+    positions = np.arange(n_tokens)
+    doc_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    has_prev = positions > doc_start
+
+    ids = lex.vocabulary.get_indexer(tokens)
+    known = ids >= 0
+    safe_ids = np.where(known, ids, 0)
+    is_modifier = known & lex.is_modifier[safe_ids]
+    ends_ly = known & lex.ends_ly[safe_ids]
+    is_negation = lex.negations.get_indexer(tokens) >= 0
+    unknown_negation = is_negation & ~known
+
+    # Unknown negations are the only tokens that can sit between a modifier and the word
+    # it modifies ("really never good"); find the last token before each position that isn't one.
+    anchor = np.where(unknown_negation, -1, positions)
+    anchor = np.maximum.accumulate(anchor)
+    prev_anchor = np.full(n_tokens, -1)
+    prev_anchor[1:] = anchor[:-1]
+    prev_anchor[~has_prev | (prev_anchor < doc_start)] = -1
+    safe_anchor = np.maximum(prev_anchor, 0)
+    anchor_ok = prev_anchor >= 0
+    anchor_is_modifier = anchor_ok & is_modifier[safe_anchor]
+    anchor_ends_ly = anchor_ok & ends_ly[safe_anchor]
+
+    # A modifier stays active for the next token, and across negations if it ends in "-ly".
+    modifier_active = anchor_is_modifier & ((prev_anchor == positions - 1) | anchor_ends_ly)
+    # A negation after an "-ly" modifier negates the modifier's chunk instead of the next word.
+    consumed_negation = unknown_negation & modifier_active & anchor_ends_ly
+    pending_negation = np.zeros(n_tokens, dtype=bool)
+    pending_negation[1:] = is_negation[:-1] & ~consumed_negation[:-1]
+    pending_negation &= has_prev
+
+    # Known words start a new chunk unless a modifier is active, in which case they extend it.
+    starts_chunk = known & ~modifier_active
+    chunk = np.cumsum(starts_chunk) - 1
+    n_chunks = int(starts_chunk.sum())
+    if n_chunks == 0:
+        return np.zeros(n_docs, dtype='float64')
+
+    known_pos = np.flatnonzero(known)
+    known_chunk = chunk[known_pos]
+    is_last = np.r_[known_chunk[1:] != known_chunk[:-1], True]
+    last_pos = known_pos[is_last]
+    prev_pos = np.r_[known_pos[0], known_pos[:-1]][is_last]
+
+    polarity = lex.polarity[safe_ids]
+    intensity = lex.intensity[safe_ids]
+    effective_intensity = np.where(pending_negation, 1.0 / intensity, intensity)
+    chunk_polarity = np.where(
+        modifier_active[last_pos],
+        np.clip(polarity[last_pos] * effective_intensity[prev_pos], -1.0, 1.0),
+        polarity[last_pos],
+    )
+    negated = _group_any(known & pending_negation, chunk, n_chunks)
+    negated |= _group_any(consumed_negation, chunk[safe_anchor], n_chunks)
+    chunk_polarity = np.where(negated, chunk_polarity * -0.5, chunk_polarity)
+
+    chunk_doc = doc[last_pos]
+    totals = np.bincount(chunk_doc, weights=chunk_polarity, minlength=n_docs)
+    counts = np.bincount(chunk_doc, minlength=n_docs)
+    return totals / np.maximum(counts, 1)
+
+def check_parity(texts):
+    """Compares score_polarity with TextBlob on the given texts. Returns the mismatching rows."""
+    from textblob import TextBlob
+    texts = list(texts)
+    expected = np.array([TextBlob(text).sentiment.polarity for text in texts])
+    actual = score_polarity(texts)
+    mismatch = actual != expected
+    return pd.DataFrame({'text': texts, 'textblob': expected, 'vectorized': actual})[mismatch]
+
+def sample_corpus(n=20000, seed=0):
+    """Builds a synthetic corpus of processed-headline-like texts from lexicon and filler words."""
+    lex = load_lexicon()
+    rng = random.Random(seed)
+    lexicon_words = [w for w in lex.vocabulary if w.isalpha() and len(w) > 2]
+    modifiers = [w for w, m in zip(lex.vocabulary, lex.is_modifier) if m and w.isalpha()]
+    fillers = ['stock', 'share', 'earnings', 'company', 'price', 'target', 'analyst', 'rating', 'never', 'not']
+    pools = [lexicon_words, modifiers, fillers]
+    return [
+        ' '.join(rng.choice(rng.choice(pools)) for _ in range(rng.randint(0, 12)))
+        for _ in range(n)
+    ]
+
+if __name__ == '__main__':
+    print("Testing lexicon_scorer.py:")
+    if len(sys.argv) > 1:
+        # Sample real headlines: python lexicon_scorer.py ../data/raw_analyst_ratings.csv
+        from news_processor import preprocess_text
+        headlines = pd.read_csv(sys.argv[1], usecols=['headline'])['headline']
+        corpus = [preprocess_text(h) for h in headlines.sample(min(20000, len(headlines)), random_state=0)]
+    else:
+        corpus = sample_corpus()
+
+    mismatches = check_parity(corpus)
+    print(f"Parity with TextBlob: {len(corpus) - len(mismatches)}/{len(corpus)} texts identical")
+    if not mismatches.empty:
+        print(mismatches.head())
+
+    from textblob import TextBlob
+    start = time.perf_counter()
+    [TextBlob(text).sentiment.polarity for text in corpus]
+    textblob_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score_polarity(corpus)
+    vectorized_time = time.perf_counter() - start
+    print(f"TextBlob:   {textblob_time:.3f}s ({len(corpus) / textblob_time:,.0f} texts/sec)")
+    print(f"Vectorized: {vectorized_time:.3f}s ({len(corpus) / vectorized_time:,.0f} texts/sec)")
+    print(f"Speedup: {textblob_time / vectorized_time:.1f}x")
@@ -1,11 +1,20 @@
 import pandas as pd
+import numpy as np
 import re
+import os
+import time
 import nltk
+import hashlib
+from importlib import metadata
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from textblob import TextBlob
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from lexicon_scorer import score_polarity
+from keyword_counter import count_keywords
+from instrumentation import instrumented, stage
+from compact import compact_news, memory_report
 
 # Ensure NLTK data is downloaded (run this once in your environment or a notebook)
 # nltk.download('punkt')
@@ -17,13 +26,28 @@ from collections import Counter
 stop_words = set(stopwords.words('english'))
 lemmatizer = WordNetLemmatizer()
 
-def load_financial_news_data(filepath='../data/processed/daily_aggregated_sentiment.csv'):
-    """Loads the main financial news dataset."""
+# Bump whenever preprocess_text or the scoring logic changes, so cached results are invalidated.
+PREPROCESS_VERSION = 1
+SENTIMENT_ENGINES = ('textblob', 'vectorized')
+
+def load_financial_news_data(filepath='../data/processed/daily_aggregated_sentiment.csv', compact=False, drop_url=True):
+    """
+    Loads the main financial news dataset. With `compact=True`, publisher and stock are
+    categoricals, the URL is dropped (kept as a categorical with drop_url=False) and
+    publication_day holds int32 day numbers (convert them with compact.from_day_numbers before
+    merge_sentiment_returns, which rejects integer dates);
+    the bytes per row before and after are printed.
+    """
     try:
         df = pd.read_csv(filepath)
         df['date'] = pd.to_datetime(df['date'], utc=True)
         df['publication_day'] = df['date'].dt.normalize() # For daily aggregation
         print(f"Loaded financial news data from {filepath}")
+        if compact:
+            compacted = compact_news(df, drop_url=drop_url)
+            report = memory_report({'news': (df, compacted)}).iloc[0]
+            print(f"Compact dtypes: {report['bytes_per_row_before']:.1f} -> {report['bytes_per_row_after']:.1f} bytes per row")
+            df = compacted
         return df
     except FileNotFoundError:
         print(f"Error: News data file not found at {filepath}")
@@ -37,23 +61,214 @@ def preprocess_text(text):
     tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words and len(word) > 2]
     return ' '.join(tokens)
 
-def add_sentiment_score(df, text_col='headline', processed_text_col='processed_headline'):
-    """Adds sentiment polarity score using TextBlob."""
-    if processed_text_col not in df.columns:
-        df[processed_text_col] = df[text_col].apply(preprocess_text)
-    df['daily_avg_sentiment'] = df[processed_text_col].apply(lambda x: TextBlob(x).sentiment.polarity)
+# Preprocessed form of every distinct word seen so far: its kept lemmas joined by spaces, or ''
+# when all of its tokens are filtered out. The vocabulary is tiny next to the token count, so
+# each word is tokenized, stopword-filtered and lemmatized once per process.
+_lemma_table = {}
+
+def _update_lemma_table(words):
+    for word in words:
+        if word not in _lemma_table:
+            # word_tokenize can still split a cleaned word (e.g. 'cannot' -> 'can', 'not')
+            _lemma_table[word] = ' '.join(lemmatizer.lemmatize(token) for token in word_tokenize(word)
+                                          if token not in stop_words and len(token) > 2)
+
+@instrumented()
+def preprocess_series(texts):
+    """
+    Bulk equivalent of [preprocess_text(text) for text in texts], with identical output.
+    Lowercasing, the regex and whitespace splitting run as pandas string operations over the
+    whole column; tokens are then mapped through the memoized vocabulary -> lemma table.
+    Returns a list of processed strings aligned with `texts`.
+    """
+    # Object dtype keeps Python's str/re semantics (the pyarrow string dtype treats \s differently)
+    cleaned = pd.Series([str(text) for text in texts], dtype=object).str.lower().str.replace(r'[^a-z\s]', '', regex=True)
+    words = cleaned.str.split()
+    _update_lemma_table(words.explode().dropna().unique())
+    lemmas = _lemma_table.__getitem__
+    return [' '.join(filter(None, map(lemmas, row))) for row in words]
+
+def benchmark_preprocessing(texts, repeat=3):
+    """Times preprocess_text per row against preprocess_series (best of `repeat`, cold lemma table) and checks they agree."""
+    texts = list(texts)
+    runs = {'preprocess_text': lambda: [preprocess_text(text) for text in texts], 'preprocess_series': lambda: preprocess_series(texts)}
+    timings, outputs = {}, {}
+    for label, run in runs.items():
+        timings[label] = float('inf')
+        for _ in range(repeat):
+            _lemma_table.clear()
+            start = time.perf_counter()
+            outputs[label] = run()
+            timings[label] = min(timings[label], time.perf_counter() - start)
+    return {**timings, 'rows': len(texts), 'identical': outputs['preprocess_text'] == outputs['preprocess_series']}
+
+def _textblob_polarity(texts):
+    """Scores a batch of texts with TextBlob polarity (runs inside pool workers)."""
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+def score_unique_texts(texts, n_jobs=None, chunksize=10000, engine='textblob', executor=None):
+    """
+    Scores a sequence of distinct texts. The 'textblob' engine spreads chunks of
+    `chunksize` texts over a process pool (`n_jobs=1` scores in-process; None uses
+    all cores; pass `executor` to reuse an existing pool across calls); the 'vectorized'
+    engine scores the whole column at once with the compiled lexicon from lexicon_scorer.
+    Returns a float64 array aligned with `texts`.
+    """
+    if engine not in SENTIMENT_ENGINES:
+        raise ValueError(f"Unknown sentiment engine '{engine}'. Choose from {SENTIMENT_ENGINES}.")
+    texts = list(texts)
+    if not texts:
+        return np.empty(0, dtype='float64')
+    if engine == 'vectorized':
+        return score_polarity(texts)
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if executor is not None and len(chunks) > 1:
+        results = list(executor.map(_textblob_polarity, chunks))
+    elif n_jobs == 1 or len(chunks) == 1:
+        results = [_textblob_polarity(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+            results = list(executor.map(_textblob_polarity, chunks))
+    return np.fromiter((score for chunk in results for score in chunk), dtype='float64', count=len(texts))
+
+def sentiment_fingerprint(preprocess=True, engine='textblob'):
+    """
+    Identifies the preprocessing + scoring configuration (stopword list, lemmatizer,
+    scoring engine, library versions). Cached results are only reused under an identical fingerprint.
+    """
+    parts = [f'scorer={engine}-textblob-{metadata.version("textblob")}', f'version={PREPROCESS_VERSION}']
+    if preprocess:
+        parts += [
+            f'nltk={metadata.version("nltk")}',
+            f'lemmatizer={type(lemmatizer).__module__}.{type(lemmatizer).__name__}',
+            'stopwords=' + hashlib.sha1(' '.join(sorted(stop_words)).encode('utf-8')).hexdigest(),
+        ]
+    return ';'.join(parts)
+
+@instrumented()
+def add_sentiment_score(df, text_col='headline', processed_text_col='processed_headline', engine='textblob', n_jobs=None, chunksize=10000, cache=None, verbose=True, executor=None):
+    """
+    Adds sentiment polarity score using TextBlob (engine='textblob') or its vectorized
+    lexicon equivalent (engine='vectorized'), which is much faster and gives identical scores on
+    preprocess_text output; raw text with contractions or punctuation (e.g. "n't") can score differently.
+    Each distinct headline is preprocessed once (in bulk, see preprocess_series) and each
+    distinct processed headline is scored once (in parallel chunks); scores are joined back to every row.
+    If a SentimentCache is given, only headlines it has not seen before are processed.
+    An `executor` (a process pool) is reused for scoring instead of starting one per call.
+    """
+    start = time.perf_counter()
+    preprocess = processed_text_col not in df.columns
+    source_col = text_col if preprocess else processed_text_col
+    codes, uniques = pd.factorize(df[source_col], use_na_sentinel=False)
+    processed = np.empty(len(uniques), dtype=object)
+    scores = np.empty(len(uniques), dtype='float64')
+    pending = np.ones(len(uniques), dtype=bool)
+
+    if cache is not None:
+        fingerprint = sentiment_fingerprint(preprocess, engine)
+        keys = [cache.make_key(text, fingerprint) for text in uniques]
+        cached = cache.get_many(keys)
+        for i, key in enumerate(keys):
+            if key in cached:
+                processed[i], scores[i] = cached[key]
+                pending[i] = False
+
+    todo = np.flatnonzero(pending)
+    if len(todo):
+        if preprocess:
+            processed[todo] = preprocess_series(uniques[todo])
+        else:
+            processed[todo] = [str(uniques[i]) for i in todo]
+        todo_codes, todo_texts = pd.factorize(processed[todo])
+        with stage('score_unique_texts', rows=len(todo_texts), engine=engine):
+            scores[todo] = score_unique_texts(todo_texts, n_jobs=n_jobs, chunksize=chunksize, engine=engine, executor=executor)[todo_codes]
+        if cache is not None:
+            cache.put_many((keys[i], processed[i], scores[i]) for i in todo)
+
+    if preprocess:
+        df[processed_text_col] = processed[codes]
+    df['daily_avg_sentiment'] = scores[codes]
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        rate = len(df) / elapsed if elapsed > 0 else float('inf')
+        print(f"Scored {len(df)} rows ({len(uniques)} unique headlines, {len(todo)} not cached) in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
     return df
 
-def get_common_keywords(df, text_col='processed_headline', top_n=50, n_gram=1):
-    """Identifies common keywords (single words or n-grams)."""
-    all_words = ' '.join(df[text_col].dropna()).split()
-    if n_gram == 1:
-        return Counter(all_words).most_common(top_n)
-    elif n_gram > 1:
-        from nltk.util import ngrams
-        n_grams = ngrams(all_words, n_gram)
-        return Counter(n_grams).most_common(top_n)
-    return []
+def read_news_chunks(filepath, chunksize=100000, text_col='headline'):
+    """
+    Reads the news CSV `chunksize` rows at a time, only the text, date and stock columns, and
+    yields (chunk, dropped): the chunk with publication_day (the UTC day) in place of date, and
+    how many of its rows were left out because their date is missing or unparseable.
+    """
+    reader = pd.read_csv(
+        filepath,
+        usecols=[text_col, 'date', 'stock'],
+        dtype={text_col: 'object', 'date': 'object', 'stock': 'object'},
+        chunksize=chunksize,
+    )
+    while True:
+        with stage('read_csv_chunk') as timing: # CSV parsing, separately from scoring
+            chunk = next(reader, None)
+            timing.rows = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        chunk['publication_day'] = pd.to_datetime(chunk['date'], utc=True, errors='coerce').dt.normalize()
+        valid = chunk['publication_day'].notna()
+        yield chunk[valid].drop(columns='date'), int((~valid).sum())
+
+def _report_dropped_dates(dropped, filepath):
+    if dropped:
+        print(f"Warning: Dropped {dropped} rows with missing or unparseable dates from {filepath}")
+
+@instrumented(rows=lambda result, *args, **kwargs: None) # Row counts are in its read_csv_chunk stages
+def stream_daily_sentiment(filepath='../data/raw_analyst_ratings.csv', chunksize=100000, text_col='headline', engine='textblob', n_jobs=None, cache=None, verbose=True):
+    """
+    Builds the daily_avg_sentiment table (Date, stock, daily_avg_sentiment) by streaming
+    the news CSV in chunks. Only the needed columns are read; each chunk is scored and
+    folded into running per-(publication_day, stock) sums and counts, so peak memory
+    is bounded by `chunksize` rather than the file size. Pass a SentimentCache to avoid
+    re-scoring headlines repeated across chunks. One process pool is shared by all chunks.
+    Rows whose date cannot be parsed are left out of the table and reported.
+    """
+    totals = None
+    rows = 0
+    dropped = 0
+    start = time.perf_counter()
+    n_jobs = n_jobs or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=n_jobs) if engine == 'textblob' and n_jobs > 1 else None
+    try:
+        for chunk, chunk_dropped in read_news_chunks(filepath, chunksize=chunksize, text_col=text_col):
+            dropped += chunk_dropped
+            chunk = add_sentiment_score(chunk, text_col=text_col, engine=engine, n_jobs=n_jobs, cache=cache, verbose=False, executor=executor)
+            with stage('aggregate_chunk', rows=len(chunk)):
+                partial = chunk.groupby(['publication_day', 'stock'])['daily_avg_sentiment'].agg(['sum', 'count'])
+            totals = partial if totals is None else totals.add(partial, fill_value=0)
+            rows += len(chunk)
+            if verbose:
+                print(f"Processed {rows} rows from {filepath} ({rows / (time.perf_counter() - start):,.0f} rows/sec)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    _report_dropped_dates(dropped, filepath)
+    if totals is None:
+        return pd.DataFrame(columns=['Date', 'stock', 'daily_avg_sentiment'])
+    daily_avg_sentiment = (totals['sum'] / totals['count']).rename('daily_avg_sentiment').sort_index().reset_index()
+    return daily_avg_sentiment.rename(columns={'publication_day': 'Date'})
+
+@instrumented()
+def get_common_keywords(df, text_col='processed_headline', top_n=50, n_gram=1, group_col=None, mode='exact', chunksize=100000):
+    """
+    Identifies common keywords (single words or n-grams within each headline).
+    Headlines are counted in chunks by keyword_counter; mode='approximate' bounds memory with
+    a Count-Min sketch. With `group_col` (e.g. 'stock' or 'publisher') returns {group: keywords}.
+    """
+    if n_gram < 1:
+        return []
+    groups = df[group_col] if group_col is not None else None
+    return count_keywords(df[text_col], n_gram=n_gram, top_n=top_n, groups=groups, mode=mode, chunksize=chunksize)
 
 if __name__ == '__main__':
     print("Testing news_processor.py:")
@@ -88,4 +303,15 @@ if __name__ == '__main__':
     print(get_common_keywords(processed_df_news, top_n=5))
 
     print("\nTop 5 Common Bigrams:")
-    print(get_common_keywords(processed_df_news, top_n=5, n_gram=2))
\ No newline at end of file
+    print(get_common_keywords(processed_df_news, top_n=5, n_gram=2))
+
+    print("\nTop 2 Common Words per Publisher:")
+    print(get_common_keywords(processed_df_news, top_n=2, group_col='publisher'))
+
+    print("\nPreprocessing throughput (preprocess_text vs preprocess_series):")
+    words = np.array(' '.join(dummy_news_data['headline']).split() + ["cannot", "gonna", "Q3:", "$5.3B", "S&P", "İce"])
+    rng = np.random.default_rng(0)
+    headlines = [' '.join(rng.choice(words, 10)) for _ in range(20000)]
+    result = benchmark_preprocessing(headlines)
+    print(f"{result['rows']} headlines: preprocess_text {result['rows'] / result['preprocess_text']:,.0f} rows/sec, "
+          f"preprocess_series {result['rows'] / result['preprocess_series']:,.0f} rows/sec, identical output: {result['identical']}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+def make_panel(data, ticker_col='Ticker', date_col='Date'):
+    """
+    Builds a wide (date x ticker) panel: a DataFrame indexed by date whose columns are a
+    (field, ticker) MultiIndex, e.g. ('Close', 'AAPL'). Accepts a {ticker: DataFrame} dict
+    (as returned by load_all_historical_data), a long frame with one row per (date, ticker),
+    or an existing wide panel. Tickers with different histories are aligned on the union of dates.
+    """
+    if isinstance(data, dict):
+        wide = pd.concat(data, axis=1, names=[ticker_col, 'Field']).swaplevel(axis=1)
+    elif isinstance(data.columns, pd.MultiIndex):
+        wide = data
+    else:
+        long = data.reset_index() if date_col not in data.columns else data
+        wide = long.pivot(index=date_col, columns=ticker_col)
+    wide = wide.sort_index()
+    wide.columns = wide.columns.set_names(['Field', ticker_col])
+    return wide.sort_index(axis=1, level=0, sort_remaining=False)
+
+def panel_to_long(wide, ticker_col='Ticker'):
+    """Converts a wide panel back to a long frame with one row per (date, ticker) that has data."""
+    long = wide.stack(level=1, future_stack=True).dropna(how='all')
+    long.columns.name = None
+    return long.reset_index(level=1).rename(columns={long.index.names[1]: ticker_col})
+
+def panel_tickers(wide):
+    """Returns the tickers of a wide panel in column order."""
+    return wide.columns.get_level_values(1).unique()
+
+def panel_rows(wide, *args, **kwargs):
+    """Number of (date, ticker) cells in a wide panel; used as the row count when instrumenting panel functions."""
+    return len(wide) * len(panel_tickers(wide))
+
+def field_values(wide, field, tickers):
+    """Returns one field of the panel as a (dates x tickers) float64 array in `tickers` order."""
+    return wide[field].reindex(columns=tickers).to_numpy(dtype='float64')
+
+def panel_from_arrays(arrays, index, tickers, ticker_col='Ticker'):
+    """Assembles {field: (dates x tickers) array} into a wide panel with a single concat."""
+    frames = {field: pd.DataFrame(values, index=index, columns=tickers) for field, values in arrays.items()}
+    wide = pd.concat(frames, axis=1)
+    wide.columns = wide.columns.set_names(['Field', ticker_col])
+    return wide
+
+def compact(values, mask):
+    """
+    Moves each column's valid rows (mask True) to the top, preserving their order, so a
+    ticker's observations become contiguous as in its own DataFrame. Rolling windows and
+    recursive indicators then behave exactly as they would per ticker, even when tickers
+    trade on different dates. Returns (compacted values, row order, valid counts).
+    """
+    order = np.argsort(~mask, axis=0, kind='stable')
+    compacted = np.take_along_axis(values, order, axis=0)
+    counts = mask.sum(axis=0)
+    compacted[np.arange(len(values))[:, None] >= counts] = np.nan
+    return compacted, order, counts
+
+def expand(compacted, order, counts):
+    """Inverse of compact: scatters per-column results back to their original rows (NaN elsewhere)."""
+    result = np.full(compacted.shape, np.nan)
+    rows = np.arange(len(compacted))[:, None]
+    values = np.where(rows < counts, compacted, np.nan)
+    np.put_along_axis(result, order, values, axis=0)
+    return result
+
+def rolling(values, window, ddof=None):
+    """Rolling mean (ddof=None) or standard deviation over each column of a compacted array."""
+    frame = pd.DataFrame(values).rolling(window=window)
+    return (frame.mean() if ddof is None else frame.std(ddof=ddof)).to_numpy()
+
+def ema(values, period, start=0):
+    """
+    TA-Lib style exponential moving average for every column at once: seeded with the
+    simple average of rows [start, start + period) and updated with k = 2 / (period + 1).
+    """
+    out = np.full(values.shape, np.nan)
+    seed_row = start + period - 1
+    if seed_row >= len(values):
+        return out
+    k = 2.0 / (period + 1)
+    out[seed_row] = values[start:seed_row + 1].mean(axis=0)
+    for t in range(seed_row + 1, len(values)):
+        out[t] = (values[t] - out[t - 1]) * k + out[t - 1]
+    return out
+
+def wilder(values, period, first):
+    """
+    Wilder smoothing as used by TA-Lib's RSI and ATR: seeded with the average of rows
+    [first, first + period), then avg = (prev * (period - 1) + value) / period.
+    """
+    out = np.full(values.shape, np.nan)
+    seed_row = first + period - 1
+    if seed_row >= len(values):
+        return out
+    out[seed_row] = values[first:seed_row + 1].sum(axis=0) / period
+    for t in range(seed_row + 1, len(values)):
+        out[t] = (out[t - 1] * (period - 1) + values[t]) / period
+    return out
@@ -0,0 +1,409 @@
+import os
+import sys
+import json
+import time
+import ast
+import hashlib
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from storage import list_tickers, dataset_version, read_dataset, convert_csv_dir, load_manifest, COLUMNAR_DIR, MANIFEST_FILE
+from data_loader import load_all_historical_data
+from technical_analysis import add_all_common_indicators
+from financial_metrics import add_all_common_financial_metrics
+from news_processor import add_sentiment_score, sentiment_fingerprint, read_news_chunks, _report_dropped_dates
+from sentiment_cache import SentimentCache
+from correlation import merge_sentiment_returns, correlation_summary, write_correlation_outputs
+from rolling_correlation import ROLLING_WINDOWS, EVENT_WINDOWS, rolling_correlation, event_window_returns, event_correlation_summary, write_rolling_correlation_outputs
+from instrumentation import stage
+
+# Runs the notebook workflow (Quantitative_Analysis, EDA_and_Data_Prep, Correlation_Analysis) as a
+# DAG of stages that exchange files:
+#
+#   load_prices -> indicators -> metrics (per ticker) ---------------+
+#   news_ingest -> sentiment -> daily_aggregation -----------------> merge -> correlation ---------+--> dashboard_artifacts
+#                                                                          -> rolling_correlation -+
+#
+# Every task gets a fingerprint: a hash of its parameters, the version tokens of its external input
+# files (size + mtime, see storage.dataset_version), the source of the modules doing the work (and of
+# every src module they import, directly or not), pipeline.py's own source and the fingerprints of
+# the tasks it depends on. A task whose fingerprint matches the one recorded in the
+# state file after its last successful run, and whose outputs all still exist, is skipped; editing
+# one ticker's CSV therefore reruns that ticker's chain and the stages downstream of it only.
+# Tasks whose dependencies are done run in parallel on a process pool, so tickers, and the price
+# and news branches, proceed independently across cores.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SRC_DIR)
+STATE_FILE = 'pipeline_state.json'
+STAGES = ['load_prices', 'indicators', 'metrics', 'news_ingest', 'sentiment', 'daily_aggregation',
+          'merge', 'correlation', 'rolling_correlation', 'dashboard_artifacts']
+
+class Task:
+    """One unit of work: `func(**kwargs)` writes files and returns their paths."""
+
+    def __init__(self, stage, func, kwargs, deps=(), params=None, inputs=None, modules=(), ticker=None):
+        self.stage = stage
+        self.ticker = ticker
+        self.name = f'{stage}:{ticker}' if ticker is not None else stage
+        self.func = func
+        self.kwargs = kwargs
+        self.deps = list(deps)
+        self.params = params or {}
+        self.inputs = inputs or {}
+        self.modules = list(modules)
+
+def _file_version(path):
+    """Version token of an external input file (None when it does not exist)."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+_module_hashes = {}
+_module_imports = {}
+
+def _module_hash(module):
+    """Hash of a src module's source, so code changes invalidate the stages that use it."""
+    if module not in _module_hashes:
+        with open(os.path.join(SRC_DIR, f'{module}.py'), 'rb') as f:
+            _module_hashes[module] = hashlib.sha1(f.read()).hexdigest()
+    return _module_hashes[module]
+
+def _src_imports(module):
+    """The src modules a src module imports (anywhere but its `if __name__ == '__main__'` block)."""
+    if module not in _module_imports:
+        with open(os.path.join(SRC_DIR, f'{module}.py'), 'rb') as f:
+            tree = ast.parse(f.read())
+        names = set()
+        for statement in tree.body:
+            if isinstance(statement, ast.If) and '__main__' in ast.unparse(statement.test):
+                continue
+            for node in ast.walk(statement):
+                if isinstance(node, ast.Import):
+                    names.update(alias.name.split('.')[0] for alias in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    names.add(node.module.split('.')[0])
+        _module_imports[module] = sorted(name for name in names if os.path.exists(os.path.join(SRC_DIR, f'{name}.py')))
+    return _module_imports[module]
+
+def _code_modules(modules):
+    """`modules` and every src module they import, directly or indirectly."""
+    seen = set()
+    pending = list(modules)
+    while pending:
+        module = pending.pop()
+        if module not in seen:
+            seen.add(module)
+            pending.extend(_src_imports(module))
+    return sorted(seen)
+
+def fingerprint(task, dep_fingerprints):
+    # The stage functions live in pipeline.py; its own source counts, but not everything it imports
+    code = {module: _module_hash(module) for module in _code_modules(task.modules)}
+    code['pipeline'] = _module_hash('pipeline')
+    payload = {
+        'stage': task.stage, 'ticker': task.ticker, 'params': task.params, 'inputs': task.inputs,
+        'code': code,
+        'deps': {dep: dep_fingerprints[dep] for dep in sorted(task.deps)},
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(path, state):
+    """Atomically writes the state file (task -> fingerprint and outputs of its last successful run)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# Stage functions. They run in pool workers, so they take paths and return the paths they wrote.
+
+def _prepare(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+def run_load_prices(raw_dir, ticker, output):
+    data, report = load_all_historical_data(raw_dir, tickers=[ticker], max_workers=1, return_report=True)
+    if ticker not in data:
+        raise ValueError(report['message'].iloc[0] if len(report) else f'No historical data for {ticker} in {raw_dir}')
+    data[ticker].to_parquet(_prepare(output))
+    return [output]
+
+def run_indicators(source, output):
+    df = add_all_common_indicators(pd.read_parquet(source))
+    df.to_parquet(_prepare(output))
+    return [output]
+
+def run_metrics(source, output):
+    """Writes {ticker}_processed_stock_data.csv, as Quantitative_Analysis did (but keeping the Date column)."""
+    df = add_all_common_financial_metrics(pd.read_parquet(source))
+    df.to_csv(_prepare(output))
+    return [output]
+
+def run_news_ingest(news_path, output, text_col='headline', chunksize=100000):
+    """Streams the news CSV into a Parquet file of (text, stock, publication_day); rows without a valid date are dropped and reported."""
+    schema = pa.schema([(text_col, pa.string()), ('stock', pa.string()), ('publication_day', pa.timestamp('ns', tz='UTC'))])
+    dropped = 0
+    with pq.ParquetWriter(_prepare(output), schema) as writer:
+        for chunk, chunk_dropped in read_news_chunks(news_path, chunksize=chunksize, text_col=text_col):
+            dropped += chunk_dropped
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    _report_dropped_dates(dropped, news_path)
+    return [output]
+
+def run_sentiment(source, output, engine='textblob', n_jobs=None, cache_path=None, text_col='headline'):
+    news = pd.read_parquet(source)
+    cache = SentimentCache(cache_path) if cache_path else None
+    try:
+        news = add_sentiment_score(news, text_col=text_col, engine=engine, n_jobs=n_jobs, cache=cache, verbose=False)
+    finally:
+        if cache is not None:
+            cache.close()
+    news[['publication_day', 'stock', 'processed_headline', 'daily_avg_sentiment']].to_parquet(_prepare(output))
+    return [output]
+
+def run_daily_aggregation(source, output):
+    """Writes daily_aggregated_sentiment.csv (Date, stock, daily_avg_sentiment), as EDA_and_Data_Prep did."""
+    news = pd.read_parquet(source, columns=['publication_day', 'stock', 'daily_avg_sentiment'])
+    daily = news.groupby(['publication_day', 'stock'])['daily_avg_sentiment'].mean().reset_index()
+    daily.rename(columns={'publication_day': 'Date'}).to_csv(_prepare(output), index=False)
+    return [output]
+
+def run_merge(daily_path, processed_dir, tickers, output, lags=[0]):
+    daily = pd.read_csv(daily_path)
+    returns = {ticker: read_dataset(processed_dir, ticker, 'processed_stock_data', columns=['Close', 'Daily_Return']) for ticker in tickers}
+    merged = merge_sentiment_returns(daily, returns, lags=lags)
+    merged.to_parquet(_prepare(output))
+    return [output]
+
+def run_correlation(source, output_dir, lags=[0]):
+    merged = pd.read_parquet(source)
+    write_correlation_outputs(merged, correlation_summary(merged, lags=lags), output_dir=output_dir)
+    names = ['overall_correlation_summary.csv', 'lagged_correlation_summary.csv']
+    names += [f'{ticker}_merged_correlation_data.csv' for ticker in merged['stock'].unique()]
+    return [os.path.join(output_dir, name) for name in names]
+
+def run_rolling_correlation(source, daily_path, processed_dir, tickers, output_dir, windows, event_windows):
+    """Writes the per-ticker rolling correlations and the event-window correlation summary (see rolling_correlation.py)."""
+    rolling = rolling_correlation(pd.read_parquet(source), windows=windows)
+    prices = {ticker: read_dataset(processed_dir, ticker, 'processed_stock_data', columns=['Close']) for ticker in tickers}
+    events = event_window_returns(pd.read_csv(daily_path), prices, windows=event_windows)
+    return write_rolling_correlation_outputs(rolling, event_correlation_summary(events, windows=event_windows), output_dir=output_dir)
+
+def run_dashboard_artifacts(output_dir, fmt='arrow'):
+    """Converts the processed, merged and rolling correlation CSVs the dashboard reads to columnar files (see storage.py)."""
+    kinds = ('processed_stock_data', 'merged_correlation_data', 'rolling_correlation_data')
+    for kind in kinds:
+        convert_csv_dir(output_dir, kind, fmt=fmt)
+    manifest = load_manifest(output_dir)
+    outputs = [os.path.join(output_dir, entries[kind]['path']) for entries in manifest.values() for kind in kinds if kind in entries]
+    return outputs + [os.path.join(output_dir, COLUMNAR_DIR, MANIFEST_FILE)]
+
+def build_tasks(raw_dir, news_path, output_dir, work_dir, tickers=None, engine='textblob', lags=[0],
+                n_jobs=None, cache_path=None, fmt='arrow', windows=ROLLING_WINDOWS, event_windows=EVENT_WINDOWS):
+    """Returns the pipeline's tasks (in dependency order) for the tickers in raw_dir (or `tickers`)."""
+    available = list_tickers(raw_dir, 'historical_data')
+    if tickers is not None:
+        available = [ticker for ticker in available if ticker in set(tickers)]
+    lags = sorted(set(lags) | {0})
+    tasks = []
+    for ticker in available:
+        prices = os.path.join(work_dir, 'prices', f'{ticker}.parquet')
+        indicators = os.path.join(work_dir, 'indicators', f'{ticker}.parquet')
+        tasks += [
+            Task('load_prices', run_load_prices, {'raw_dir': raw_dir, 'ticker': ticker, 'output': prices},
+                 inputs={'prices': dataset_version(raw_dir, ticker, 'historical_data')}, modules=['data_loader', 'storage'], ticker=ticker),
+            Task('indicators', run_indicators, {'source': prices, 'output': indicators},
+                 deps=[f'load_prices:{ticker}'], modules=['technical_analysis', 'panel'], ticker=ticker),
+            Task('metrics', run_metrics, {'source': indicators, 'output': os.path.join(output_dir, f'{ticker}_processed_stock_data.csv')},
+                 deps=[f'indicators:{ticker}'], modules=['financial_metrics'], ticker=ticker),
+        ]
+
+    news = os.path.join(work_dir, 'news.parquet')
+    scored = os.path.join(work_dir, 'news_sentiment.parquet')
+    daily = os.path.join(output_dir, 'daily_aggregated_sentiment.csv')
+    merged = os.path.join(work_dir, 'merged.parquet')
+    tasks += [
+        Task('news_ingest', run_news_ingest, {'news_path': news_path, 'output': news}, inputs={'news': _file_version(news_path)},
+             modules=['news_processor']),
+        # The sentiment cache only saves work, so its path is not part of the fingerprint.
+        Task('sentiment', run_sentiment, {'source': news, 'output': scored, 'engine': engine, 'n_jobs': n_jobs, 'cache_path': cache_path},
+             deps=['news_ingest'], params={'engine': engine, 'scorer': sentiment_fingerprint(True, engine)},
+             modules=['news_processor', 'lexicon_scorer']),
+        Task('daily_aggregation', run_daily_aggregation, {'source': scored, 'output': daily}, deps=['sentiment']),
+        Task('merge', run_merge, {'daily_path': daily, 'processed_dir': output_dir, 'tickers': available, 'output': merged, 'lags': lags},
+             deps=['daily_aggregation'] + [f'metrics:{ticker}' for ticker in available], params={'lags': lags}, modules=['correlation']),
+        Task('correlation', run_correlation, {'source': merged, 'output_dir': output_dir, 'lags': lags},
+             deps=['merge'], params={'lags': lags}, modules=['correlation']),
+        Task('rolling_correlation', run_rolling_correlation,
+             {'source': merged, 'daily_path': daily, 'processed_dir': output_dir, 'tickers': available, 'output_dir': output_dir,
+              'windows': windows, 'event_windows': event_windows},
+             deps=['merge'], params={'windows': windows, 'event_windows': event_windows}, modules=['rolling_correlation', 'correlation']),
+        Task('dashboard_artifacts', run_dashboard_artifacts, {'output_dir': output_dir, 'fmt': fmt},
+             deps=['correlation', 'rolling_correlation'] + [f'metrics:{ticker}' for ticker in available], params={'format': fmt}, modules=['storage']),
+    ]
+    return tasks
+
+def _select(tasks, stages):
+    """The tasks of the given stages plus everything they depend on."""
+    by_name = {task.name: task for task in tasks}
+    wanted = set()
+    pending = [task.name for task in tasks if task.stage in stages]
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].deps)
+    return [task for task in tasks if task.name in wanted]
+
+def _execute(task):
+    with stage('pipeline_task', task=task.name, pipeline_stage=task.stage):
+        start = time.perf_counter()
+        outputs = task.func(**task.kwargs)
+    return outputs, time.perf_counter() - start
+
+def plan(tasks, state, force=False):
+    """Fingerprints every task (in dependency order) and says whether it must run and why."""
+    fingerprints = {}
+    running = set()
+    rows = []
+    for task in tasks:
+        fingerprints[task.name] = fingerprint(task, fingerprints)
+        previous = state.get(task.name)
+        if force:
+            reason = 'forced'
+        elif previous is None:
+            reason = 'never run'
+        elif previous['fingerprint'] != fingerprints[task.name]:
+            reason = 'inputs or parameters changed'
+        elif not all(os.path.exists(path) for path in previous['outputs']):
+            reason = 'outputs missing'
+        elif any(dep in running for dep in task.deps):
+            reason = 'a dependency reruns' # Its outputs are rewritten even if the fingerprint is unchanged
+        else:
+            reason = None
+        if reason is not None:
+            running.add(task.name)
+        rows.append({'task': task.name, 'stage': task.stage, 'ticker': task.ticker, 'run': reason is not None,
+                     'reason': reason or 'up to date', 'fingerprint': fingerprints[task.name]})
+    return pd.DataFrame(rows, columns=['task', 'stage', 'ticker', 'run', 'reason', 'fingerprint'])
+
+def run_pipeline(tasks, state_path, jobs=None, force=False, stages=None, dry_run=False, verbose=True):
+    """
+    Runs the out-of-date tasks (of `stages` and their dependencies, or all) and returns a report
+    with one row per task: status ('skipped', 'ran', 'failed', 'blocked' by a failed dependency,
+    or 'planned' in a dry run), seconds and message. The state file is updated after every task,
+    so an interrupted run resumes where it stopped. `jobs=1` runs tasks in-process, one at a time.
+    """
+    if stages is not None:
+        tasks = _select(tasks, stages)
+    state = load_state(state_path)
+    report = plan(tasks, state, force=force)
+    report['status'] = report['run'].map({True: 'planned', False: 'skipped'})
+    report['seconds'] = 0.0
+    report['message'] = ''
+    report = report.set_index('task')
+    if dry_run:
+        return report.reset_index()
+
+    by_name = {task.name: task for task in tasks}
+    done = set(report.index[~report['run']])
+    waiting = [task.name for task in tasks if task.name not in done]
+
+    def finish(name, outputs=None, seconds=0.0, error=None):
+        if error is None:
+            report.loc[name, ['status', 'seconds']] = ['ran', seconds]
+            state[name] = {'fingerprint': report.loc[name, 'fingerprint'], 'outputs': outputs, 'finished': time.time()}
+            save_state(state_path, state)
+            done.add(name)
+        else:
+            report.loc[name, ['status', 'message']] = ['failed', f'{type(error).__name__}: {error}']
+        if verbose:
+            print(f"{report.loc[name, 'status']:>7} {name} {report.loc[name, 'message'] or f'({seconds:.2f}s)'}")
+
+    def ready():
+        runnable = []
+        for name in list(waiting):
+            deps = by_name[name].deps
+            if any(report.loc[dep, 'status'] in ('failed', 'blocked') for dep in deps):
+                waiting.remove(name)
+                report.loc[name, ['status', 'message']] = ['blocked', 'a dependency failed']
+            elif all(dep in done for dep in deps):
+                waiting.remove(name)
+                runnable.append(name)
+        return runnable
+
+    if jobs == 1:
+        while True:
+            runnable = ready()
+            if not runnable:
+                break
+            for name in runnable:
+                try:
+                    finish(name, *_execute(by_name[name]))
+                except Exception as e:
+                    finish(name, error=e)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            running = {}
+            while True:
+                for name in ready():
+                    running[executor.submit(_execute, by_name[name])] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        finish(name, *future.result())
+                    except Exception as e:
+                        finish(name, error=e)
+    return report.reset_index()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the price, news sentiment and correlation pipeline, skipping up-to-date stages.')
+    parser.add_argument('--raw-dir', default=os.path.join(ROOT, 'data', 'yfinance_data'), help='Folder of {ticker}_historical_data.csv files')
+    parser.add_argument('--news', default=os.path.join(ROOT, 'data', 'raw_analyst_ratings.csv'), help='News CSV (headline, date, stock)')
+    parser.add_argument('--output-dir', default=os.path.join(ROOT, 'data', 'processed'), help='Where the processed CSVs the dashboard reads go')
+    parser.add_argument('--work-dir', default=os.path.join(ROOT, 'data', 'cache', 'pipeline'), help='Intermediate files and the state file')
+    parser.add_argument('--tickers', nargs='+', help='Only these tickers (default: all in --raw-dir)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, help='Only these stages and what they depend on')
+    parser.add_argument('--engine', default='textblob', choices=['textblob', 'vectorized'], help='Sentiment scorer')
+    parser.add_argument('--lags', nargs='+', type=int, default=[0], help='Return lags (trading days) to correlate sentiment with')
+    parser.add_argument('--windows', nargs='+', type=int, default=ROLLING_WINDOWS, help='Rolling correlation window lengths (business days)')
+    parser.add_argument('--format', default='arrow', choices=['arrow', 'parquet'], help='Columnar format of the dashboard artifacts')
+    parser.add_argument('--sentiment-cache', default=os.path.join(ROOT, 'data', 'cache', 'sentiment_cache.sqlite'),
+                        help="SentimentCache path ('' to disable)")
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel worker processes (default: all cores; 1 runs in-process)')
+    parser.add_argument('--sentiment-jobs', type=int, default=None,
+                        help='Processes the sentiment stage scores with (default: all cores with --jobs 1, else 1 so pools are not nested)')
+    parser.add_argument('--force', action='store_true', help='Rerun the selected stages even when up to date')
+    parser.add_argument('--dry-run', action='store_true', help='Only print which tasks would run and why')
+    args = parser.parse_args(argv)
+
+    # Tasks already run on a process pool unless --jobs 1, where the sentiment stage can use its own
+    sentiment_jobs = args.sentiment_jobs if args.sentiment_jobs is not None else (None if args.jobs == 1 else 1)
+    tasks = build_tasks(args.raw_dir, args.news, args.output_dir, args.work_dir, tickers=args.tickers, engine=args.engine,
+                        lags=args.lags, n_jobs=sentiment_jobs, cache_path=args.sentiment_cache or None, fmt=args.format,
+                        windows=args.windows)
+    start = time.perf_counter()
+    report = run_pipeline(tasks, os.path.join(args.work_dir, STATE_FILE), jobs=args.jobs, force=args.force,
+                          stages=args.stages, dry_run=args.dry_run)
+    if args.dry_run:
+        print(report[['task', 'reason']].to_string(index=False))
+        return 0
+    counts = report['status'].value_counts()
+    print(f"Pipeline finished in {time.perf_counter() - start:.2f}s: " + ', '.join(f'{n} {status}' for status, n in counts.items()))
+    return 1 if counts.get('failed', 0) or counts.get('blocked', 0) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import os
+import numpy as np
+import pandas as pd
+from correlation import _naive_dates, stack_returns, correlation_summary
+
+# Sentiment-return correlation over time. The merged (Date, ticker) panel is laid out as
+# (business day x ticker) arrays; cumulative sums of n, Σx, Σy, Σxy, Σx² and Σy² over the
+# days where both values exist give any window's sums as one subtraction, so every window
+# length is computed for a block of tickers and every day at once, O(1) per window position.
+# Values are centered on each ticker's mean first, which keeps the differences of large
+# cumulative sums accurate (correlation does not change under a shift).
+
+ROLLING_WINDOWS = [30, 90, 252]
+EVENT_WINDOWS = [(-1, 1), (0, 5)]
+
+def _panel(merged, sentiment_col, return_col, ticker_col):
+    """Returns (business days, tickers, x, y) with x and y as (day, ticker) arrays, NaN where absent."""
+    dates = _naive_dates(merged['Date'])
+    axis = pd.bdate_range(dates.min(), dates.max())
+    rows = axis.get_indexer(dates)
+    on_axis = rows >= 0 # Weekend dates (no return) are dropped
+    cols, tickers = pd.factorize(merged[ticker_col], sort=True)
+    x = np.full((len(axis), len(tickers)), np.nan)
+    y = np.full((len(axis), len(tickers)), np.nan)
+    x[rows[on_axis], cols[on_axis]] = merged[sentiment_col].to_numpy(dtype='float64')[on_axis]
+    y[rows[on_axis], cols[on_axis]] = merged[return_col].to_numpy(dtype='float64')[on_axis]
+    return axis, tickers, x, y
+
+def _window_correlations(x, y, windows, min_periods, block_bytes=64 * 1024 ** 2):
+    """
+    Rolling Pearson r and pair counts for each window, as {window: (r, n)} of (day, ticker) arrays.
+    Tickers are processed in column blocks so the cumulative sums (6 float64 per day and ticker)
+    and their temporaries stay around `block_bytes` however many tickers there are.
+    """
+    results = {w: (np.empty(x.shape), np.empty(x.shape, dtype='int64')) for w in windows}
+    block = max(1, block_bytes // (6 * 8 * (x.shape[0] + 1)))
+    for start in range(0, x.shape[1], block):
+        cols = slice(start, start + block)
+        for w, (r, n) in _block_correlations(x[:, cols], y[:, cols], windows, min_periods).items():
+            results[w][0][:, cols] = r
+            results[w][1][:, cols] = n
+    return results
+
+def _block_correlations(x, y, windows, min_periods):
+    """_window_correlations for one block of ticker columns."""
+    valid = ~(np.isnan(x) | np.isnan(y))
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x0 = np.where(valid, x - np.where(valid, x, 0).sum(axis=0) / counts, 0.0)
+        y0 = np.where(valid, y - np.where(valid, y, 0).sum(axis=0) / counts, 0.0)
+    # sums[:, t] holds the totals over days < t, so a window ending at day t is sums[:, t + 1] - sums[:, t + 1 - w]
+    terms = np.stack([valid.astype('float64'), x0, y0, x0 * y0, x0 * x0, y0 * y0])
+    sums = np.zeros((terms.shape[0], terms.shape[1] + 1, terms.shape[2]))
+    np.cumsum(terms, axis=1, out=sums[:, 1:])
+    end = np.arange(1, x.shape[0] + 1)
+    results = {}
+    for w in windows:
+        n, sx, sy, sxy, sxx, syy = sums[:, end] - sums[:, np.maximum(end - w, 0)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vx = sxx - sx * sx / n
+            vy = syy - sy * sy / n
+            r = (sxy - sx * sy / n) / np.sqrt(vx * vy)
+        # Windows that are (numerically) constant in either series have no defined correlation
+        r[(n < max(min_periods, 2)) | (vx <= 1e-12 * sxx) | (vy <= 1e-12 * syy)] = np.nan
+        results[w] = (np.clip(r, -1, 1), np.rint(n).astype('int64'))
+    return results
+
+def rolling_correlation(merged, windows=ROLLING_WINDOWS, min_periods=10, sentiment_col='daily_avg_sentiment', return_col='Daily_Return', ticker_col='stock'):
+    """
+    Rolling Pearson correlation between daily sentiment and returns over the last `w` business
+    days, for every ticker and window length in one pass (days without news count towards the
+    window but contribute no pair). `merged` is the long merge_sentiment_returns output (a Date
+    column or index). Returns one row per (ticker, business day) where some window has at least
+    `min_periods` pairs, with Rolling_Corr_{w} and Rolling_N_{w} columns.
+    """
+    if 'Date' not in merged.columns:
+        merged = merged.reset_index()
+    merged = merged[merged[[sentiment_col, return_col]].notna().all(axis=1)]
+    columns = ['Date', ticker_col] + [f'Rolling_{kind}_{w}' for w in windows for kind in ('Corr', 'N')]
+    if merged.empty:
+        return pd.DataFrame(columns=columns)
+    axis, tickers, x, y = _panel(merged, sentiment_col, return_col, ticker_col)
+    results = _window_correlations(x, y, windows, min_periods)
+    # Rows stop at each ticker's last pair; ticker-major order keeps each ticker's rows contiguous and sorted by date
+    observed = ~(np.isnan(x) | np.isnan(y))
+    last = len(axis) - 1 - np.argmax(observed[::-1], axis=0)
+    keep = (np.logical_or.reduce([~np.isnan(r) for r, _ in results.values()]) & (np.arange(len(axis))[:, None] <= last)).T
+    cols, rows = np.nonzero(keep)
+    data = {'Date': axis[rows], ticker_col: np.asarray(tickers, dtype=object)[cols]}
+    for w, (r, n) in results.items():
+        data[f'Rolling_Corr_{w}'] = r.T[keep]
+        data[f'Rolling_N_{w}'] = n.T[keep]
+    return pd.DataFrame(data, columns=columns)
+
+def event_window_returns(daily_avg_sentiment, stock_returns, windows=EVENT_WINDOWS, close_col='Close', ticker_col='stock'):
+    """
+    Adds, for each (pre, post) window, the compounded return from the close before trading day
+    t + pre to the close of day t + post around every news day t, as Event_Return_{pre}_{post}
+    (e.g. (-1, 1) spans the day before to the day after the news). `stock_returns` is a
+    {ticker: DataFrame} dict or a stacked long frame with the close prices.
+    """
+    prices = stack_returns(stock_returns, columns=[close_col], ticker_col=ticker_col) if isinstance(stock_returns, dict) else stock_returns.copy()
+    prices = prices.sort_values([ticker_col, 'Date'], kind='stable')
+    grouped = prices.groupby(ticker_col, sort=False)[close_col]
+    names = []
+    for pre, post in windows:
+        name = f'Event_Return_{pre}_{post}'
+        prices[name] = grouped.shift(-post) / grouped.shift(1 - pre) - 1
+        names.append(name)
+    sentiment = daily_avg_sentiment.copy()
+    sentiment['Date'] = _naive_dates(sentiment['Date'])
+    return pd.merge(sentiment, prices[['Date', ticker_col] + names], on=['Date', ticker_col], how='inner')
+
+def event_correlation_summary(events, windows=EVENT_WINDOWS, sentiment_col='daily_avg_sentiment', ticker_col='stock'):
+    """Per-ticker correlations between news-day sentiment and each event-window return (one row per Ticker and Window)."""
+    summaries = []
+    for pre, post in windows:
+        summary = correlation_summary(events, sentiment_col=sentiment_col, return_col=f'Event_Return_{pre}_{post}', ticker_col=ticker_col)
+        summaries.append(summary.drop(columns='Lag').assign(Window=f'{pre:+d}..{post:+d}'))
+    summary = pd.concat(summaries, ignore_index=True)
+    return summary[['Ticker', 'Window'] + [col for col in summary.columns if col not in ('Ticker', 'Window')]]
+
+def write_rolling_correlation_outputs(rolling, event_summary=None, output_dir='../data/processed/', ticker_col='stock'):
+    """Writes one {ticker}_rolling_correlation_data.csv per ticker (read by the dashboard) and event_correlation_summary.csv."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for ticker, df in rolling.groupby(ticker_col, sort=False):
+        paths.append(os.path.join(output_dir, f'{ticker}_rolling_correlation_data.csv'))
+        df.to_csv(paths[-1], index=False)
+    if event_summary is not None:
+        paths.append(os.path.join(output_dir, 'event_correlation_summary.csv'))
+        event_summary.to_csv(paths[-1], index=False)
+    return paths
+
+if __name__ == '__main__':
+    import time
+    print("Testing rolling_correlation.py:")
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2012-01-02', periods=2500)
+    tickers = [f'T{i:03d}' for i in range(300)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(tickers))), axis=0))
+    stock_returns = {}
+    frames = []
+    for i, ticker in enumerate(tickers):
+        prices = pd.DataFrame({'Close': close[:, i]}, index=pd.Index(dates, name='Date'))
+        prices['Daily_Return'] = prices['Close'].pct_change()
+        stock_returns[ticker] = prices
+        news_days = np.sort(rng.choice(len(dates), 900, replace=False))
+        frames.append(pd.DataFrame({'Date': dates[news_days], 'stock': ticker,
+                                    'daily_avg_sentiment': rng.uniform(-1, 1, len(news_days)) + 5 * prices['Daily_Return'].to_numpy()[news_days]}))
+    daily = pd.concat(frames, ignore_index=True)
+    merged = daily.merge(stack_returns(stock_returns), on=['Date', 'stock']).dropna(subset=['Daily_Return'])
+
+    start = time.perf_counter()
+    rolling = rolling_correlation(merged)
+    vectorized = time.perf_counter() - start
+
+    # Reference: pandas rolling().corr per ticker and window over the same business-day axis
+    start = time.perf_counter()
+    reference = []
+    for ticker, df in merged.groupby('stock'):
+        df = df.set_index('Date').reindex(pd.bdate_range(df['Date'].min(), df['Date'].max()))
+        reference.append(pd.DataFrame({f'Rolling_Corr_{w}': df['daily_avg_sentiment'].rolling(w, min_periods=10).corr(df['Daily_Return'])
+                                       for w in ROLLING_WINDOWS}).assign(stock=ticker))
+    naive = time.perf_counter() - start
+    reference = pd.concat(reference).rename_axis('Date').reset_index().dropna(how='all', subset=[f'Rolling_Corr_{w}' for w in ROLLING_WINDOWS])
+    check = rolling.merge(reference, on=['Date', 'stock'], suffixes=('', '_ref'), how='outer')
+    diff = max((check[f'Rolling_Corr_{w}'] - check[f'Rolling_Corr_{w}_ref']).abs().max() for w in ROLLING_WINDOWS)
+    print(f"{len(tickers)} tickers x {len(ROLLING_WINDOWS)} windows: vectorized {vectorized:.3f}s, pandas loop {naive:.3f}s "
+          f"({naive / vectorized:.1f}x), rows {len(rolling)} vs {len(reference)}, max abs diff {diff:.2e}")
+
+    events = event_window_returns(daily, stock_returns)
+    print(event_correlation_summary(events).head(6))
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import hashlib
+
+DEFAULT_CACHE_PATH = '../data/cache/sentiment_cache.sqlite'
+
+class SentimentCache:
+    """
+    Persistent on-disk cache of preprocessed headlines and sentiment scores.
+    Entries are keyed by a hash of the raw text plus the preprocessing/scorer
+    fingerprint, so changing the stopword list, lemmatizer or scorer produces new
+    keys and old entries simply stop being hit (and are eventually evicted).
+    Least-recently-used entries are evicted once the cache holds more than `max_bytes` of
+    entry data or more than `max_entries` entries (either may be None for no limit).
+    An entry's size is its key, UTF-8 processed text, score and recency stamp; the bound
+    limits that payload, not the SQLite file, which adds page, index and WAL overhead.
+    Entry and byte totals are kept as running counts in memory (re-read from the database
+    before evicting, in case other processes share the file).
+    """
+
+    # Bytes per entry besides the key and text: the REAL score and INTEGER recency stamp
+    ENTRY_OVERHEAD = 16
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=1024 ** 3, max_entries=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key BLOB PRIMARY KEY, processed TEXT NOT NULL, score REAL NOT NULL, last_used INTEGER NOT NULL, size INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('clock', 0)")
+        self._conn.commit()
+        self._sync_totals()
+
+    def _sync_totals(self):
+        self._entries, self._bytes = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+
+    @classmethod
+    def entry_size(cls, key, processed):
+        return len(key) + len(processed.encode('utf-8', 'surrogatepass')) + cls.ENTRY_OVERHEAD
+
+    @staticmethod
+    def make_key(text, fingerprint):
+        """Returns the 16-byte cache key for a text under the given fingerprint."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(fingerprint.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(str(text).encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    def _tick(self):
+        """Advances the logical clock used to order entries by recency."""
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'clock'")
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'clock'").fetchone()[0]
+
+    def get_many(self, keys):
+        """Looks up many keys at once. Returns {key: (processed_text, score)} for the hits."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._conn:
+            clock = self._tick()
+            self._conn.execute('CREATE TEMP TABLE IF NOT EXISTS lookup (key BLOB PRIMARY KEY)')
+            self._conn.execute('DELETE FROM lookup')
+            self._conn.executemany('INSERT OR IGNORE INTO lookup VALUES (?)', ((key,) for key in keys))
+            rows = self._conn.execute(
+                'SELECT e.key, e.processed, e.score FROM entries e JOIN lookup l ON e.key = l.key'
+            ).fetchall()
+            self._conn.execute(
+                'UPDATE entries SET last_used = ? WHERE key IN (SELECT key FROM lookup)', (clock,)
+            )
+            self._conn.execute('DELETE FROM lookup')
+        found = {key: (processed, score) for key, processed, score in rows}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Stores many (key, processed_text, score) items at once, then enforces the size limits."""
+        rows = {key: (processed, float(score), self.entry_size(key, processed)) for key, processed, score in items}
+        if not rows:
+            return
+        with self._conn:
+            clock = self._tick()
+            self._conn.execute('CREATE TEMP TABLE IF NOT EXISTS lookup (key BLOB PRIMARY KEY)')
+            self._conn.execute('DELETE FROM lookup')
+            self._conn.executemany('INSERT INTO lookup VALUES (?)', ((key,) for key in rows))
+            replaced_entries, replaced_bytes = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(e.size), 0) FROM entries e JOIN lookup l ON e.key = l.key'
+            ).fetchone()
+            self._conn.execute('DELETE FROM lookup')
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                ((key, processed, score, clock, size) for key, (processed, score, size) in rows.items())
+            )
+        self._entries += len(rows) - replaced_entries
+        self._bytes += sum(size for _, _, size in rows.values()) - replaced_bytes
+        self.evict()
+
+    def _over_limit(self):
+        return ((self.max_bytes is not None and self._bytes > self.max_bytes) or
+                (self.max_entries is not None and self._entries > self.max_entries))
+
+    def evict(self):
+        """Drops least-recently-used entries until both limits hold. Returns the number of entries dropped."""
+        if not self._over_limit():
+            return 0
+        self._sync_totals()
+        excess_bytes = self._bytes - self.max_bytes if self.max_bytes is not None else 0
+        excess_entries = self._entries - self.max_entries if self.max_entries is not None else 0
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            if freed >= excess_bytes and len(doomed) >= excess_entries:
+                break
+            doomed.append(key)
+            freed += size
+        with self._conn:
+            self._conn.executemany('DELETE FROM entries WHERE key = ?', ((key,) for key in doomed))
+        self._entries -= len(doomed)
+        self._bytes -= freed
+        return len(doomed)
+
+    def clear(self):
+        """Removes every entry and resets the hit/miss counters."""
+        with self._conn:
+            self._conn.execute('DELETE FROM entries')
+        self._entries = self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Returns entry count, stored entry bytes and hit/miss counters for this session."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return self._entries
+
+    @property
+    def nbytes(self):
+        """Total size of the stored entries (see the class docstring), the quantity `max_bytes` bounds."""
+        return self._bytes
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+if __name__ == '__main__':
+    print("Testing sentiment_cache.py:")
+    with SentimentCache(':memory:', max_bytes=None, max_entries=3) as cache:
+        keys = [SentimentCache.make_key(text, 'v1') for text in ['a', 'b', 'c', 'd']]
+        cache.put_many([(keys[0], 'a', 0.1), (keys[1], 'b', 0.2), (keys[2], 'c', 0.3)])
+        print(sorted(cache.get_many(keys[:2]).values()))
+        cache.put_many([(keys[3], 'd', 0.4)]) # Evicts 'c', the least recently used entry
+        print(sorted(cache.get_many(keys).values()))
+        print(cache.stats())
@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError: # Columnar storage is optional; everything falls back to CSV
+    pa = pq = None
+
+DATASET_KINDS = ('historical_data', 'processed_stock_data', 'merged_correlation_data', 'rolling_correlation_data')
+COLUMNAR_DIR = 'columnar'
+MANIFEST_FILE = 'manifest.json'
+# 'parquet' is compressed and smallest on disk. 'arrow' is uncompressed Arrow IPC, which is
+# memory-mapped on read: numeric columns are used in place, so processes reading the same
+# file (e.g. dashboard workers) share its pages through the OS cache instead of each holding a copy.
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+def _csv_path(data_dir, ticker, kind):
+    return os.path.join(data_dir, f'{ticker}_{kind}.csv')
+
+def _columnar_path(data_dir, ticker, kind, fmt='parquet'):
+    return os.path.join(data_dir, COLUMNAR_DIR, f'{ticker}_{kind}{COLUMNAR_FORMATS[fmt]}')
+
+def load_manifest(data_dir):
+    """Returns the per-ticker manifest {ticker: {kind: entry}} of columnar files in data_dir."""
+    path = os.path.join(data_dir, COLUMNAR_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(data_dir, manifest):
+    """Atomically writes the manifest next to the columnar files."""
+    path = os.path.join(data_dir, COLUMNAR_DIR, MANIFEST_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _write_arrow(df, path):
+    """Writes df as an uncompressed Arrow IPC file, keeping float NaN as NaN (not null) so reads stay zero-copy."""
+    arrays = [pa.array(df[col].to_numpy(), from_pandas=False) if df[col].dtype.kind == 'f' else pa.array(df[col])
+              for col in df.columns]
+    table = pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path) # Readers may have the old file mapped; replace rather than overwrite it
+
+def _read_arrow(path, columns, start, end):
+    """Reads an Arrow IPC file through a memory map, selecting columns and slicing the (sorted) date range."""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    if (start is not None or end is not None) and 'Date' in table.column_names:
+        dates = pd.DatetimeIndex(table.column('Date').to_numpy())
+        if dates.is_monotonic_increasing:
+            lo = dates.searchsorted(start, side='left') if start is not None else 0
+            hi = dates.searchsorted(end, side='right') if end is not None else len(dates)
+            table = table.slice(lo, max(hi - lo, 0))
+        else:
+            keep = np.ones(len(dates), dtype=bool)
+            if start is not None:
+                keep &= dates >= start
+            if end is not None:
+                keep &= dates <= end
+            table = table.filter(pa.array(keep))
+    return table.to_pandas(split_blocks=True)
+
+def write_dataset(df, data_dir, ticker, kind, compression='zstd', manifest=None, fmt='parquet'):
+    """
+    Writes one ticker's dataset as a typed columnar file (compressed Parquet, or memory-mappable
+    Arrow with fmt='arrow') and records it in the manifest (format, rows, columns, date range
+    and the mtime of the CSV it mirrors).
+    Pass a preloaded `manifest` when writing many tickers, then save it once.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required for columnar storage. Install it with 'pip install pyarrow'.")
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{fmt}'. Choose from {list(COLUMNAR_FORMATS)}.")
+    path = _columnar_path(data_dir, ticker, kind, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = df.reset_index() if df.index.name == 'Date' else df
+    if fmt == 'arrow':
+        _write_arrow(table, path)
+    else:
+        table.to_parquet(path, engine='pyarrow', compression=compression, index=False)
+
+    csv_path = _csv_path(data_dir, ticker, kind)
+    entry = {
+        'path': os.path.relpath(path, data_dir),
+        'format': fmt,
+        'rows': len(table),
+        'columns': [str(col) for col in table.columns],
+        'source_mtime': os.path.getmtime(csv_path) if os.path.exists(csv_path) else None,
+    }
+    if 'Date' in table.columns and len(table):
+        dates = pd.to_datetime(table['Date'])
+        entry['start'], entry['end'] = str(dates.min()), str(dates.max())
+
+    save = manifest is None
+    manifest = load_manifest(data_dir) if save else manifest
+    manifest.setdefault(ticker, {})[kind] = entry
+    if save:
+        save_manifest(data_dir, manifest)
+    return path
+
+def _columnar_entry(data_dir, ticker, kind, manifest):
+    """Returns the manifest entry if a fresh columnar copy exists, else None (use the CSV)."""
+    entry = manifest.get(ticker, {}).get(kind)
+    if pq is None or entry is None:
+        return None
+    if not os.path.exists(os.path.join(data_dir, entry['path'])):
+        return None
+    csv_path = _csv_path(data_dir, ticker, kind)
+    if os.path.exists(csv_path) and (entry['source_mtime'] is None or os.path.getmtime(csv_path) > entry['source_mtime']):
+        return None # The CSV was rewritten after the columnar copy was made
+    return entry
+
+def _date_bounds(date_range):
+    """(start, end) as tz-naive Timestamps (tz-aware bounds are converted to UTC first), either may be None."""
+    start, end = date_range if date_range is not None else (None, None)
+    bounds = []
+    for bound in (start, end):
+        bound = pd.Timestamp(bound) if bound is not None else None
+        if bound is not None and bound.tz is not None:
+            bound = bound.tz_convert('UTC').tz_localize(None)
+        bounds.append(bound)
+    return tuple(bounds)
+
+def _read_csv(csv_path, usecols=None):
+    """Reads a CSV with its Date column (if any) as tz-naive UTC timestamps, so UTC offsets in the file don't give tz-aware or object dates."""
+    df = pd.read_csv(csv_path, usecols=usecols)
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], utc=True).dt.tz_localize(None)
+    return df
+
+def read_dataset(data_dir, ticker, kind, columns=None, date_range=None, manifest=None):
+    """
+    Reads one ticker's dataset, indexed by Date when the dataset has a Date column.
+    Only `columns` are read (all when None) and `date_range=(start, end)` (either bound
+    may be None) is pushed down into the Parquet scan. Falls back to the CSV when no
+    up-to-date columnar copy exists. Arrow files are memory-mapped rather than read into memory.
+    """
+    manifest = load_manifest(data_dir) if manifest is None else manifest
+    start, end = _date_bounds(date_range)
+    entry = _columnar_entry(data_dir, ticker, kind, manifest)
+
+    if entry is not None:
+        has_date = 'Date' in entry['columns']
+        read_columns = None if columns is None else (['Date'] if has_date else []) + [c for c in columns if c != 'Date']
+        filters = []
+        if has_date and start is not None:
+            filters.append(('Date', '>=', start))
+        if has_date and end is not None:
+            filters.append(('Date', '<=', end))
+        if entry.get('format', 'parquet') == 'arrow':
+            df = _read_arrow(os.path.join(data_dir, entry['path']), read_columns, start if has_date else None, end if has_date else None)
+        else:
+            df = pd.read_parquet(os.path.join(data_dir, entry['path']), engine='pyarrow', columns=read_columns, filters=filters or None)
+    else:
+        csv_path = _csv_path(data_dir, ticker, kind)
+        header = pd.read_csv(csv_path, nrows=0).columns
+        has_date = 'Date' in header
+        usecols = None if columns is None else [c for c in header if c in columns or c == 'Date']
+        df = _read_csv(csv_path, usecols=usecols)
+        if has_date and start is not None:
+            df = df[df['Date'] >= start]
+        if has_date and end is not None:
+            df = df[df['Date'] <= end]
+
+    if has_date:
+        df['Date'] = pd.to_datetime(df['Date'])
+        df = df.set_index('Date')
+    return df
+
+def dataset_version(data_dir, ticker, kind, manifest=None):
+    """
+    Returns a token that changes whenever the file read_dataset would read for this ticker
+    changes (its path, size and modification time); suitable as a cache key component.
+    """
+    manifest = load_manifest(data_dir) if manifest is None else manifest
+    entry = _columnar_entry(data_dir, ticker, kind, manifest)
+    path = os.path.join(data_dir, entry['path']) if entry is not None else _csv_path(data_dir, ticker, kind)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+def list_tickers(data_dir, kind):
+    """Lists tickers that have a `kind` dataset in data_dir, as CSV or columnar file."""
+    suffix = f'_{kind}.csv'
+    tickers = {name[:-len(suffix)] for name in os.listdir(data_dir) if name.endswith(suffix)} if os.path.isdir(data_dir) else set()
+    manifest = load_manifest(data_dir)
+    tickers.update(ticker for ticker in manifest if _columnar_entry(data_dir, ticker, kind, manifest) is not None)
+    return sorted(tickers)
+
+def convert_csv_dir(data_dir, kind='historical_data', compression='zstd', fmt='parquet'):
+    """Converts every `*_{kind}.csv` in data_dir to a columnar file of format `fmt`. Returns the converted tickers."""
+    manifest = load_manifest(data_dir)
+    converted = []
+    for ticker in list_tickers(data_dir, kind):
+        csv_path = _csv_path(data_dir, ticker, kind)
+        entry = _columnar_entry(data_dir, ticker, kind, manifest)
+        if not os.path.exists(csv_path) or (entry is not None and entry.get('format', 'parquet') == fmt):
+            continue
+        df = _read_csv(csv_path)
+        write_dataset(df, data_dir, ticker, kind, compression=compression, manifest=manifest, fmt=fmt)
+        converted.append(ticker)
+    save_manifest(data_dir, manifest)
+    return converted
+
+def benchmark_read(data_dir, kind, columns=None, repeat=3):
+    """Times reading every ticker of `kind` from CSV and from columnar storage (best of `repeat`)."""
+    manifest = load_manifest(data_dir)
+    tickers = list_tickers(data_dir, kind)
+    timings = {}
+    for label, active_manifest in (('csv', {}), ('columnar', manifest)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for ticker in tickers:
+                read_dataset(data_dir, ticker, kind, columns=columns, manifest=active_manifest)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+    return timings
+
+if __name__ == '__main__':
+    # Usage: python storage.py ../data/yfinance_data historical_data [--format arrow]
+    args = sys.argv[1:]
+    fmt = 'parquet'
+    if '--format' in args:
+        i = args.index('--format')
+        fmt = args[i + 1]
+        del args[i:i + 2]
+    data_dir = args[0] if args else '../data/processed'
+    kinds = args[1:] or list(DATASET_KINDS)
+    print("Testing storage.py:")
+    for kind in kinds:
+        converted = convert_csv_dir(data_dir, kind, fmt=fmt)
+        print(f"Converted {len(converted)} {kind} files in {data_dir}")
+        if not list_tickers(data_dir, kind):
+            continue
+        timings = benchmark_read(data_dir, kind)
+        print(f"{kind}: CSV {timings['csv']:.3f}s, columnar {timings['columnar']:.3f}s "
+              f"({timings['csv'] / timings['columnar']:.1f}x faster)")
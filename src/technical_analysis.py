@@ -1,6 +1,8 @@
 import pandas as pd
 import talib
 import numpy as np
+from panel import make_panel, panel_tickers, field_values, panel_from_arrays, compact, expand, rolling, ema, wilder, panel_rows
+from instrumentation import instrumented
 
 def add_moving_averages(df, close_col='Close', periods=[10, 20, 50]):
     for p in periods:
@@ -46,24 +48,146 @@ def add_atr(df, high_col='High', low_col='Low', close_col='Close', timeperiod=14
     df['ATR'] = talib.ATR(df[high_col], df[low_col], df[close_col], timeperiod=timeperiod)
     return df
 
-def add_all_common_indicators(df, open_col='Open', high_col='High', low_col='Low', close_col='Close', volume_col='Volume'):
-    df_copy = df.copy()
+# Indicator registry: name -> (price inputs, output columns, period parameter, TA-Lib function, default parameters)
+INDICATORS = {
+    'SMA': (['close'], ['SMA'], 'timeperiod', talib.SMA, {'timeperiod': 20}),
+    'EMA': (['close'], ['EMA'], 'timeperiod', talib.EMA, {'timeperiod': 20}),
+    'RSI': (['close'], ['RSI'], 'timeperiod', talib.RSI, {'timeperiod': 14}),
+    'MACD': (['close'], ['MACD', 'MACD_Signal', 'MACD_Hist'], None, talib.MACD, {'fastperiod': 12, 'slowperiod': 26, 'signalperiod': 9}),
+    'BBANDS': (['close'], ['Upper_Band', 'Middle_Band', 'Lower_Band'], 'timeperiod', talib.BBANDS, {'timeperiod': 20, 'nbdevup': 2, 'nbdevdn': 2, 'matype': 0}),
+    'STOCH': (['high', 'low', 'close'], ['STOCH_K', 'STOCH_D'], None, talib.STOCH, {'fastk_period': 14, 'slowk_period': 3, 'slowd_period': 3}),
+    'ADX': (['high', 'low', 'close'], ['ADX'], 'timeperiod', talib.ADX, {'timeperiod': 14}),
+    'OBV': (['close', 'volume'], ['OBV'], None, talib.OBV, {}),
+    'AD': (['high', 'low', 'close', 'volume'], ['AD'], None, talib.AD, {}),
+    'ATR': (['high', 'low', 'close'], ['ATR'], 'timeperiod', talib.ATR, {'timeperiod': 14}),
+}
 
-    if not all(col in df_copy.columns for col in [open_col, high_col, low_col, close_col, volume_col]):
+# Same indicators and column names as the individual add_* functions above.
+# An entry's 'periods' list computes the indicator once per period, suffixing columns with _<period>.
+DEFAULT_INDICATOR_SPEC = [
+    {'indicator': 'SMA', 'periods': [10, 20, 50]},
+    {'indicator': 'RSI', 'timeperiod': 14},
+    {'indicator': 'MACD', 'fastperiod': 12, 'slowperiod': 26, 'signalperiod': 9},
+    {'indicator': 'BBANDS', 'timeperiod': 20, 'nbdevup': 2, 'nbdevdn': 2},
+    {'indicator': 'STOCH', 'fastk_period': 14, 'slowk_period': 3, 'slowd_period': 3},
+    {'indicator': 'ADX', 'timeperiod': 14},
+    {'indicator': 'OBV'},
+    {'indicator': 'AD'},
+    {'indicator': 'ATR', 'timeperiod': 14},
+]
+
+def _expand_spec(spec):
+    """Turns a declarative indicator spec into (function, inputs, parameters, output columns) steps."""
+    steps = []
+    for entry in spec:
+        entry = dict(entry)
+        name = entry.pop('indicator')
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}'. Choose from {sorted(INDICATORS)}.")
+        inputs, columns, period_param, func, defaults = INDICATORS[name]
+        periods = entry.pop('periods', None)
+        params = {**defaults, **entry}
+        if periods is None:
+            steps.append((func, inputs, params, columns))
+            continue
+        if period_param is None:
+            raise ValueError(f"Indicator '{name}' does not take a period, so 'periods' is not supported.")
+        for p in periods:
+            steps.append((func, inputs, {**params, period_param: p}, [f'{col}_{p}' for col in columns]))
+    return steps
+
+@instrumented()
+def compute_indicators(df, spec=DEFAULT_INDICATOR_SPEC, high_col='High', low_col='Low', close_col='Close', volume_col='Volume'):
+    """
+    Computes every indicator in `spec` in a single pass and returns them as a new DataFrame.
+    Price columns are converted to contiguous float64 arrays once, and all outputs are
+    written into one preallocated 2-D block, so the result is a single consolidated block.
+    """
+    steps = _expand_spec(spec)
+    source_cols = {'high': high_col, 'low': low_col, 'close': close_col, 'volume': volume_col}
+    needed = {name for _, inputs, _, _ in steps for name in inputs}
+    arrays = {name: np.ascontiguousarray(df[source_cols[name]].to_numpy(dtype='float64')) for name in needed}
+
+    columns = [col for _, _, _, cols in steps for col in cols]
+    # Fortran order keeps each output column contiguous and lets pandas adopt the block without copying.
+    block = np.empty((len(df), len(columns)), dtype='float64', order='F')
+    i = 0
+    for func, inputs, params, cols in steps:
+        outputs = func(*(arrays[name] for name in inputs), **params)
+        for output in (outputs if isinstance(outputs, tuple) else (outputs,)):
+            block[:, i] = output
+            i += 1
+    return pd.DataFrame(block, index=df.index, columns=columns)
+
+@instrumented()
+def add_all_common_indicators(df, open_col='Open', high_col='High', low_col='Low', close_col='Close', volume_col='Volume', spec=DEFAULT_INDICATOR_SPEC):
+    if not all(col in df.columns for col in [open_col, high_col, low_col, close_col, volume_col]):
         print(f"Warning: Missing one or more required OHLCV columns in DataFrame for comprehensive indicator calculation. Ticker: {df.name if hasattr(df, 'name') else 'N/A'}")
-        return df_copy
-
-    df_copy = add_moving_averages(df_copy, close_col=close_col)
-    df_copy = add_rsi(df_copy, close_col=close_col)
-    df_copy = add_macd(df_copy, close_col=close_col)
-    df_copy = add_bollinger_bands(df_copy, close_col=close_col)
-    df_copy = add_stochastic_oscillator(df_copy, high_col=high_col, low_col=low_col, close_col=close_col)
-    df_copy = add_adx(df_copy, high_col=high_col, low_col=low_col, close_col=close_col)
-    df_copy = add_obv(df_copy, close_col=close_col, volume_col=volume_col)
-    df_copy = add_ad_line(df_copy, high_col=high_col, low_col=low_col, close_col=close_col, volume_col=volume_col)
-    df_copy = add_atr(df_copy, high_col=high_col, low_col=low_col, close_col=close_col)
-
-    return df_copy
+        return df.copy()
+
+    indicators = compute_indicators(df, spec=spec, high_col=high_col, low_col=low_col, close_col=close_col, volume_col=volume_col)
+    # Recomputed indicators replace existing columns of the same name, as the add_* functions do.
+    return pd.concat([df.drop(columns=indicators.columns.intersection(df.columns)), indicators], axis=1)
+
+@instrumented(rows=panel_rows)
+def add_panel_indicators(panel, sma_periods=[10, 20, 50], rsi_period=14, fastperiod=12, slowperiod=26, signalperiod=9,
+                         bbands_period=20, nbdevup=2, nbdevdn=2, atr_period=14,
+                         high_col='High', low_col='Low', close_col='Close', volume_col='Volume', ticker_col='Ticker'):
+    """
+    Panel version of the core indicators (SMA, RSI, MACD, Bollinger Bands, ATR, OBV, AD)
+    for every ticker at once, using 2-D array operations across tickers instead of one
+    TA-Lib call per ticker. Matches TA-Lib to floating-point tolerance and uses the same
+    column names as add_all_common_indicators. `panel` may be a wide (date x ticker) panel,
+    a long frame or a {ticker: DataFrame} dict (see panel.make_panel).
+    Returns a wide panel with the indicator fields added.
+    """
+    wide = make_panel(panel, ticker_col=ticker_col)
+    tickers = panel_tickers(wide)
+    raw = {name: field_values(wide, col, tickers) for name, col in
+           [('high', high_col), ('low', low_col), ('close', close_col), ('volume', volume_col)]}
+    valid = ~(np.isnan(raw['high']) | np.isnan(raw['low']) | np.isnan(raw['close']))
+    # Each ticker's rows are made contiguous so windows span its own trading days only.
+    high, _, _ = compact(raw['high'], valid)
+    low, _, _ = compact(raw['low'], valid)
+    volume, _, _ = compact(raw['volume'], valid)
+    close, order, counts = compact(raw['close'], valid)
+
+    out = {}
+    for p in sma_periods:
+        out[f'SMA_{p}'] = rolling(close, p)
+
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    change = close - prev_close
+    avg_gain = wilder(np.where(change > 0, change, 0.0), rsi_period, first=1)
+    avg_loss = wilder(np.where(change < 0, -change, 0.0), rsi_period, first=1)
+    total = avg_gain + avg_loss
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out['RSI'] = np.where(total != 0, 100 * avg_gain / total, np.where(np.isnan(total), np.nan, 0.0))
+
+    # TA-Lib seeds the fast EMA on the window ending where the slow EMA starts.
+    macd = ema(close, fastperiod, start=slowperiod - fastperiod) - ema(close, slowperiod)
+    signal = ema(macd, signalperiod, start=slowperiod - 1)
+    macd[:slowperiod + signalperiod - 2] = np.nan
+    out['MACD'], out['MACD_Signal'], out['MACD_Hist'] = macd, signal, macd - signal
+
+    middle = rolling(close, bbands_period)
+    std = rolling(close, bbands_period, ddof=0)
+    out['Upper_Band'], out['Middle_Band'], out['Lower_Band'] = middle + nbdevup * std, middle, middle - nbdevdn * std
+
+    direction = np.sign(change)
+    direction[0] = 1.0
+    out['OBV'] = np.cumsum(direction * volume, axis=0)
+    spread = high - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        money_flow = np.where(spread > 0, ((close - low) - (high - close)) / spread, 0.0) * volume
+    out['AD'] = np.cumsum(money_flow, axis=0)
+
+    true_range = np.fmax(spread, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    out['ATR'] = wilder(true_range, atr_period, first=1)
+
+    indicators = {name: expand(values, order, counts) for name, values in out.items()}
+    new_fields = panel_from_arrays(indicators, wide.index, tickers, ticker_col=ticker_col)
+    return pd.concat([wide.drop(columns=list(indicators), level=0, errors='ignore'), new_fields], axis=1)
 
 # Add name == 'main' block for testing if not already there
 if __name__ == '__main__':
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The src modules import each other as top-level modules (from storage import ...), as the notebooks do.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+@pytest.fixture(scope='session')
+def news_processor():
+    """The news_processor module; skips when the NLTK stopwords/punkt/wordnet data is not installed."""
+    try:
+        import news_processor
+        news_processor.preprocess_text('checking the tokenizer and lemmatizer data')
+    except LookupError as e:
+        pytest.skip(f'NLTK data not available: {e}')
+    return news_processor
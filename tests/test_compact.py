@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks import synthetic
+from compact import compact_prices, downcast_numeric, to_day_numbers, from_day_numbers, RAW_PRICE_COLUMNS
+from correlation import merge_sentiment_returns, _naive_dates
+from rolling_correlation import rolling_correlation
+from technical_analysis import add_all_common_indicators
+from financial_metrics import add_all_common_financial_metrics
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+
+@pytest.fixture(scope='module')
+def processed():
+    prices = synthetic.make_price_data(TICKERS, years=3, start='2011-01-03', seed=2)
+    return {ticker: add_all_common_financial_metrics(add_all_common_indicators(df)) for ticker, df in prices.items()}
+
+def daily_sentiment(news):
+    """The notebook's daily aggregation: mean sentiment per (publication_day, stock), renamed to Date."""
+    daily = news.groupby(['publication_day', 'stock'])['daily_avg_sentiment'].mean().reset_index()
+    return daily.rename(columns={'publication_day': 'Date'})
+
+def test_compact_news_merges_like_the_full_frame(news_processor, processed, tmp_path):
+    path = tmp_path / 'news.csv'
+    news = synthetic.make_news_data(5000, TICKERS, end='2013-12-31', seed=3)
+    news.to_csv(path, index=False)
+    full = news_processor.load_financial_news_data(str(path))
+    compact = news_processor.load_financial_news_data(str(path), compact=True)
+    assert pd.api.types.is_integer_dtype(compact['publication_day'])
+    for df in (full, compact):
+        df['daily_avg_sentiment'] = np.random.default_rng(0).uniform(-1, 1, len(df)).round(4)
+
+    expected = merge_sentiment_returns(daily_sentiment(full), processed)
+    with pytest.raises(ValueError, match='from_day_numbers'):
+        merge_sentiment_returns(daily_sentiment(compact), processed)
+    daily = daily_sentiment(compact)
+    daily['Date'] = from_day_numbers(daily['Date'])
+    actual = merge_sentiment_returns(daily, processed)
+    assert len(expected) > 1000
+    assert actual['Date'].tolist() == expected['Date'].tolist()
+    assert actual['stock'].astype(str).tolist() == expected['stock'].tolist()
+    np.testing.assert_allclose(actual['daily_avg_sentiment'], expected['daily_avg_sentiment'], rtol=1e-6)
+    assert len(rolling_correlation(actual, min_periods=5)) == len(rolling_correlation(expected, min_periods=5))
+
+def test_day_numbers_round_trip():
+    dates = pd.Series(pd.to_datetime(['2020-02-29 23:00-05:00', '1969-12-31 12:00+00:00', None], utc=True))
+    days = to_day_numbers(dates)
+    assert str(days.dtype) == 'Int32'
+    assert from_day_numbers(days).tolist()[:2] == [pd.Timestamp('2020-03-01'), pd.Timestamp('1969-12-31')]
+    assert from_day_numbers(days).isna().tolist() == [False, False, True]
+
+def test_integer_dates_are_not_guessed():
+    for dates in ([20200301, 20200302], [1583020800, 1583107200], [18322, 18323]):
+        with pytest.raises(ValueError, match='ambiguous'):
+            _naive_dates(pd.Series(dates, name='Date'))
+    assert _naive_dates(from_day_numbers(pd.Series([18322], dtype='int32'))).tolist() == [pd.Timestamp('2020-03-01')]
+
+def test_compact_prices_keep_raw_prices_and_consistent_dtypes(processed):
+    compacted = {ticker: compact_prices(df) for ticker, df in processed.items()}
+    dtypes = [df.dtypes for df in compacted.values()]
+    assert all(d.equals(dtypes[0]) for d in dtypes)
+    for ticker, df in compacted.items():
+        for col in RAW_PRICE_COLUMNS:
+            assert df[col].dtype == 'float64'
+            pd.testing.assert_series_equal(df[col], processed[ticker][col])
+        assert df['Volume'].dtype == 'int32'
+        assert df['RSI'].dtype == 'float32'
+
+def test_downcast_leaves_whole_number_floats_and_large_integers():
+    df = pd.DataFrame({'splits': [0.0, 2.0, 0.0], 'big': [1, 2, 2**40], 'small': [1, 2, 3], 'flag': [True, False, True]})
+    result = downcast_numeric(df)
+    assert result.dtypes.astype(str).to_dict() == {'splits': 'float32', 'big': 'int64', 'small': 'int32', 'flag': 'bool'}
+    assert downcast_numeric(df, exclude=['splits'])['splits'].dtype == 'float64'
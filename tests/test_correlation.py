@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from correlation import merge_sentiment_returns, correlation_summary
+
+LAGS = [0, 1, 3]
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range('2022-01-03', periods=200)
+    stock_returns, frames = {}, []
+    for ticker, news_count in [('AAA', 120), ('BBB', 80), ('CCC', 40), ('TINY', 3)]:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        prices = pd.DataFrame({'Close': close}, index=pd.Index(dates, name='Date'))
+        prices['Daily_Return'] = prices['Close'].pct_change()
+        stock_returns[ticker] = prices
+        # TINY's news falls on its first day (no return), its last day (no lagged return) and one day in between
+        days = np.array([0, 100, len(dates) - 1]) if ticker == 'TINY' else np.sort(rng.choice(len(dates), news_count, replace=False))
+        sentiment = rng.uniform(-1, 1, len(days)) + 20 * prices['Daily_Return'].fillna(0).to_numpy()[days]
+        frames.append(pd.DataFrame({'Date': dates[days].tz_localize('UTC'), 'stock': ticker, 'daily_avg_sentiment': sentiment}))
+    return pd.concat(frames, ignore_index=True), stock_returns
+
+def test_lagged_returns_are_k_trading_days_later(data):
+    daily, stock_returns = data
+    merged = merge_sentiment_returns(daily, stock_returns, lags=LAGS)
+    for _, row in merged.sample(50, random_state=0).iterrows():
+        returns = stock_returns[row['stock']]['Daily_Return']
+        position = returns.index.get_loc(row['Date'])
+        assert row['Daily_Return'] == returns.iloc[position]
+        for k in LAGS[1:]:
+            expected = returns.iloc[position + k] if position + k < len(returns) else np.nan
+            assert row[f'Daily_Return_t+{k}'] == expected or (np.isnan(expected) and np.isnan(row[f'Daily_Return_t+{k}']))
+    # The first trading day has no same-day return and is dropped
+    assert not ((merged['stock'] == 'TINY') & (merged['Date'] == stock_returns['TINY'].index[0])).any()
+
+def test_summary_matches_scipy(data):
+    daily, stock_returns = data
+    merged = merge_sentiment_returns(daily, stock_returns, lags=LAGS)
+    summary = correlation_summary(merged, lags=LAGS).set_index(['Ticker', 'Lag'])
+    for k in LAGS:
+        target = 'Daily_Return' if k == 0 else f'Daily_Return_t+{k}'
+        for ticker, df in merged.groupby('stock'):
+            df = df[['daily_avg_sentiment', target]].dropna()
+            row = summary.loc[(ticker, k)]
+            assert row['N'] == len(df)
+            if len(df) < 3:
+                continue
+            pearson = stats.pearsonr(df['daily_avg_sentiment'], df[target])
+            spearman = stats.spearmanr(df['daily_avg_sentiment'], df[target])
+            np.testing.assert_allclose([row['Pearson'], row['Pearson_p_value'], row['Spearman'], row['Spearman_p_value']],
+                                       [pearson.statistic, pearson.pvalue, spearman.statistic, spearman.pvalue], rtol=1e-9, atol=1e-12)
+
+def test_tickers_with_fewer_than_three_samples(data):
+    daily, stock_returns = data
+    merged = merge_sentiment_returns(daily, stock_returns, lags=LAGS)
+    summary = correlation_summary(merged, lags=LAGS).set_index(['Ticker', 'Lag'])
+    two = summary.loc[('TINY', 0)] # Two pairs: r is +-1 but has no p-value
+    assert two['N'] == 2 and abs(two['Pearson']) == pytest.approx(1) and np.isnan(two['Pearson_p_value'])
+    one = summary.loc[('TINY', 1)] # The last day has no next-day return
+    assert one['N'] == 1 and np.isnan(one['Pearson']) and np.isnan(one['Spearman'])
+
+def test_empty_merge_gives_empty_summary():
+    empty = pd.DataFrame(columns=['Date', 'stock', 'daily_avg_sentiment', 'Daily_Return'])
+    assert correlation_summary(empty).empty
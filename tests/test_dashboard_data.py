@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+import pytest
+from storage import convert_csv_dir
+from dashboard_data import TickerStore
+
+KIND = 'processed_stock_data'
+
+def write(data_dir, ticker, closes, mtime=None):
+    path = data_dir / f'{ticker}_{KIND}.csv'
+    pd.DataFrame({'Date': pd.bdate_range('2021-01-04', periods=len(closes)), 'Close': closes}).to_csv(path, index=False)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime)) # Distinct mtimes even on coarse-grained filesystems
+    return path
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+        write(tmp_path, ticker, [1.0 + i, 2.0 + i], mtime=10**18)
+    return tmp_path
+
+def test_loads_lazily_and_evicts_least_recently_used(data_dir):
+    store = TickerStore(str(data_dir), KIND, max_loaded=2)
+    assert store.tickers == ['AAA', 'BBB', 'CCC'] and store.loaded() == []
+    first = store.get('AAA')
+    store.get('BBB')
+    assert store.get('AAA') is first # Served from memory
+    store.get('CCC')
+    assert store.loaded() == ['AAA', 'CCC'] # BBB was least recently used
+    assert store.get('ZZZ') is None and store.version('ZZZ') is None
+
+def test_rewritten_csv_is_reloaded(data_dir):
+    store = TickerStore(str(data_dir), KIND)
+    before = store.version('AAA')
+    assert list(store.get('AAA')['Close']) == [1.0, 2.0]
+    write(data_dir, 'AAA', [5.0, 6.0, 7.0], mtime=10**18 + 10**9)
+    assert store.version('AAA') != before
+    assert list(store.get('AAA')['Close']) == [5.0, 6.0, 7.0]
+
+def test_stale_columnar_copy_falls_back_to_csv(data_dir):
+    convert_csv_dir(str(data_dir), KIND, fmt='arrow')
+    store = TickerStore(str(data_dir), KIND)
+    assert store.version('BBB').startswith('BBB_processed_stock_data.arrow')
+    assert list(store.get('BBB')['Close']) == [2.0, 3.0]
+    write(data_dir, 'BBB', [9.0], mtime=10**18 + 10**9) # The CSV is now newer than the Arrow copy
+    assert store.version('BBB').startswith('BBB_processed_stock_data.csv')
+    assert list(store.get('BBB')['Close']) == [9.0]
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+from benchmarks import synthetic
+from data_loader import load_all_historical_data
+
+@pytest.fixture
+def data_dir(tmp_path):
+    prices = synthetic.make_price_data(['AAPL', 'BRK_B', 'MSFT'], years=1, start='2020-01-02', seed=1)
+    for ticker, df in prices.items():
+        if ticker == 'MSFT':
+            df = df.drop(columns='Volume')
+        df.to_csv(tmp_path / f'{ticker}_historical_data.csv')
+    (tmp_path / 'notes.csv').write_text('not,a,ticker\n')
+    return tmp_path
+
+def test_loads_every_ticker_with_full_file_prefix(data_dir):
+    data, report = load_all_historical_data(str(data_dir), return_report=True)
+    # Tickers are the whole prefix before _historical_data.csv, so BRK_B is not read as BRK
+    assert sorted(data) == ['AAPL', 'BRK_B', 'MSFT']
+    assert list(report.columns) == ['ticker', 'file', 'rows', 'seconds', 'status', 'message', 'bytes_per_row_before', 'bytes_per_row']
+    report = report.set_index('ticker')
+    assert report.loc['AAPL', 'status'] == 'ok' and report.loc['AAPL', 'rows'] == len(data['AAPL'])
+    assert report.loc['MSFT', 'status'] == 'warning' and 'Volume' in report.loc['MSFT', 'message']
+    assert data['AAPL'].index.name == 'Date' and data['AAPL'].index.is_monotonic_increasing
+
+def test_ticker_column_and_date_filters(data_dir):
+    data = load_all_historical_data(str(data_dir), tickers=['BRK_B', 'GOOG'], columns=['Close'], date_range=('2020-03-02', '2020-03-31'))
+    assert list(data) == ['BRK_B']
+    df = data['BRK_B']
+    assert list(df.columns) == ['Close']
+    assert df.index.min() >= pd.Timestamp('2020-03-02') and df.index.max() <= pd.Timestamp('2020-03-31')
+    full = pd.read_csv(data_dir / 'BRK_B_historical_data.csv', index_col='Date', parse_dates=True)
+    pd.testing.assert_series_equal(df['Close'], full.loc['2020-03-02':'2020-03-31', 'Close'], check_freq=False)
+
+def test_bad_rows_are_dropped_and_problems_reported(data_dir):
+    df = pd.read_csv(data_dir / 'AAPL_historical_data.csv')
+    df['Close'] = df['Close'].astype(object)
+    df.loc[3, 'Close'] = 'n/a'
+    df.to_csv(data_dir / 'AAPL_historical_data.csv', index=False)
+    (data_dir / 'BAD_historical_data.csv').write_text('no date column\n1\n')
+    data, report = load_all_historical_data(str(data_dir), return_report=True)
+    assert len(data['AAPL']) == len(df) - 1 and data['AAPL']['Close'].dtype == 'float64'
+    bad = report.set_index('ticker').loc['BAD']
+    assert bad['status'] == 'warning' and 'Close' in bad['message']
+    (data_dir / 'EMPTY_historical_data.csv').write_text('')
+    data, report = load_all_historical_data(str(data_dir), return_report=True)
+    assert 'EMPTY' not in data and report.set_index('ticker').loc['EMPTY', 'status'] == 'error'
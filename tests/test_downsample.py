@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from downsample import downsample_series, downsample_indices, lttb_indices, minmax_indices
+
+METHODS = ['lttb', 'minmax']
+
+@pytest.fixture(scope='module')
+def series():
+    rng = np.random.default_rng(12)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 20000)))
+    values[7777] = values.max() * 3 # A single-day spike
+    values[12345] = values.min() / 3 # and a single-day crash
+    values[:40] = np.nan
+    return pd.Series(values, index=pd.bdate_range('1950-01-02', periods=len(values)))
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('n_out', [10, 500, 2000])
+def test_keeps_extremes_and_endpoints_under_the_cap(series, method, n_out):
+    sampled = downsample_series(series, n_out, method)
+    valid = series.dropna()
+    assert sampled.max() == valid.max() and sampled.idxmax() == valid.idxmax()
+    assert sampled.min() == valid.min() and sampled.idxmin() == valid.idxmin()
+    assert len(sampled) <= n_out + 2 # The cap, plus the global extremes when a method missed them
+    assert sampled.index.is_monotonic_increasing and sampled.index.isin(valid.index).all()
+    assert (sampled == valid.loc[sampled.index]).all() # Real observations, not averages
+    if method == 'lttb':
+        assert sampled.index[0] == valid.index[0] and sampled.index[-1] == valid.index[-1]
+
+@pytest.mark.parametrize('method', METHODS)
+def test_short_inputs_are_returned_whole(series, method):
+    short = series.iloc[30:130]
+    pd.testing.assert_series_equal(downsample_series(short, 2000, method), short.dropna())
+    assert downsample_series(series.iloc[:0], 10, method).empty
+    np.testing.assert_array_equal(downsample_indices(np.arange(5), [1.0, np.nan, 3.0, 2.0, 0.0], 10, method), [0, 2, 3, 4])
+
+def test_lttb_keeps_first_and_last_point_exactly_n_out():
+    y = np.sin(np.linspace(0, 20, 1000))
+    kept = lttb_indices(np.arange(1000), y, 100)
+    assert len(kept) == 100 and kept[0] == 0 and kept[-1] == 999 and (np.diff(kept) > 0).all()
+
+def test_minmax_envelope_keeps_each_bucket_extremes():
+    y = np.random.default_rng(1).normal(size=1000)
+    kept = minmax_indices(y, 20)
+    for bucket in np.array_split(np.arange(1000), 10):
+        assert bucket[np.argmax(y[bucket])] in kept and bucket[np.argmin(y[bucket])] in kept
+
+def test_rejects_unknown_method(series):
+    with pytest.raises(ValueError):
+        downsample_series(series, 100, method='mean')
@@ -0,0 +1,41 @@
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+from plotly.utils import PlotlyJSONEncoder
+from figure_cache import FigureCache, figure_json, _figure_size
+
+def json_length(value):
+    """Length of the JSON Dash sends for a figure_json value, whatever the plotly version."""
+    return len(json.dumps(value, cls=PlotlyJSONEncoder))
+
+def make_figure(n):
+    return go.Figure(data=[go.Scatter(x=np.arange(n), y=np.linspace(0, 1, n))], layout=go.Layout(title='t'))
+
+def test_size_tracks_serialized_json():
+    value = figure_json((make_figure(1000), make_figure(10)))
+    assert isinstance(value[0], dict)
+    cache = FigureCache()
+    cache.put('a', value)
+    serialized = sum(json_length(fig) for fig in value)
+    assert 0.5 * serialized < cache.stats()['bytes'] < 1.5 * serialized
+
+def test_size_of_raw_arrays():
+    # plotly 5's to_plotly_json keeps numpy arrays instead of base64 strings
+    dates = pd.date_range('2020-01-01', periods=500).to_numpy()
+    value = {'data': [{'type': 'scatter', 'x': dates, 'y': np.random.default_rng(0).normal(size=500), 'mode': 'lines'},
+                      {'type': 'bar', 'x': np.arange(500), 'y': np.arange(500) % 7 == 0}],
+             'layout': {'title': {'text': 'raw arrays'}}}
+    assert 0.8 * json_length(value) < _figure_size(value) < 1.25 * json_length(value)
+
+def test_evicts_least_recently_used_by_bytes():
+    small = figure_json(make_figure(100))
+    cache = FigureCache()
+    size = cache.sizeof(small)
+    cache.max_bytes = 2 * size
+    built = []
+    for key in ['a', 'b', 'a', 'c']:
+        cache.get_or_build(key, lambda: built.append(key) or small)
+    assert built == ['a', 'b', 'c']
+    assert cache.get('b') is None and cache.get('a') is not None
+    assert cache.stats() == {'entries': 2, 'bytes': 2 * size, 'hits': 1, 'misses': 3}
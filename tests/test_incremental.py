@@ -0,0 +1,28 @@
+import pickle
+import numpy as np
+import pytest
+from benchmarks import synthetic
+from technical_analysis import add_all_common_indicators
+from financial_metrics import add_all_common_financial_metrics
+from incremental import IncrementalIndicators
+
+@pytest.fixture(scope='module')
+def prices():
+    return synthetic.make_price_data(['AAA'], years=2, seed=7)['AAA']
+
+@pytest.mark.parametrize('split', [60, 300, 480])
+def test_incremental_rows_match_batch(prices, split):
+    batch = add_all_common_financial_metrics(add_all_common_indicators(prices))
+    updater = IncrementalIndicators.from_history(prices.iloc[:split])
+    updater = pickle.loads(pickle.dumps(updater)) # Kept between runs
+    new_rows = [updater.update(prices.iloc[split:split + 1]), updater.update(prices.iloc[split + 1:])]
+    for rows in new_rows:
+        expected = batch.loc[rows.index, rows.columns]
+        np.testing.assert_allclose(rows.to_numpy(dtype='float64'), expected.to_numpy(dtype='float64'), rtol=1e-9, atol=1e-8, equal_nan=True)
+
+def test_history_matches_batch_including_warmup(prices):
+    batch = add_all_common_financial_metrics(add_all_common_indicators(prices))
+    rows = IncrementalIndicators().update(prices)
+    expected = batch[rows.columns]
+    assert (rows.isna() == expected.isna()).all().all()
+    np.testing.assert_allclose(rows.to_numpy(dtype='float64'), expected.to_numpy(dtype='float64'), rtol=1e-9, atol=1e-8, equal_nan=True)
@@ -0,0 +1,46 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+import pytest
+from keyword_counter import KeywordCounter, count_keywords
+
+@pytest.fixture(scope='module')
+def corpus():
+    rng = np.random.default_rng(5)
+    vocabulary = np.array([f'w{i}' for i in range(300)], dtype=object)
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    lengths = rng.integers(0, 9, 3000)
+    tokens = rng.choice(vocabulary, lengths.sum(), p=weights / weights.sum())
+    texts = pd.Series([' '.join(row) for row in np.split(tokens, np.cumsum(lengths)[:-1])], dtype=object)
+    texts[rng.choice(len(texts), 30, replace=False)] = None
+    groups = pd.Series(rng.choice(['AAPL', 'TSLA', 'GOOG'], len(texts)))
+    return texts, groups
+
+def counter_most_common(texts, n_gram, top_n):
+    counts = Counter(gram for text in texts.dropna() for gram in zip(*[text.split()[j:] for j in range(n_gram)]))
+    return [(gram[0] if n_gram == 1 else gram, count) for gram, count in counts.most_common(top_n)]
+
+@pytest.mark.parametrize('n_gram', [1, 2, 3])
+@pytest.mark.parametrize('chunksize', [250, 100000])
+def test_exact_mode_matches_counter(corpus, n_gram, chunksize):
+    texts, _ = corpus
+    # A large top_n includes long runs of tied counts, which must keep Counter's first-appearance order
+    assert count_keywords(texts, n_gram=n_gram, top_n=500, chunksize=chunksize) == counter_most_common(texts, n_gram, 500)
+
+def test_groups_match_counter_per_group(corpus):
+    texts, groups = corpus
+    by_group = count_keywords(texts, n_gram=2, top_n=20, groups=groups, chunksize=400)
+    assert set(by_group) == {'AAPL', 'TSLA', 'GOOG'}
+    for label, result in by_group.items():
+        assert result == counter_most_common(texts[groups == label], 2, 20)
+
+def test_approximate_mode_only_overestimates(corpus):
+    texts, _ = corpus
+    exact = dict(counter_most_common(texts, 2, None))
+    approximate = count_keywords(texts, n_gram=2, top_n=10, mode='approximate', width=2**12, capacity=200)
+    assert len(approximate) == 10
+    assert all(count >= exact[gram] for gram, count in approximate)
+
+def test_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        KeywordCounter(mode='fuzzy')
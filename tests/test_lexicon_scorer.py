@@ -0,0 +1,17 @@
+import pandas as pd
+from lexicon_scorer import check_parity, sample_corpus, score_polarity
+from benchmarks import synthetic
+
+def test_matches_textblob_on_sampled_corpus():
+    mismatches = check_parity(sample_corpus(5000, seed=3))
+    assert mismatches.empty, mismatches.head().to_string()
+
+def test_matches_textblob_on_preprocessed_headlines(news_processor):
+    headlines = synthetic.make_news_data(2000, synthetic.make_tickers(5), seed=2)['headline']
+    corpus = [news_processor.preprocess_text(text) for text in headlines]
+    mismatches = check_parity(corpus)
+    assert mismatches.empty, mismatches.head().to_string()
+
+def test_empty_and_unknown_texts_score_zero():
+    assert list(score_polarity(['', 'zzzz qqqq'])) == [0.0, 0.0]
+    assert check_parity(pd.Series(['', 'not good', 'very very bad'])).empty
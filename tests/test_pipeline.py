@@ -0,0 +1,72 @@
+import os
+import shutil
+import pytest
+from benchmarks import synthetic
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+DOWNSTREAM = {'merge', 'correlation', 'rolling_correlation', 'dashboard_artifacts'}
+
+@pytest.fixture
+def pipeline(news_processor):
+    import pipeline
+    return pipeline
+
+@pytest.fixture
+def dirs(tmp_path):
+    raw = synthetic.write_price_csvs(synthetic.make_price_data(TICKERS, years=2, start='2011-01-03', seed=4), str(tmp_path / 'raw'))
+    news = synthetic.make_news_data(1500, TICKERS, end='2012-12-31', seed=4)
+    news.loc[[3, 30], 'date'] = 'not a date'
+    return {'raw_dir': raw, 'news_path': synthetic.write_news_csv(news, str(tmp_path / 'news.csv')), 'output_dir': str(tmp_path / 'out'), 'work_dir': str(tmp_path / 'work')}
+
+def run(pipeline, dirs, **kwargs):
+    tasks = pipeline.build_tasks(**dirs, engine='vectorized', n_jobs=1)
+    report = pipeline.run_pipeline(tasks, os.path.join(dirs['work_dir'], pipeline.STATE_FILE), jobs=1, verbose=False, **kwargs)
+    return report.set_index('task')['status']
+
+def reruns(pipeline, dirs):
+    tasks = pipeline.build_tasks(**dirs, engine='vectorized', n_jobs=1)
+    report = pipeline.plan(tasks, pipeline.load_state(os.path.join(dirs['work_dir'], pipeline.STATE_FILE)))
+    return set(report.loc[report['run'], 'task'])
+
+def test_skips_up_to_date_stages_and_reruns_one_ticker_chain(pipeline, dirs, capsys):
+    first = run(pipeline, dirs)
+    assert (first == 'ran').all() and len(first) == 3 * len(TICKERS) + 7
+    assert 'Dropped 2 rows with missing or unparseable dates' in capsys.readouterr().out
+    assert os.path.exists(os.path.join(dirs['output_dir'], 'overall_correlation_summary.csv'))
+
+    assert (run(pipeline, dirs) == 'skipped').all()
+
+    path = os.path.join(dirs['raw_dir'], 'BBB_historical_data.csv')
+    synthetic.write_price_csvs(synthetic.make_price_data(['BBB'], years=2, start='2011-01-03', seed=5), dirs['raw_dir'])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    third = run(pipeline, dirs)
+    assert set(third.index[third == 'ran']) == {'load_prices:BBB', 'indicators:BBB', 'metrics:BBB'} | DOWNSTREAM
+
+def test_editing_an_imported_helper_reruns_dependent_stages(pipeline, dirs, tmp_path, monkeypatch):
+    run(pipeline, dirs)
+    src = tmp_path / 'src'
+    shutil.copytree(pipeline.SRC_DIR, src, ignore=shutil.ignore_patterns('__pycache__'))
+    monkeypatch.setattr(pipeline, 'SRC_DIR', str(src))
+    monkeypatch.setattr(pipeline, '_module_hashes', {})
+    monkeypatch.setattr(pipeline, '_module_imports', {})
+    assert reruns(pipeline, dirs) == set()
+
+    # panel is only imported by technical_analysis and financial_metrics, never listed directly
+    with open(src / 'panel.py', 'a') as f:
+        f.write('\n# edited\n')
+    pipeline._module_hashes.clear()
+    per_ticker = {f'{stage}:{ticker}' for stage in ('indicators', 'metrics') for ticker in TICKERS}
+    assert reruns(pipeline, dirs) == per_ticker | DOWNSTREAM
+
+    # compact is imported by data_loader, news_processor and correlation
+    with open(src / 'compact.py', 'a') as f:
+        f.write('\n# edited\n')
+    pipeline._module_hashes.clear()
+    loads = {f'load_prices:{ticker}' for ticker in TICKERS}
+    assert reruns(pipeline, dirs) == loads | per_ticker | {'news_ingest', 'sentiment', 'daily_aggregation'} | DOWNSTREAM
+
+def test_src_imports_ignore_main_blocks(pipeline):
+    # compact's __main__ block imports technical_analysis and financial_metrics for its demo
+    assert pipeline._code_modules(['compact']) == ['compact']
+    assert 'panel' in pipeline._code_modules(['financial_metrics'])
@@ -0,0 +1,14 @@
+import numpy as np
+from benchmarks import synthetic
+
+EDGE_CASES = ['', '   ', "Apple's Q3 EPS beat: +12%!", 'UPPER lower MiXeD', 'tabs\tand\nnewlines', 'naïve café résumé', 'the and of', None, 42, float('nan')]
+
+def test_preprocess_series_matches_preprocess_text(news_processor):
+    headlines = synthetic.make_news_data(3000, synthetic.make_tickers(5), seed=6)['headline'].tolist() + EDGE_CASES
+    news_processor._lemma_table.clear()
+    assert news_processor.preprocess_series(headlines) == [news_processor.preprocess_text(text) for text in headlines]
+
+def test_preprocess_series_accepts_arrays(news_processor):
+    texts = np.array(['Shares rallied on strong earnings', 'Stocks fall'], dtype=object)
+    assert news_processor.preprocess_series(texts) == [news_processor.preprocess_text(text) for text in texts]
+    assert news_processor.preprocess_series([]) == []
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from rolling_correlation import rolling_correlation, _window_correlations
+
+WINDOWS = [5, 20, 60]
+
+@pytest.fixture(scope='module')
+def merged():
+    rng = np.random.default_rng(8)
+    dates = pd.bdate_range('2020-01-01', periods=300)
+    frames = []
+    for i, ticker in enumerate(['AAA', 'BBB', 'CCC', 'DDD']):
+        days = np.sort(rng.choice(len(dates), 120 + 40 * i, replace=False))
+        returns = rng.normal(0, 0.02, len(days))
+        sentiment = rng.uniform(-1, 1, len(days)) + 10 * returns
+        sentiment[:8] = 0.25 # A constant stretch has no defined correlation
+        frames.append(pd.DataFrame({'Date': dates[days], 'stock': ticker, 'daily_avg_sentiment': sentiment, 'Daily_Return': returns}))
+    return pd.concat(frames, ignore_index=True)
+
+def pandas_reference(merged, min_periods):
+    reference = []
+    for ticker, df in merged.groupby('stock'):
+        df = df.set_index('Date').reindex(pd.bdate_range(df['Date'].min(), df['Date'].max()))
+        # pandas rejects min_periods > window; such windows never have enough pairs
+        reference.append(pd.DataFrame({f'Rolling_Corr_{w}': df['daily_avg_sentiment'].rolling(w, min_periods=min_periods).corr(df['Daily_Return'])
+                                       if w >= min_periods else pd.Series(np.nan, index=df.index) for w in WINDOWS}).assign(stock=ticker))
+    reference = pd.concat(reference).rename_axis('Date').reset_index()
+    return reference.dropna(how='all', subset=[f'Rolling_Corr_{w}' for w in WINDOWS])
+
+@pytest.mark.parametrize('min_periods', [3, 10])
+def test_matches_pandas_rolling_corr(merged, min_periods):
+    rolling = rolling_correlation(merged, windows=WINDOWS, min_periods=min_periods)
+    reference = pandas_reference(merged, min_periods)
+    check = rolling.merge(reference, on=['Date', 'stock'], suffixes=('', '_ref'), how='outer', indicator=True)
+    assert (check['_merge'] == 'both').all()
+    for w in WINDOWS:
+        np.testing.assert_allclose(check[f'Rolling_Corr_{w}'], check[f'Rolling_Corr_{w}_ref'], rtol=0, atol=1e-9, equal_nan=True)
+
+def test_counts_pairs_in_each_window(merged):
+    rolling = rolling_correlation(merged, windows=WINDOWS, min_periods=3)
+    for ticker, df in merged.groupby('stock'):
+        pairs = df.set_index('Date')['Daily_Return'].reindex(pd.bdate_range(df['Date'].min(), df['Date'].max())).notna()
+        for w in WINDOWS:
+            expected = pairs.rolling(w, min_periods=1).sum().astype('int64')
+            actual = rolling[rolling['stock'] == ticker].set_index('Date')[f'Rolling_N_{w}']
+            assert (actual == expected.loc[actual.index]).all()
+
+def test_column_blocks_give_the_same_result():
+    rng = np.random.default_rng(9)
+    x = rng.normal(size=(200, 25))
+    y = rng.normal(size=(200, 25))
+    x[rng.random(x.shape) < 0.5] = np.nan
+    whole = _window_correlations(x, y, WINDOWS, 3)
+    blocked = _window_correlations(x, y, WINDOWS, 3, block_bytes=6 * 8 * 201 * 4) # 4 tickers per block
+    for w in WINDOWS:
+        np.testing.assert_allclose(whole[w][0], blocked[w][0], rtol=0, atol=1e-12) # Column sums may round differently
+        np.testing.assert_array_equal(whole[w][1], blocked[w][1])
@@ -0,0 +1,38 @@
+import pandas as pd
+from sentiment_cache import SentimentCache
+
+def make_items(texts, fingerprint='v1'):
+    return [(SentimentCache.make_key(text, fingerprint), text.upper(), len(text) / 10) for text in texts]
+
+def test_second_run_is_served_from_cache(news_processor, tmp_path):
+    headlines = ["Apple's strong earnings boost stock.", 'Tesla shares jump', "Apple's strong earnings boost stock.", 'Weak guidance']
+    with SentimentCache(str(tmp_path / 'cache.sqlite')) as cache:
+        first = news_processor.add_sentiment_score(pd.DataFrame({'headline': headlines}), n_jobs=1, cache=cache, verbose=False)
+        assert cache.stats()['hits'] == 0
+        second = news_processor.add_sentiment_score(pd.DataFrame({'headline': headlines}), n_jobs=1, cache=cache, verbose=False)
+        assert cache.stats()['hits'] == 3 # One lookup per distinct headline
+    pd.testing.assert_frame_equal(first, second)
+
+def test_fingerprint_change_misses(tmp_path):
+    with SentimentCache(str(tmp_path / 'cache.sqlite')) as cache:
+        cache.put_many(make_items(['a', 'b']))
+        assert len(cache.get_many(key for key, _, _ in make_items(['a', 'b'], fingerprint='v2'))) == 0
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    items = make_items(['aaaa', 'bbbb', 'cccc', 'dddd'])
+    size = SentimentCache.entry_size(items[0][0], items[0][1])
+    with SentimentCache(str(tmp_path / 'cache.sqlite'), max_bytes=3 * size) as cache:
+        cache.put_many(items[:3])
+        cache.get_many([items[0][0]]) # 'aaaa' is now more recent than 'bbbb'
+        cache.put_many(items[3:])
+        assert sorted(processed for processed, _ in cache.get_many(key for key, _, _ in items).values()) == ['AAAA', 'CCCC', 'DDDD']
+        assert len(cache) == 3 and cache.nbytes == 3 * size
+
+def test_running_totals_match_database(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    with SentimentCache(path, max_bytes=None, max_entries=5) as cache:
+        cache.put_many(make_items(['x', 'yy', 'zzz']))
+        cache.put_many(make_items(['yy', 'wwww', 'vvvvv', 'uuuuuu'])) # 'yy' is replaced, not added
+        totals = (len(cache), cache.nbytes)
+    with SentimentCache(path, max_bytes=None, max_entries=5) as reopened:
+        assert totals == (len(reopened), reopened.nbytes) == (5, reopened.nbytes)
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+from benchmarks import synthetic
+
+HEADLINES = [
+    "Apple's strong earnings boost stock.",
+    "Tesla new factory plans, shares jump.",
+    "Apple's strong earnings boost stock.",
+    "Stocks That Hit 52-Week Lows On Friday",
+    "",
+    "Not a very good quarter; guidance cannot be trusted",
+]
+
+def sample_headlines(n=2000):
+    news = synthetic.make_news_data(n, synthetic.make_tickers(5), seed=1)
+    return HEADLINES + news['headline'].tolist()
+
+def per_row_reference(news_processor, headlines):
+    processed = [news_processor.preprocess_text(text) for text in headlines]
+    return processed, [TextBlob(text).sentiment.polarity for text in processed]
+
+def test_batched_scores_match_per_row_textblob(news_processor):
+    headlines = sample_headlines()
+    processed, expected = per_row_reference(news_processor, headlines)
+    for n_jobs, chunksize in ((1, 10000), (2, 300)):
+        df = news_processor.add_sentiment_score(pd.DataFrame({'headline': headlines}), n_jobs=n_jobs, chunksize=chunksize, verbose=False)
+        assert df['processed_headline'].tolist() == processed
+        assert df['daily_avg_sentiment'].tolist() == expected
+
+def test_existing_processed_column_is_scored_as_is(news_processor):
+    processed = ['strong earnings boost stock', 'weak guidance', 'strong earnings boost stock', '']
+    df = news_processor.add_sentiment_score(pd.DataFrame({'headline': processed, 'processed_headline': processed}), n_jobs=1, verbose=False)
+    assert np.array_equal(df['daily_avg_sentiment'].to_numpy(), [TextBlob(text).sentiment.polarity for text in processed])
@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+import storage
+
+@pytest.fixture
+def offset_csv(tmp_path):
+    # Two UTC offsets in one column: pandas would otherwise parse these as object dates
+    dates = ['2023-03-09 00:00:00-05:00', '2023-03-10 00:00:00-05:00', '2023-03-13 00:00:00-04:00', '2023-03-14 00:00:00-04:00']
+    pd.DataFrame({'Date': dates, 'Close': [1.0, 2.0, 3.0, 4.0]}).to_csv(tmp_path / 'AAPL_historical_data.csv', index=False)
+    return tmp_path
+
+def test_csv_with_utc_offsets_filters_by_naive_dates(offset_csv):
+    df = storage.read_dataset(str(offset_csv), 'AAPL', 'historical_data', date_range=('2023-03-10', '2023-03-14'))
+    assert df.index.tz is None
+    assert list(df['Close']) == [2.0, 3.0]
+    assert list(df.index) == [pd.Timestamp('2023-03-10 05:00'), pd.Timestamp('2023-03-13 04:00')]
+
+def test_columnar_copy_matches_csv(offset_csv):
+    csv = storage.read_dataset(str(offset_csv), 'AAPL', 'historical_data', date_range=(pd.Timestamp('2023-03-10', tz='UTC'), None))
+    storage.convert_csv_dir(str(offset_csv))
+    columnar = storage.read_dataset(str(offset_csv), 'AAPL', 'historical_data', date_range=(pd.Timestamp('2023-03-10', tz='UTC'), None))
+    pd.testing.assert_frame_equal(csv, columnar, check_index_type=False)
+    assert len(columnar) == 3
@@ -0,0 +1,17 @@
+import pandas as pd
+from benchmarks import synthetic
+
+def test_streamed_table_matches_in_memory_aggregate(news_processor, tmp_path, capsys):
+    news = synthetic.make_news_data(600, synthetic.make_tickers(3), seed=4)
+    news.loc[[5, 50], 'date'] = 'not a date'
+    path = tmp_path / 'news.csv'
+    news.to_csv(path, index=False)
+
+    streamed = news_processor.stream_daily_sentiment(str(path), chunksize=100, n_jobs=2, verbose=False)
+    assert 'Dropped 2 rows' in capsys.readouterr().out
+
+    expected = news.drop(index=[5, 50])
+    expected['Date'] = pd.to_datetime(expected['date'], utc=True).dt.normalize()
+    expected = news_processor.add_sentiment_score(expected, n_jobs=1, verbose=False)
+    expected = expected.groupby(['Date', 'stock'])['daily_avg_sentiment'].mean().reset_index()
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)